@@ -0,0 +1,382 @@
+import io
+import json
+import os
+import struct
+import zlib
+from math import comb
+
+import numpy as np
+
+from binario import bolas_de_mascaras, mascara_de_numeros, mascaras, numeros_de_mascara, popcount
+
+# --------------------------------------------------
+# FORMATO DO ARQUIVO DE APOSTAS
+# --------------------------------------------------
+# Cabeçalho fixo de 32 bytes (little-endian), seguido dos metadados em JSON (UTF-8) e dos registros:
+#   assinatura "LFAP" (4s) | versão (H) | codificação (B) | tamanho dos jogos (B) | quantidade de jogos (Q)
+#   CRC32 dos registros (I) | bytes de metadados (I) | deslocamento dos registros (I) | reservado (I)
+#
+# Cada jogo ocupa um registro uint32 (4 bytes), em uma de duas codificações:
+#   - "mascara": máscara de 25 bits (bit k ligado se o número k + 1 está no jogo). Aceita jogos de qualquer
+#                tamanho; o cabeçalho guarda o tamanho comum ou 0 quando há jogos de tamanhos diferentes.
+#   - "rank"   : posição do jogo na ordem colexicográfica das combinações de `tamanho` números, de 0 a
+#                C(25, tamanho) - 1. É a ordem crescente das máscaras, e por isso a mesma em que
+#                carteira.resultados_no_intervalo enumera os resultados. Exige jogos do mesmo tamanho.
+#
+# Os registros começam em um deslocamento múltiplo de 16 bytes, de modo que a leitura é uma cópia direta
+# do disco (np.fromfile) ou um mapeamento em memória (np.memmap), sem decodificação de texto.
+ASSINATURA = b"LFAP"
+VERSAO = 1
+CODIFICACOES = {"mascara": 0, "rank": 1}
+EXTENSAO = ".apostas"
+
+# Quantidade de jogos por bloco nas leituras e gravações em fluxo (4 MB)
+TAMANHO_BLOCO = 2**20
+
+_CABECALHO = struct.Struct("<4sHBBQIIII")
+_ALINHAMENTO = 16
+_REGISTRO = np.dtype("<u4")
+
+# Conversão máscara -> posição em grupos de 5 bits: _RANK_GRUPOS[g, padrao, antes] é a contribuição dos
+# números do grupo g (bits 5g a 5g + 4) com aquele padrão de bits, dado que há `antes` números menores no jogo
+_BITS_GRUPO = 5
+
+def _tabela_rank_grupos():
+    tabela = np.zeros((25 // _BITS_GRUPO, 2**_BITS_GRUPO, 26), dtype=np.int64)
+    for g in range(len(tabela)):
+        for padrao in range(2**_BITS_GRUPO):
+            posicoes = [_BITS_GRUPO * g + b for b in range(_BITS_GRUPO) if padrao >> b & 1]
+            for antes in range(26 - len(posicoes)):
+                tabela[g, padrao, antes] = sum(comb(j, antes + i) for i, j in enumerate(posicoes, start=1))
+    return tabela
+
+_RANK_GRUPOS = _tabela_rank_grupos()
+_BITS_POR_PADRAO = np.array([bin(p).count("1") for p in range(2**_BITS_GRUPO)], dtype=np.int64)
+
+# Máscaras de todas as combinações de cada tamanho, em ordem crescente (= ordem colexicográfica), criadas sob demanda
+_TABELAS_MASCARAS = {}
+
+# --------------------------------------------------
+# POSIÇÃO COLEXICOGRÁFICA (RANK) DAS COMBINAÇÕES
+# --------------------------------------------------
+def rank_de_mascaras(masks):
+    """
+    Posição colexicográfica de cada máscara: soma de C(j, i) para cada número do jogo, onde j é a posição
+    do bit (número - 1) e i a ordem do número dentro do jogo (1 para o menor). A soma é feita em 5 consultas
+    a tabelas pré-calculadas, uma por grupo de 5 bits.
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    ranks = np.zeros(masks.shape, dtype=np.int64)
+    antes = np.zeros(masks.shape, dtype=np.int64)
+    for g in range(len(_RANK_GRUPOS)):
+        padrao = ((masks >> np.uint32(_BITS_GRUPO * g)) & (2**_BITS_GRUPO - 1)).astype(np.int64)
+        ranks += _RANK_GRUPOS[g, padrao, antes]
+        antes += _BITS_POR_PADRAO[padrao]
+    return ranks.astype(np.uint32)
+
+def tabela_mascaras(tamanho=15):
+    """Array com as máscaras de todas as combinações de `tamanho` números, em ordem colexicográfica."""
+    if tamanho not in _TABELAS_MASCARAS:
+        blocos = []
+        for inicio in range(0, 2**25, 2**22):
+            candidatos = np.arange(inicio, inicio + 2**22, dtype=np.uint32)
+            blocos.append(candidatos[popcount(candidatos) == tamanho])
+        _TABELAS_MASCARAS[tamanho] = np.concatenate(blocos)
+    return _TABELAS_MASCARAS[tamanho]
+
+def mascaras_de_rank(ranks, tamanho=15):
+    """Inverso de rank_de_mascaras: consulta direta à tabela de máscaras do tamanho (ver tabela_mascaras)."""
+    tabela = tabela_mascaras(tamanho)
+    ranks = np.asarray(ranks, dtype=np.int64)
+    if ranks.size and (ranks.min() < 0 or ranks.max() >= len(tabela)):
+        raise ValueError(f"Posição fora do intervalo das combinações de {tamanho} números.")
+    return tabela[ranks]
+
+def mascaras_de_jogos(jogos):
+    """
+    Converte jogos no array uint32 de máscaras. Aceita um array 1-D de máscaras, uma matriz 2-D
+    (n x tamanho) de números ou uma lista de jogos (listas de números de 1 a 25, de tamanhos quaisquer).
+
+    Um array 1-D é sempre lido como máscaras: em uint32 (o tipo das máscaras em todo o projeto) é usado
+    como está; em outro tipo inteiro, precisa ter valores de 25 bits com ao menos 15 bits ligados, o que
+    rejeita um único jogo passado como array de números (use uma matriz 1 x tamanho ou uma lista).
+    """
+    if isinstance(jogos, np.ndarray):
+        if jogos.ndim == 1:
+            if jogos.dtype == np.uint32:
+                return jogos
+            if len(jogos) and (jogos.dtype.kind not in "iu" or jogos.min() < 0 or jogos.max() >= 2**25
+                               or popcount(jogos.astype(np.uint32)).min() < 15):
+                raise ValueError("Array 1-D deve conter máscaras de jogos (inteiros de 25 bits com ao menos 15 números); "
+                                 "para números, use uma matriz (n x tamanho) ou uma lista de jogos.")
+            return jogos.astype(np.uint32, copy=False)
+        return mascaras(jogos.astype(np.int64))
+    return np.array([mascara_de_numeros(jogo) for jogo in jogos], dtype=np.uint32)
+
+def jogos_de_mascaras(masks):
+    """Converte máscaras na lista de jogos (listas ordenadas de números), aceitando tamanhos diferentes."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    tamanhos = popcount(masks)
+    if len(masks) and (tamanhos == tamanhos[0]).all():
+        return bolas_de_mascaras(masks, int(tamanhos[0])).tolist()
+    return [numeros_de_mascara(mascara) for mascara in masks]
+
+# --------------------------------------------------
+# GRAVAÇÃO EM FLUXO
+# --------------------------------------------------
+def _abrir(origem, modo):
+    """Abre um caminho ou usa o objeto de arquivo binário recebido. Retorna (arquivo, se deve ser fechado aqui)."""
+    if isinstance(origem, (str, os.PathLike)):
+        return open(origem, modo), True
+    return origem, False
+
+class EscritorApostas:
+    """
+    Grava um arquivo de apostas bloco a bloco, sem precisar conhecer a quantidade total de jogos de antemão:
+    a quantidade e o CRC32 são acumulados durante a gravação e escritos no cabeçalho ao fechar.
+
+    Exemplo:
+        with EscritorApostas("jogos.apostas", metadados={"modelo": "markov"}) as escritor:
+            for bloco in blocos_de_mascaras:
+                escritor.escrever(bloco)
+    """
+
+    def __init__(self, destino, codificacao="mascara", tamanho=15, metadados=None):
+        """
+        Parâmetros:
+          destino     : Caminho do arquivo ou objeto de arquivo binário gravável e posicionável (ex.: io.BytesIO).
+          codificacao : "mascara" ou "rank" (ver o formato no início do módulo).
+          tamanho     : Quantidade de números por jogo (obrigatória na codificação "rank").
+          metadados   : Dicionário serializável em JSON gravado no cabeçalho (modelo, concurso, semente...).
+        """
+        if codificacao not in CODIFICACOES:
+            raise ValueError(f"Codificação inválida! Escolha entre: {', '.join(CODIFICACOES)}.")
+        self.codificacao = codificacao
+        self.tamanho = tamanho
+        self.quantidade = 0
+        self.crc = 0
+        self.metadados = json.dumps(metadados or {}, ensure_ascii=False).encode("utf-8")
+        self.deslocamento = -(-(_CABECALHO.size + len(self.metadados)) // _ALINHAMENTO) * _ALINHAMENTO
+
+        self.arquivo, self._fechar_arquivo = _abrir(destino, "wb")
+        self.inicio = self.arquivo.tell()
+        self._escrever_cabecalho()
+        self.arquivo.write(self.metadados)
+        self.arquivo.write(b"\0" * (self.deslocamento - _CABECALHO.size - len(self.metadados)))
+
+    def _escrever_cabecalho(self):
+        self.arquivo.write(_CABECALHO.pack(
+            ASSINATURA, VERSAO, CODIFICACOES[self.codificacao], self.tamanho, self.quantidade,
+            self.crc, len(self.metadados), self.deslocamento, 0,
+        ))
+
+    def escrever(self, jogos):
+        """Acrescenta um bloco de jogos (ver mascaras_de_jogos para os formatos aceitos)."""
+        masks = mascaras_de_jogos(jogos)
+        if len(masks) == 0:
+            return
+        tamanhos = popcount(masks)
+        if self.codificacao == "rank":
+            if (tamanhos != self.tamanho).any():
+                raise ValueError(f"A codificação 'rank' exige jogos de exatamente {self.tamanho} números.")
+            registros = rank_de_mascaras(masks)
+        else:
+            if (tamanhos != self.tamanho).any():
+                self.tamanho = 0  # Jogos de tamanhos diferentes
+            registros = masks
+        dados = registros.astype(_REGISTRO, copy=False).tobytes()
+        self.crc = zlib.crc32(dados, self.crc)
+        self.quantidade += len(registros)
+        self.arquivo.write(dados)
+
+    def fechar(self):
+        """Grava a quantidade e o CRC32 finais no cabeçalho e fecha o arquivo (se foi aberto aqui)."""
+        fim = self.arquivo.tell()
+        self.arquivo.seek(self.inicio)
+        self._escrever_cabecalho()
+        self.arquivo.seek(fim)
+        if self._fechar_arquivo:
+            self.arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+def salvar_apostas(destino, jogos, codificacao="mascara", tamanho=15, metadados=None):
+    """Grava de uma vez um conjunto de jogos em um arquivo de apostas. Retorna a quantidade gravada."""
+    with EscritorApostas(destino, codificacao, tamanho, metadados) as escritor:
+        for inicio in range(0, len(jogos), TAMANHO_BLOCO):
+            escritor.escrever(jogos[inicio:inicio + TAMANHO_BLOCO])
+    return escritor.quantidade
+
+# --------------------------------------------------
+# LEITURA (EM FLUXO, COMPLETA E MAPEADA EM MEMÓRIA)
+# --------------------------------------------------
+def _ler_cabecalho_aberto(arquivo):
+    """Lê o cabeçalho e os metadados de um arquivo aberto; o arquivo fica posicionado nos registros."""
+    inicio = arquivo.tell()
+    bruto = arquivo.read(_CABECALHO.size)
+    if len(bruto) < _CABECALHO.size:
+        raise ValueError("Arquivo de apostas inválido: cabeçalho incompleto.")
+    assinatura, versao, codificacao, tamanho, quantidade, crc, bytes_metadados, deslocamento, _ = _CABECALHO.unpack(bruto)
+    if assinatura != ASSINATURA:
+        raise ValueError("Arquivo de apostas inválido: assinatura não reconhecida.")
+    if versao > VERSAO:
+        raise ValueError(f"Versão {versao} do arquivo de apostas não suportada (máximo {VERSAO}).")
+    nomes = {codigo: nome for nome, codigo in CODIFICACOES.items()}
+    if codificacao not in nomes:
+        raise ValueError(f"Codificação {codificacao} desconhecida no arquivo de apostas.")
+    metadados = json.loads(arquivo.read(bytes_metadados).decode("utf-8"))
+    arquivo.seek(inicio + deslocamento)
+    return {
+        "versao": versao,
+        "codificacao": nomes[codificacao],
+        "tamanho": tamanho,
+        "quantidade": quantidade,
+        "crc32": crc,
+        "metadados": metadados,
+        "deslocamento": deslocamento,
+    }
+
+def ler_cabecalho(origem):
+    """
+    Lê o cabeçalho de um arquivo de apostas (caminho ou objeto de arquivo), sem ler os registros.
+
+    Retorna:
+      Dicionário com versao, codificacao, tamanho (0 se variável), quantidade, crc32, metadados e deslocamento.
+    """
+    arquivo, fechar = _abrir(origem, "rb")
+    try:
+        return _ler_cabecalho_aberto(arquivo)
+    finally:
+        if fechar:
+            arquivo.close()
+
+def decodificar_registros(registros, cabecalho):
+    """Converte registros lidos do arquivo (máscaras ou posições) no array de máscaras."""
+    if cabecalho["codificacao"] == "rank":
+        return mascaras_de_rank(registros, cabecalho["tamanho"])
+    return np.asarray(registros, dtype=np.uint32)
+
+def ler_apostas_em_blocos(origem, tamanho_bloco=TAMANHO_BLOCO, verificar=True):
+    """
+    Lê um arquivo de apostas em blocos de até `tamanho_bloco` jogos, sem carregá-lo inteiro na memória.
+
+    Parâmetros:
+      verificar : Confere o CRC32 e a quantidade ao fim da leitura (ValueError se o arquivo estiver corrompido).
+
+    Retorna:
+      Gerador de arrays uint32 de máscaras.
+    """
+    arquivo, fechar = _abrir(origem, "rb")
+    try:
+        cabecalho = _ler_cabecalho_aberto(arquivo)
+        crc = 0
+        restantes = cabecalho["quantidade"]
+        while restantes > 0:
+            dados = arquivo.read(min(tamanho_bloco, restantes) * _REGISTRO.itemsize)
+            if not dados:
+                break
+            if verificar:
+                crc = zlib.crc32(dados, crc)
+            registros = np.frombuffer(dados, dtype=_REGISTRO, count=len(dados) // _REGISTRO.itemsize)
+            restantes -= len(registros)
+            yield decodificar_registros(registros, cabecalho)
+        if verificar and (restantes != 0 or crc != cabecalho["crc32"]):
+            raise ValueError("Arquivo de apostas corrompido: quantidade ou CRC32 não confere.")
+    finally:
+        if fechar:
+            arquivo.close()
+
+def carregar_apostas(origem, verificar=True):
+    """
+    Carrega todos os jogos de um arquivo de apostas de uma só vez (cópia direta do disco com np.fromfile).
+
+    Retorna:
+      Tupla (máscaras uint32, cabeçalho), ver ler_cabecalho.
+    """
+    arquivo, fechar = _abrir(origem, "rb")
+    try:
+        cabecalho = _ler_cabecalho_aberto(arquivo)
+        if fechar:
+            registros = np.fromfile(arquivo, dtype=_REGISTRO, count=cabecalho["quantidade"])
+        else:
+            dados = arquivo.read(cabecalho["quantidade"] * _REGISTRO.itemsize)
+            registros = np.frombuffer(dados, dtype=_REGISTRO, count=len(dados) // _REGISTRO.itemsize)
+    finally:
+        if fechar:
+            arquivo.close()
+    if verificar and (len(registros) != cabecalho["quantidade"] or zlib.crc32(registros) != cabecalho["crc32"]):
+        raise ValueError("Arquivo de apostas corrompido: quantidade ou CRC32 não confere.")
+    return decodificar_registros(registros, cabecalho), cabecalho
+
+class ApostasMapeadas:
+    """
+    Acesso aleatório aos jogos de um arquivo de apostas mapeado em memória (np.memmap): apenas as páginas
+    dos jogos consultados são lidas do disco, e cada acesso devolve máscaras uint32.
+
+    Exemplo:
+        apostas = ApostasMapeadas("jogos.apostas")
+        bolas_de_mascaras(apostas[1000:1010])   # números dos jogos 1000 a 1009
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.cabecalho = ler_cabecalho(caminho)
+        quantidade = self.cabecalho["quantidade"]
+        if quantidade:
+            self.registros = np.memmap(caminho, dtype=_REGISTRO, mode="r", offset=self.cabecalho["deslocamento"], shape=(quantidade,))
+        else:
+            self.registros = np.empty(0, dtype=_REGISTRO)
+
+    def __len__(self):
+        return len(self.registros)
+
+    def __getitem__(self, indice):
+        return decodificar_registros(self.registros[indice], self.cabecalho)
+
+    def jogos(self, inicio=0, fim=None):
+        """Números (matriz n x tamanho) dos jogos no intervalo [inicio, fim); exige jogos do mesmo tamanho."""
+        if not self.cabecalho["tamanho"]:
+            raise ValueError("O arquivo tem jogos de tamanhos diferentes; use as máscaras diretamente.")
+        return bolas_de_mascaras(self[inicio:fim], self.cabecalho["tamanho"])
+
+    def verificar(self):
+        """Confere o CRC32 dos registros."""
+        return zlib.crc32(self.registros) == self.cabecalho["crc32"]
+
+# --------------------------------------------------
+# CONVERSÃO PARA BYTES (ARMAZENAMENTO NO BANCO)
+# --------------------------------------------------
+def apostas_para_bytes(jogos, codificacao="mascara", tamanho=15, metadados=None):
+    """Serializa um conjunto de jogos no formato de arquivo de apostas, em memória."""
+    buffer = io.BytesIO()
+    salvar_apostas(buffer, jogos, codificacao, tamanho, metadados)
+    return buffer.getvalue()
+
+def apostas_de_bytes(dados, verificar=True):
+    """Inverso de apostas_para_bytes. Retorna (máscaras uint32, cabeçalho)."""
+    return carregar_apostas(io.BytesIO(dados), verificar)
+
+if __name__ == "__main__":
+    # Teste do módulo: grava e lê 10 milhões de jogos aleatórios, medindo tamanho e tempo
+    import time
+
+    caminho = "data/jogos_teste" + EXTENSAO
+    rng = np.random.default_rng(42)
+    masks = np.array([mascara_de_numeros(rng.choice(np.arange(1, 26), 15, replace=False)) for _ in range(1000)], dtype=np.uint32)
+    masks = np.tile(masks, 10_000)
+
+    for codificacao in CODIFICACOES:
+        inicio = time.time()
+        salvar_apostas(caminho, masks, codificacao, metadados={"teste": True})
+        tempo_gravacao = time.time() - inicio
+        inicio = time.time()
+        lidas, cabecalho = carregar_apostas(caminho)
+        tempo_leitura = time.time() - inicio
+        assert (lidas == masks).all()
+        print(f"💾 {codificacao}: {len(masks):,} jogos em {os.path.getsize(caminho) / len(masks):.2f} bytes/jogo | "
+              f"gravação {tempo_gravacao:.2f}s | leitura {tempo_leitura:.2f}s")
+    os.remove(caminho)
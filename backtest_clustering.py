@@ -1,48 +1,56 @@
 import pandas as pd
 from sklearn.cluster import KMeans
 import numpy as np
+from binario import mascaras, numeros_de_mascara
+from clustering import clusterizar_mascaras, distancias_mascaras
+from significancia import imprimir_significancia
+from backtest_iterativo import iterar_backtest
 
-def backtest_clustering(df, num_sorteios=100, meta_acertos=11, num_clusters=10):
-    """Executa backtest baseado em agrupamento de números (Clustering) usando K-Means."""
-    
-    # Ordenar pelo número do concurso
-    df = df.sort_values(by="Concurso", ascending=True)
-    
-    # Definir as colunas dos números sorteados
+def prever_clustering(df_treino, df_teste=None, num_clusters=10, algoritmo="kmeans", metrica="jaccard"):
+    """
+    Aplica K-Means sobre o histórico de treino e retorna os 15 números preditos.
+    Com algoritmo "kmodes" ou "kmedoids", agrupa as máscaras de bits dos sorteios e retorna o centro
+    (uma combinação real) do cluster mais próximo do último sorteio de treino.
+    Retorna None quando não há sorteios suficientes para formar os clusters.
+    """
     colunas_numeros = [f"Bola{i}" for i in range(1, 16)]
+
+    # Garantindo que temos dados suficientes para aplicar clustering
+    if len(df_treino) < num_clusters:
+        return None
+
+    if algoritmo != "kmeans":
+        masks = mascaras(df_treino)
+        _, centros = clusterizar_mascaras(masks, num_clusters, algoritmo=algoritmo, metrica=metrica)
+        mais_proximo = np.argmin(distancias_mascaras(masks[-1:], centros, metrica)[0])
+        return set(numeros_de_mascara(centros[mais_proximo]))
+
+    # Convertendo números sorteados para matriz numérica
+    matriz_treino = df_treino[colunas_numeros].values
+
+    # Aplicar K-Means para identificar padrões
+    kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
+    kmeans.fit(matriz_treino)
+
+    # Selecionar os números dos centroides mais comuns
+    centroides = kmeans.cluster_centers_.astype(int)
+    numeros_preditos = set(np.unique(centroides.flatten()))  # Pegamos os números agrupados
+
+    # Reduzindo para apenas **15 números** preditos
+    return set(sorted(numeros_preditos)[:15])
+
+def backtest_clustering(df, num_sorteios=100, meta_acertos=11, num_clusters=10, algoritmo="kmeans", metrica="jaccard"):
+    """Executa backtest baseado em agrupamento de números (Clustering) usando K-Means, k-modes ou k-medoids."""
     
     acertos_por_sorteio = []
 
-    for i in range(len(df) - num_sorteios, len(df)):  # Últimos `num_sorteios` concursos
-        df_treino = df.iloc[:i]  # Usa somente sorteios anteriores até `i`
-        df_teste = df.iloc[i]  # Usa o sorteio atual como teste
-        
-        # Garantindo que temos dados suficientes para aplicar clustering
-        if len(df_treino) < num_clusters:
+    # Cada passo (treino apenas com os sorteios anteriores) é entregue por iterar_backtest assim que termina
+    for resultado in iterar_backtest(df, prever_clustering, num_sorteios, num_clusters=num_clusters, algoritmo=algoritmo, metrica=metrica):
+        if resultado["acertos"] is None:
             continue
-        
-        # Convertendo números sorteados para matriz numérica
-        matriz_treino = df_treino[colunas_numeros].values
-        
-        # Aplicar K-Means para identificar padrões
-        kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
-        kmeans.fit(matriz_treino)
-        
-        # Selecionar os números dos centroides mais comuns
-        centroides = kmeans.cluster_centers_.astype(int)
-        numeros_preditos = set(np.unique(centroides.flatten()))  # Pegamos os números agrupados
-        
-        # Reduzindo para apenas **15 números** preditos
-        numeros_preditos = set(sorted(numeros_preditos)[:15])
-        
-        # Números reais do sorteio atual
-        numeros_reais = set(df_teste[colunas_numeros].values)
-        
-        # Contar acertos
-        acertos = len(numeros_preditos.intersection(numeros_reais))
-        acertos_por_sorteio.append(acertos)
-
-        print(f"🎯 Sorteio {df_teste['Concurso']}: {acertos} acertos")
+        acertos_por_sorteio.append(resultado["acertos"])
+
+        print(f"🎯 Sorteio {resultado['concurso']}: {resultado['acertos']} acertos")
     
     # Estatísticas gerais
     acertos_medio = sum(acertos_por_sorteio) / len(acertos_por_sorteio)
@@ -51,11 +59,13 @@ def backtest_clustering(df, num_sorteios=100, meta_acertos=11, num_clusters=10):
     print("\n📊 **Resultados do Backtest (Clustering)**")
     print(f"- Média de acertos por sorteio: {acertos_medio:.2f}")
     print(f"- Sorteios com >= {meta_acertos} acertos: {acertos_acima_meta}/{num_sorteios}")
+    imprimir_significancia(acertos_por_sorteio, meta_acertos)
 
     return acertos_por_sorteio
 
-# Carregar dados do histórico de sorteios
-df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
+if __name__ == "__main__":
+    # Carregar dados do histórico de sorteios
+    df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
 
-# Rodar o backtest
-backtest_clustering(df)
\ No newline at end of file
+    # Rodar o backtest
+    backtest_clustering(df)
\ No newline at end of file
@@ -0,0 +1,107 @@
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from recursos import inicializar_worker, numero_workers
+from significancia import resumo_significancia
+
+# --------------------------------------------------
+# BACKTEST COMO GERADOR DE RESULTADOS POR SORTEIO
+# --------------------------------------------------
+_df_worker = None
+
+def _inicializar_worker(df):
+    """Guarda o histórico ordenado no processo, para não reenviá-lo a cada passo."""
+    global _df_worker
+    _df_worker = df
+
+def _avaliar_passo(df, prever, i, parametros):
+    """Treina com os sorteios anteriores a i, prevê o sorteio i e conta os acertos."""
+    colunas_numeros = [f"Bola{k}" for k in range(1, 16)]
+    inicio = time.perf_counter()
+    df_teste = df.iloc[i]
+    numeros_preditos = prever(df.iloc[:i], df_teste, **parametros)
+    numeros_reais = set(int(n) for n in df_teste[colunas_numeros].values)
+    return {
+        "concurso": int(df_teste["Concurso"]),
+        "preditos": None if numeros_preditos is None else sorted(int(n) for n in numeros_preditos),
+        "acertos": None if numeros_preditos is None else len(set(int(n) for n in numeros_preditos) & numeros_reais),
+        "tempo": time.perf_counter() - inicio,
+    }
+
+def _avaliar_passo_worker(prever, i, parametros):
+    return _avaliar_passo(_df_worker, prever, i, parametros)
+
+# Passos em andamento por processo do pool: o suficiente para nenhum processo ficar ocioso entre um
+# resultado e o próximo envio, sem enfileirar o backtest inteiro de uma vez
+PASSOS_POR_WORKER = 2
+
+def iterar_backtest(df, prever, num_sorteios=100, max_workers=1, parar=None, **parametros):
+    """
+    Executa um backtest walk-forward entregando o resultado de cada sorteio assim que ele termina,
+    em ordem de concurso. Interromper a iteração (break, fechar o gerador ou `parar`) encerra o
+    backtest, e os resultados já entregues continuam válidos.
+
+    Parâmetros:
+      df          : DataFrame com o histórico (colunas "Concurso" e "Bola1" a "Bola15").
+      prever      : Função prever_<modelo>(df_treino, df_teste, **parametros) dos módulos backtest_*.
+      num_sorteios: Quantidade de concursos finais avaliados.
+      max_workers : Processos usados para adiantar os passos seguintes (1 executa no próprio processo;
+                    None usa recursos.numero_workers). No máximo PASSOS_POR_WORKER passos por processo
+                    ficam em andamento; os não iniciados são cancelados ao parar.
+      parar       : Função sem argumentos (por exemplo, threading.Event().is_set) consultada antes de
+                    iniciar cada passo; quando retorna True, nenhum passo novo é iniciado.
+      parametros  : Parâmetros repassados a `prever`.
+
+    Retorna:
+      Gerador de dicionários com concurso, preditos, acertos (None quando o modelo não tem dados
+      suficientes) e tempo de cálculo do passo em segundos.
+    """
+    df = df.sort_values(by="Concurso", ascending=True).reset_index(drop=True)
+    passos = range(max(len(df) - num_sorteios, 0), len(df))
+    max_workers = max_workers or numero_workers(len(passos))
+    parar = parar or (lambda: False)
+
+    if max_workers == 1:
+        for i in passos:
+            if parar():
+                return
+            yield _avaliar_passo(df, prever, i, parametros)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=max_workers, initializer=inicializar_worker, initargs=(max_workers, _inicializar_worker, df))
+    try:
+        pendentes = iter(passos)
+        em_andamento = deque()
+        while True:
+            # Completa a janela de passos em andamento, a menos que a parada tenha sido pedida
+            while len(em_andamento) < max_workers * PASSOS_POR_WORKER and not parar():
+                i = next(pendentes, None)
+                if i is None:
+                    break
+                em_andamento.append(pool.submit(_avaliar_passo_worker, prever, i, parametros))
+            if not em_andamento or parar():
+                return
+            yield em_andamento.popleft().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def estatisticas_parciais(acertos, meta_acertos=11):
+    """
+    Estatísticas acumuladas de um backtest em andamento: média, taxa >= meta_acertos e valores-p
+    exatos frente ao acaso (ver significancia.resumo_significancia).
+
+    Retorna:
+      Dicionário com sorteios, media_acertos, taxa_meta, p_valor_media e p_valor_meta (None se vazio).
+    """
+    acertos = [a for a in acertos if a is not None]
+    if not acertos:
+        return None
+    resumo = resumo_significancia(acertos, meta_acertos).iloc[0]
+    return {
+        "sorteios": int(resumo["sorteios"]),
+        "media_acertos": float(resumo["media_acertos"]),
+        "taxa_meta": float(resumo["taxa_meta"]),
+        "p_valor_media": float(resumo["p_valor_media"]),
+        "p_valor_meta": float(resumo["p_valor_meta"]),
+    }
@@ -0,0 +1,51 @@
+import pandas as pd
+import numpy as np
+from binario import matriz_binaria
+from markov import pontuacao_transicao, pontuacoes_lote
+from significancia import imprimir_significancia
+
+def prever_markov(df_treino, df_teste=None, k=1, janela=None):
+    """Retorna os 15 números com maior probabilidade de transição a partir dos últimos k sorteios do treino."""
+    if len(df_treino) < 2:
+        return None
+    pontuacao = pontuacao_transicao(matriz_binaria(df_treino), k=k, janela=janela)
+    return set(int(n) + 1 for n in np.argsort(-pontuacao, kind="stable")[:15])
+
+def backtest_markov(df, num_sorteios=100, meta_acertos=11, k=1, janela=None):
+    """
+    Executa backtest walk-forward do preditor de transição (Markov).
+    Todas as pontuações históricas são calculadas de uma vez com markov.pontuacoes_lote,
+    sem retreinar a cada sorteio.
+    """
+
+    # Ordenar pelo número do concurso
+    df = df.sort_values(by="Concurso", ascending=True)
+
+    binario = matriz_binaria(df)
+    pontuacoes = pontuacoes_lote(binario, k=k, janela=janela)[-num_sorteios:]
+    reais = binario[-num_sorteios:]
+
+    # Selecionar os 15 números mais prováveis de cada passo e contar os acertos de uma só vez
+    preditos = np.argsort(-pontuacoes, axis=1, kind="stable")[:, :15]
+    acertos_por_sorteio = np.take_along_axis(reais, preditos, axis=1).sum(axis=1).tolist()
+
+    for concurso, acertos in zip(df["Concurso"].iloc[-num_sorteios:], acertos_por_sorteio):
+        print(f"🎯 Sorteio {concurso}: {acertos} acertos")
+
+    # Estatísticas gerais
+    acertos_medio = sum(acertos_por_sorteio) / len(acertos_por_sorteio)
+    acertos_acima_meta = sum(a >= meta_acertos for a in acertos_por_sorteio)
+
+    print("\n📊 **Resultados do Backtest (Markov)**")
+    print(f"- Média de acertos por sorteio: {acertos_medio:.2f}")
+    print(f"- Sorteios com >= {meta_acertos} acertos: {acertos_acima_meta}/{num_sorteios}")
+    imprimir_significancia(acertos_por_sorteio, meta_acertos)
+
+    return acertos_por_sorteio
+
+if __name__ == "__main__":
+    # Carregar dados do histórico de sorteios
+    df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
+
+    # Rodar o backtest
+    backtest_markov(df)
\ No newline at end of file
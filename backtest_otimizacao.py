@@ -0,0 +1,46 @@
+import pandas as pd
+from predicao import combinacoes_otimizadas
+from significancia import imprimir_significancia
+from backtest_iterativo import iterar_backtest
+
+def prever_otimizacao(df_treino, df_teste=None, metodo_pontuacao="frequencia", peso_pares=1.0, busca="feixe"):
+    """
+    Retorna a combinação de 15 números de maior valor conjunto (pontuação do método escolhido mais
+    termos de par de co-ocorrência), calculada apenas com o histórico de treino.
+    Retorna None quando há menos de 2 sorteios de treino.
+    """
+    if len(df_treino) < 2:
+        return None
+    numeros, _ = combinacoes_otimizadas(df_treino, metodo_pontuacao, peso_pares, n_combinacoes=1, busca=busca)[0]
+    return set(numeros)
+
+def backtest_otimizacao(df, num_sorteios=100, meta_acertos=11, metodo_pontuacao="frequencia", peso_pares=1.0, busca="feixe"):
+    """Executa backtest walk-forward da otimização de combinações (termos por número e por par)."""
+    
+    acertos_por_sorteio = []
+
+    # Cada passo (treino apenas com os sorteios anteriores) é entregue por iterar_backtest assim que termina
+    for resultado in iterar_backtest(df, prever_otimizacao, num_sorteios, metodo_pontuacao=metodo_pontuacao, peso_pares=peso_pares, busca=busca):
+        if resultado["acertos"] is None:
+            continue
+        acertos_por_sorteio.append(resultado["acertos"])
+
+        print(f"🎯 Sorteio {resultado['concurso']}: {resultado['acertos']} acertos")
+    
+    # Estatísticas gerais
+    acertos_medio = sum(acertos_por_sorteio) / len(acertos_por_sorteio)
+    acertos_acima_meta = sum(a >= meta_acertos for a in acertos_por_sorteio)
+
+    print("\n📊 **Resultados do Backtest (Otimização de Combinações)**")
+    print(f"- Média de acertos por sorteio: {acertos_medio:.2f}")
+    print(f"- Sorteios com >= {meta_acertos} acertos: {acertos_acima_meta}/{num_sorteios}")
+    imprimir_significancia(acertos_por_sorteio, meta_acertos)
+
+    return acertos_por_sorteio
+
+if __name__ == "__main__":
+    # Carregar dados do histórico de sorteios
+    df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
+
+    # Rodar o backtest
+    backtest_otimizacao(df)
@@ -0,0 +1,45 @@
+import pandas as pd
+from predicao import PONTUACOES, selecionar_numeros
+from significancia import imprimir_significancia
+from backtest_iterativo import iterar_backtest
+
+def prever_pontuacao(df_treino, df_teste=None, metodo="frequencia", **parametros):
+    """
+    Retorna os 15 números de maior pontuação segundo predicao.PONTUACOES[metodo], calculada apenas com o
+    histórico de treino: é exatamente o preditor usado por predicao.predicao_<metodo> e pelo ensemble.
+    Retorna None quando há menos de 2 sorteios de treino.
+    """
+    if len(df_treino) < 2:
+        return None
+    return set(selecionar_numeros(PONTUACOES[metodo](df_treino, **parametros)))
+
+def backtest_pontuacao(df, num_sorteios=100, meta_acertos=11, metodo="frequencia", **parametros):
+    """Executa backtest walk-forward de uma função de pontuação de predicao.py com os parâmetros informados."""
+
+    acertos_por_sorteio = []
+
+    # Cada passo (treino apenas com os sorteios anteriores) é entregue por iterar_backtest assim que termina
+    for resultado in iterar_backtest(df, prever_pontuacao, num_sorteios, metodo=metodo, **parametros):
+        if resultado["acertos"] is None:
+            continue
+        acertos_por_sorteio.append(resultado["acertos"])
+
+        print(f"🎯 Sorteio {resultado['concurso']}: {resultado['acertos']} acertos")
+
+    # Estatísticas gerais
+    acertos_medio = sum(acertos_por_sorteio) / len(acertos_por_sorteio)
+    acertos_acima_meta = sum(a >= meta_acertos for a in acertos_por_sorteio)
+
+    print(f"\n📊 **Resultados do Backtest (Pontuação: {metodo})**")
+    print(f"- Média de acertos por sorteio: {acertos_medio:.2f}")
+    print(f"- Sorteios com >= {meta_acertos} acertos: {acertos_acima_meta}/{num_sorteios}")
+    imprimir_significancia(acertos_por_sorteio, meta_acertos)
+
+    return acertos_por_sorteio
+
+if __name__ == "__main__":
+    # Carregar dados do histórico de sorteios
+    df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
+
+    # Rodar o backtest
+    backtest_pontuacao(df, metodo="frequencia")
@@ -2,48 +2,52 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import MultiLabelBinarizer
+from significancia import imprimir_significancia
+from backtest_iterativo import iterar_backtest
+from recursos import n_jobs
+
+def prever_randomforest(df_treino, df_teste, n_estimators=200, max_depth=10):
+    """
+    Treina um RandomForest com o histórico de treino e retorna os 15 números mais
+    prováveis para o concurso de teste. Retorna None quando há menos de 50 sorteios de treino.
+    """
+    colunas_numeros = [f"Bola{i}" for i in range(1, 16)]
+
+    if len(df_treino) < 50:  # Garante dados mínimos para treinar RandomForest
+        return None
+
+    # Sorteios em formato binário: o sorteio anterior é a entrada e o seguinte é a saída
+    mlb = MultiLabelBinarizer(classes=np.arange(1, 26))
+    binario = mlb.fit_transform(df_treino[colunas_numeros].values)
+    X = binario[:-1]
+    y = binario[1:]
+
+    # Treinar o modelo RandomForest com ajustes para melhorar a predição
+    rf = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, random_state=42, n_jobs=n_jobs())
+    rf.fit(X, y)
+
+    # Predição para o concurso atual a partir do último sorteio conhecido
+    X_teste = binario[-1:]
+    previsao_prob = np.array([
+        p[0][list(classes).index(1)] if 1 in classes else 0.0
+        for p, classes in zip(rf.predict_proba(X_teste), rf.classes_)
+    ])
+
+    # Selecionar os 15 números mais prováveis
+    return set((np.argsort(previsao_prob)[-15:] + 1).astype(int))
 
 def backtest_randomforest(df, num_sorteios=100, meta_acertos=11, n_estimators=200, max_depth=10):
     """Executa backtest usando RandomForest para prever números da Lotofácil."""
     
-    # Ordenar pelo número do concurso
-    df = df.sort_values(by="Concurso", ascending=True)
-    
-    # Definir as colunas dos números sorteados
-    colunas_numeros = [f"Bola{i}" for i in range(1, 16)]
-    
     acertos_por_sorteio = []
 
-    for i in range(len(df) - num_sorteios, len(df)):  # Últimos `num_sorteios` concursos
-        df_treino = df.iloc[:i]  # Usa apenas sorteios anteriores
-        df_teste = df.iloc[i]  # Usa o sorteio atual como teste
-        
-        if len(df_treino) < 50:  # Garante dados mínimos para treinar RandomForest
+    # Cada passo (treino apenas com os sorteios anteriores) é entregue por iterar_backtest assim que termina
+    for resultado in iterar_backtest(df, prever_randomforest, num_sorteios, n_estimators=n_estimators, max_depth=max_depth):
+        if resultado["acertos"] is None:
             continue
-        
-        # Criar matriz de frequência dos números sorteados como entrada para o modelo
-        X = df_treino[colunas_numeros].melt()["value"].value_counts().reindex(range(1, 26), fill_value=0).values.reshape(1, -1)
-        y = df_treino[colunas_numeros].values  # Saída: números sorteados diretamente
-        
-        # Treinar o modelo RandomForest com ajustes para melhorar a predição
-        rf = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, random_state=42)
-        rf.fit(X, y)
-        
-        # Predição para o concurso atual
-        X_teste = df_teste[colunas_numeros].melt()["value"].value_counts().reindex(range(1, 26), fill_value=0).values.reshape(1, -1)
-        previsao_prob = np.array(rf.predict_proba(X_teste))[0][:25]  # Apenas números de 1 a 25
-        
-        # Selecionar os 15 números mais prováveis
-        numeros_preditos = set((np.argsort(previsao_prob)[-15:] + 1).astype(int))
-
-        # Números sorteados no concurso real
-        numeros_reais = set(df_teste[colunas_numeros].values)
-
-        # Calcular acertos
-        acertos = len(numeros_preditos.intersection(numeros_reais))
-        acertos_por_sorteio.append(acertos)
-
-        print(f"🎯 Sorteio {df_teste['Concurso']}: {acertos} acertos")
+        acertos_por_sorteio.append(resultado["acertos"])
+
+        print(f"🎯 Sorteio {resultado['concurso']}: {resultado['acertos']} acertos")
     
     # Estatísticas gerais
     acertos_medio = sum(acertos_por_sorteio) / len(acertos_por_sorteio)
@@ -52,11 +56,13 @@ def backtest_randomforest(df, num_sorteios=100, meta_acertos=11, n_estimators=20
     print("\n📊 **Resultados do Backtest (RandomForest)**")
     print(f"- Média de acertos por sorteio: {acertos_medio:.2f}")
     print(f"- Sorteios com >= {meta_acertos} acertos: {acertos_acima_meta}/{num_sorteios}")
+    imprimir_significancia(acertos_por_sorteio, meta_acertos)
 
     return acertos_por_sorteio
 
-# Carregar dados do histórico de sorteios
-df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
+if __name__ == "__main__":
+    # Carregar dados do histórico de sorteios
+    df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
 
-# Rodar o backtest
-backtest_randomforest(df)
\ No newline at end of file
+    # Rodar o backtest
+    backtest_randomforest(df)
\ No newline at end of file
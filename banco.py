@@ -1,27 +1,70 @@
 import sqlite3
 import json
 import datetime
+import uuid
+
+from arquivo_apostas import apostas_de_bytes, apostas_para_bytes, carregar_apostas, jogos_de_mascaras, mascaras_de_jogos, salvar_apostas
 
 # 📌 Função auxiliar para conectar ao banco
 def conectar_banco():
     return sqlite3.connect("lotofacil.db")
 
 ### **1. Criar tabela para grupos de apostas**
+# As apostas de cada grupo ficam em um BLOB no formato binário de arquivo_apostas.py (4 bytes por jogo,
+# ver apostas_para_bytes); a sugestão gerada continua em JSON.
+ESQUEMA_GRUPOS = """
+    CREATE TABLE IF NOT EXISTS {tabela} (
+        id_grupo TEXT PRIMARY KEY,
+        data_geracao TEXT NOT NULL,
+        sorteio_vinculado INTEGER NOT NULL,
+        modelo_utilizado TEXT NOT NULL,
+        sugestao_gerada TEXT NOT NULL,
+        apostas_sugeridas BLOB NOT NULL
+    )
+"""
+
+def migrar_apostas_para_blob(conexao):
+    """
+    Migra bancos criados com apostas_sugeridas TEXT (apostas em JSON): recria a tabela com a coluna BLOB
+    e converte as apostas de cada grupo para o formato binário. Grupos sem modelo_utilizado (valor nulo ou
+    tabela criada antes dessa coluna) ficam com "Não informado". Não faz nada se a coluna já é BLOB.
+    """
+    cursor = conexao.cursor()
+    colunas = {coluna[1]: coluna[2] for coluna in cursor.execute("PRAGMA table_info(GruposApostas)")}
+    if colunas.get("apostas_sugeridas", "BLOB").upper() == "BLOB":
+        return
+    
+    # Tabelas anteriores à coluna modelo_utilizado não a possuem
+    modelo = "COALESCE(modelo_utilizado, 'Não informado')" if "modelo_utilizado" in colunas else "'Não informado'"
+    
+    print("🔄 Migrando GruposApostas: apostas_sugeridas TEXT (JSON) -> BLOB (formato binário)...")
+    cursor.execute("DROP TABLE IF EXISTS GruposApostas_migracao")
+    cursor.execute(ESQUEMA_GRUPOS.format(tabela="GruposApostas_migracao"))
+    cursor.execute(f"""
+        INSERT INTO GruposApostas_migracao
+        SELECT id_grupo, data_geracao, sorteio_vinculado, {modelo}, sugestao_gerada, apostas_sugeridas
+        FROM GruposApostas
+    """)
+    legados = cursor.execute("SELECT id_grupo, apostas_sugeridas FROM GruposApostas_migracao WHERE typeof(apostas_sugeridas) = 'text'").fetchall()
+    cursor.executemany(
+        "UPDATE GruposApostas_migracao SET apostas_sugeridas = ? WHERE id_grupo = ?",
+        [(apostas_para_bytes(mascaras_de_jogos(json.loads(apostas))), id_grupo) for id_grupo, apostas in legados]
+    )
+    cursor.execute("DROP TABLE GruposApostas")
+    cursor.execute("ALTER TABLE GruposApostas_migracao RENAME TO GruposApostas")
+    print(f"✅ Migração concluída: {len(legados)} grupo(s) convertido(s).")
+
 def criar_tabela_grupos():
     """Cria a tabela de grupos de apostas no banco, incluindo novo campo modelo_utilizado."""
     conexao = conectar_banco()
     cursor = conexao.cursor()
     
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS GruposApostas (
-            id_grupo TEXT PRIMARY KEY,
-            data_geracao TEXT NOT NULL,
-            sorteio_vinculado INTEGER NOT NULL,
-            modelo_utilizado TEXT NOT NULL,
-            sugestao_gerada TEXT NOT NULL,
-            apostas_sugeridas TEXT NOT NULL
-        )
-    """)
+    cursor.execute(ESQUEMA_GRUPOS.format(tabela="GruposApostas"))
+    migrar_apostas_para_blob(conexao)
+    
+    # Índices para as consultas paginadas (por sorteio e da tabela inteira)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_grupos_sorteio ON GruposApostas (sorteio_vinculado, data_geracao, id_grupo)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_grupos_data ON GruposApostas (data_geracao, id_grupo)")
     
     conexao.commit()
     conexao.close()
@@ -30,12 +73,15 @@ def criar_tabela_grupos():
 criar_tabela_grupos()
 
 ### **2. Salvar grupo de apostas no banco**
-def salvar_grupo_apostas(grupo):
-    """Salva um grupo de apostas no banco incluindo modelo utilizado."""
+def salvar_grupo_apostas(grupo, data_geracao=None):
+    """
+    Salva um grupo de apostas no banco incluindo modelo utilizado.
+    As apostas são gravadas como BLOB no formato binário de arquivo_apostas.py (4 bytes por jogo).
+    """
     conexao = conectar_banco()
     cursor = conexao.cursor()
     
-    data_geracao = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data_geracao = data_geracao or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     cursor.execute(
         "INSERT INTO GruposApostas (id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado, sugestao_gerada, apostas_sugeridas) VALUES (?, ?, ?, ?, ?, ?)",
@@ -45,7 +91,7 @@ def salvar_grupo_apostas(grupo):
             grupo["sorteio_vinculado"],
             grupo["modelo_utilizado"],  # Salva o modelo escolhido
             json.dumps([int(n) for n in grupo["sugestao_gerada"]]),
-            json.dumps([[int(n) for n in jogo] for jogo in grupo["apostas_sugeridas"]])
+            apostas_para_bytes(mascaras_de_jogos(grupo["apostas_sugeridas"]))
         )
     )
     
@@ -53,12 +99,28 @@ def salvar_grupo_apostas(grupo):
     conexao.close()
 
 ### **3. Listar grupos de apostas salvos**
-def listar_grupos_apostas():
-    """Lista todos os grupos de apostas registrados no banco."""
+def listar_grupos_apostas(limite=50, apos=None):
+    """
+    Lista os grupos de apostas registrados no banco, do mais recente para o mais antigo, em páginas.
+
+    Parâmetros:
+      limite : Quantidade máxima de grupos retornados.
+      apos   : Cursor da página anterior, (data_geracao, id_grupo) do último grupo já exibido.
+               None para a primeira página.
+    """
     conexao = conectar_banco()
     cursor = conexao.cursor()
     
-    cursor.execute("SELECT id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado FROM GruposApostas")
+    if apos is None:
+        cursor.execute(
+            "SELECT id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado FROM GruposApostas ORDER BY data_geracao DESC, id_grupo DESC LIMIT ?",
+            (limite,)
+        )
+    else:
+        cursor.execute(
+            "SELECT id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado FROM GruposApostas WHERE (data_geracao, id_grupo) < (?, ?) ORDER BY data_geracao DESC, id_grupo DESC LIMIT ?",
+            (apos[0], apos[1], limite)
+        )
     grupos = cursor.fetchall()
     
     conexao.close()
@@ -79,12 +141,30 @@ def listar_sorteios_com_apostas():
     return [s[0] for s in sorteios]
 
 ### **5. Listar grupos de apostas vinculados a um determinado sorteio**
-def listar_apostas_por_sorteio(sorteio):
-    """Lista todos os grupos de apostas associados a um determinado sorteio."""
+def listar_apostas_por_sorteio(sorteio, limite=50, apos=None):
+    """
+    Lista, em páginas, os grupos de apostas associados a um determinado sorteio.
+    Retorna apenas os metadados; as apostas são carregadas por obter_grupo_apostas ao abrir um grupo.
+
+    Parâmetros:
+      sorteio : Número do concurso vinculado.
+      limite  : Quantidade máxima de grupos retornados.
+      apos    : Cursor da página anterior, (data_geracao, id_grupo) do último grupo já exibido.
+                None para a primeira página.
+    """
     conexao = conectar_banco()
     cursor = conexao.cursor()
     
-    cursor.execute("SELECT id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado, sugestao_gerada, apostas_sugeridas FROM GruposApostas WHERE sorteio_vinculado = ?", (sorteio,))
+    if apos is None:
+        cursor.execute(
+            "SELECT id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado FROM GruposApostas WHERE sorteio_vinculado = ? ORDER BY data_geracao DESC, id_grupo DESC LIMIT ?",
+            (sorteio, limite)
+        )
+    else:
+        cursor.execute(
+            "SELECT id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado FROM GruposApostas WHERE sorteio_vinculado = ? AND (data_geracao, id_grupo) < (?, ?) ORDER BY data_geracao DESC, id_grupo DESC LIMIT ?",
+            (sorteio, apos[0], apos[1], limite)
+        )
     grupos = cursor.fetchall()
     
     conexao.close()
@@ -94,13 +174,56 @@ def listar_apostas_por_sorteio(sorteio):
             "id_grupo": g[0],
             "data_geracao": g[1],
             "sorteio_vinculado": g[2],
-            "modelo_utilizado": g[3],  # Agora incluído corretamente
-            "sugestao_gerada": json.loads(g[4]),
-            "apostas_sugeridas": json.loads(g[5])
+            "modelo_utilizado": g[3]
         }
         for g in grupos
     ]
 
+def contar_apostas_por_sorteio(sorteio):
+    """Retorna a quantidade de grupos de apostas associados a um sorteio."""
+    conexao = conectar_banco()
+    cursor = conexao.cursor()
+    
+    cursor.execute("SELECT COUNT(*) FROM GruposApostas WHERE sorteio_vinculado = ?", (sorteio,))
+    total = cursor.fetchone()[0]
+    
+    conexao.close()
+    
+    return total
+
+def _decodificar_apostas(valor, como_mascaras=False):
+    """Apostas gravadas como BLOB binário (formato de arquivo_apostas.py) ou como JSON (grupos anteriores à migração)."""
+    if isinstance(valor, bytes):
+        masks = apostas_de_bytes(valor)[0]
+        return masks if como_mascaras else jogos_de_mascaras(masks)
+    jogos = json.loads(valor)
+    return mascaras_de_jogos(jogos) if como_mascaras else jogos
+
+def obter_grupo_apostas(id_grupo, como_mascaras=False):
+    """
+    Carrega um grupo de apostas completo, decodificando a sugestão e as apostas. Retorna None se não existir.
+    Com como_mascaras=True, as apostas vêm como array uint32 de máscaras, sem criar uma lista por jogo
+    (o indicado para grupos com milhões de jogos).
+    """
+    conexao = conectar_banco()
+    cursor = conexao.cursor()
+    
+    cursor.execute("SELECT id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado, sugestao_gerada, apostas_sugeridas FROM GruposApostas WHERE id_grupo = ?", (id_grupo,))
+    g = cursor.fetchone()
+    
+    conexao.close()
+    
+    if g is None:
+        return None
+    return {
+        "id_grupo": g[0],
+        "data_geracao": g[1],
+        "sorteio_vinculado": g[2],
+        "modelo_utilizado": g[3],
+        "sugestao_gerada": json.loads(g[4]),
+        "apostas_sugeridas": _decodificar_apostas(g[5], como_mascaras)
+    }
+
 ### **6. Remover grupo de apostas do banco**
 def remover_grupo_apostas(id_grupo):
     """Remove um grupo de apostas pelo ID."""
@@ -110,4 +233,60 @@ def remover_grupo_apostas(id_grupo):
     cursor.execute("DELETE FROM GruposApostas WHERE id_grupo = ?", (id_grupo,))
     
     conexao.commit()
-    conexao.close()
\ No newline at end of file
+    conexao.close()
+
+### **7. Exportar e importar grupos de apostas em arquivo binário**
+def exportar_grupo_apostas(id_grupo, destino, codificacao="mascara"):
+    """
+    Grava as apostas de um grupo em um arquivo de apostas (ver arquivo_apostas.py), com os dados do grupo
+    (ID, data, sorteio vinculado, modelo e sugestão) nos metadados do cabeçalho.
+
+    Parâmetros:
+      destino     : Caminho do arquivo ou objeto de arquivo binário (ex.: io.BytesIO).
+      codificacao : "mascara" ou "rank".
+
+    Retorna:
+      Quantidade de jogos exportados, ou None se o grupo não existir.
+    """
+    grupo = obter_grupo_apostas(id_grupo, como_mascaras=True)
+    if grupo is None:
+        return None
+    metadados = {chave: grupo[chave] for chave in ("id_grupo", "data_geracao", "sorteio_vinculado", "modelo_utilizado", "sugestao_gerada")}
+    return salvar_apostas(destino, grupo["apostas_sugeridas"], codificacao, metadados=metadados)
+
+def importar_grupo_apostas(origem, sorteio_vinculado=None, modelo_utilizado=None):
+    """
+    Importa para o banco um arquivo de apostas (caminho ou objeto de arquivo), conferindo o CRC32.
+    Os dados do grupo vêm dos metadados do arquivo; um novo ID é gerado se o do arquivo já existir no banco.
+
+    Parâmetros:
+      sorteio_vinculado, modelo_utilizado : Substituem (ou suprem, se ausentes) os valores dos metadados.
+
+    Retorna:
+      Dicionário com id_grupo, data_geracao, sorteio_vinculado, modelo_utilizado, sugestao_gerada e
+      quantidade (de jogos importados).
+    """
+    masks, cabecalho = carregar_apostas(origem)
+    metadados = cabecalho["metadados"]
+    sorteio_vinculado = sorteio_vinculado if sorteio_vinculado is not None else metadados.get("sorteio_vinculado")
+    if sorteio_vinculado is None:
+        raise ValueError("Informe o sorteio vinculado: o arquivo não traz essa informação.")
+
+    id_grupo = metadados.get("id_grupo") or str(uuid.uuid4())
+    conexao = conectar_banco()
+    existe = conexao.execute("SELECT 1 FROM GruposApostas WHERE id_grupo = ?", (id_grupo,)).fetchone() is not None
+    conexao.close()
+    if existe:
+        id_grupo = str(uuid.uuid4())
+    grupo = {
+        "id_grupo": id_grupo,
+        "data_geracao": metadados.get("data_geracao") or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "sorteio_vinculado": int(sorteio_vinculado),
+        "modelo_utilizado": modelo_utilizado or metadados.get("modelo_utilizado", "Importado"),
+        "sugestao_gerada": metadados.get("sugestao_gerada", []),
+        "apostas_sugeridas": masks,
+    }
+    salvar_grupo_apostas(grupo, grupo["data_geracao"])
+    grupo["quantidade"] = len(masks)
+    del grupo["apostas_sugeridas"]
+    return grupo
@@ -0,0 +1,79 @@
+import numpy as np
+
+def matriz_bolas(df):
+    """Retorna a matriz (n_sorteios x 15) com os números sorteados nas colunas "Bola1" a "Bola15"."""
+    colunas = [f"Bola{i}" for i in range(1, 16)]
+    return df[colunas].to_numpy(dtype=int)
+
+def matriz_binaria(df_ou_bolas, total_numeros=25):
+    """
+    Converte os sorteios em uma matriz binária (n_sorteios x total_numeros), de forma vetorizada.
+    A posição [t, k] vale 1 se o número k + 1 saiu no sorteio t.
+
+    Parâmetros:
+      df_ou_bolas   : DataFrame com as colunas "Bola1" a "Bola15" ou matriz de números já extraída.
+      total_numeros : Número total de possibilidades (para Lotofácil é 25).
+
+    Retorna:
+      Array uint8 de formato (n_sorteios, total_numeros).
+    """
+    bolas = df_ou_bolas if isinstance(df_ou_bolas, np.ndarray) else matriz_bolas(df_ou_bolas)
+    binario = np.zeros((len(bolas), total_numeros), dtype=np.uint8)
+    binario[np.arange(len(bolas))[:, None], bolas - 1] = 1
+    return binario
+
+def mascaras(df_ou_bolas):
+    """
+    Converte cada sorteio em uma máscara de bits de 25 bits (bit k ligado se o número k + 1 saiu).
+
+    Retorna:
+      Array uint32 com uma máscara por sorteio.
+    """
+    bolas = df_ou_bolas if isinstance(df_ou_bolas, np.ndarray) else matriz_bolas(df_ou_bolas)
+    return np.bitwise_or.reduce(np.left_shift(np.uint32(1), (bolas - 1).astype(np.uint32)), axis=1).astype(np.uint32)
+
+def mascaras_de_binario(binario):
+    """Converte uma matriz binária (n x 25, ver matriz_binaria) no array de máscaras equivalente."""
+    binario = np.asarray(binario)
+    return (binario.astype(np.uint32) << np.arange(binario.shape[-1], dtype=np.uint32)).sum(axis=-1, dtype=np.uint32)
+
+def mascara_de_numeros(numeros):
+    """Converte uma lista de números (1 a 25) em uma máscara de bits."""
+    mascara = 0
+    for n in numeros:
+        mascara |= 1 << (int(n) - 1)
+    return mascara
+
+def numeros_de_mascara(mascara, total_numeros=25):
+    """Converte uma máscara de bits na lista ordenada de números correspondente."""
+    mascara = int(mascara)
+    return [k + 1 for k in range(total_numeros) if mascara >> k & 1]
+
+def binario_de_mascaras(masks, total_numeros=25):
+    """Converte um array de máscaras na matriz binária (n x total_numeros) equivalente."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return ((masks[..., None] >> np.arange(total_numeros, dtype=np.uint32)) & 1).astype(np.uint8)
+
+def bolas_de_mascaras(masks, tamanho=15, total_numeros=25):
+    """
+    Converte um array de máscaras com `tamanho` bits ligados cada na matriz (n x tamanho) de números,
+    em ordem crescente em cada linha (o inverso de mascaras).
+    """
+    binario = binario_de_mascaras(masks, total_numeros).reshape(-1, total_numeros)
+    return (np.nonzero(binario)[1].reshape(-1, tamanho) + 1).astype(int)
+
+# Tabela de contagem de bits por byte, usada quando np.bitwise_count não está disponível (NumPy < 2.0)
+_BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def popcount(valores):
+    """
+    Conta, elemento a elemento, os bits ligados de um array de inteiros sem sinal (até 64 bits).
+    Arrays sem sinal mantêm o tipo (bitmaps em uint8, por exemplo); os demais são tratados como uint32.
+    """
+    valores = np.asarray(valores)
+    if valores.dtype.kind != "u":
+        valores = valores.astype(np.uint32)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(valores)
+    bytes_ = np.ascontiguousarray(valores).view(np.uint8).reshape(valores.shape + (valores.dtype.itemsize,))
+    return _BITS_POR_BYTE[bytes_].sum(axis=-1, dtype=np.uint8)
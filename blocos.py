@@ -0,0 +1,201 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from binario import matriz_binaria
+from recursos import inicializar_worker, numero_workers
+
+# 📌 Tamanho padrão dos blocos lidos do disco (quantidade de sorteios)
+TAMANHO_BLOCO = 500_000
+
+# --------------------------------------------------
+# LEITURA E ESCRITA DE HISTÓRICOS EM BLOCOS
+# --------------------------------------------------
+# Formatos aceitos:
+#   - .npy : matriz (n_sorteios x 15) de uint8 com os números sorteados, lida por deslocamento no arquivo.
+#            Os concursos são implícitos (1..n_sorteios).
+#   - .csv : arquivo com as colunas "Bola1" a "Bola15" (e opcionalmente "Concurso"), lido em pedaços.
+
+def simular_historico(caminho, n_sorteios, tamanho_bloco=TAMANHO_BLOCO, semente=None):
+    """
+    Grava um histórico simulado de sorteios aleatórios, bloco a bloco, sem manter tudo em memória.
+
+    Parâmetros:
+      caminho       : Arquivo de saída (.npy ou .csv).
+      n_sorteios    : Quantidade de sorteios simulados.
+      tamanho_bloco : Quantidade de sorteios gerados por vez.
+      semente       : Semente do gerador aleatório.
+    """
+    rng = np.random.default_rng(semente)
+    colunas = [f"Bola{i}" for i in range(1, 16)]
+
+    if caminho.endswith(".npy"):
+        saida = open(caminho, "wb")
+        np.lib.format.write_array_header_1_0(saida, {"descr": "|u1", "fortran_order": False, "shape": (n_sorteios, 15)})
+    elif os.path.exists(caminho):
+        os.remove(caminho)
+
+    for inicio in range(0, n_sorteios, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n_sorteios)
+        # Os 15 menores de 25 valores aleatórios formam uma combinação uniforme
+        bolas = np.sort(np.argpartition(rng.random((fim - inicio, 25)), 15, axis=1)[:, :15] + 1, axis=1).astype(np.uint8)
+        if caminho.endswith(".npy"):
+            saida.write(bolas.tobytes())
+        else:
+            bloco = pd.DataFrame(bolas, columns=colunas)
+            bloco.insert(0, "Concurso", np.arange(inicio + 1, fim + 1))
+            bloco.to_csv(caminho, mode="a", header=inicio == 0, index=False)
+
+    if caminho.endswith(".npy"):
+        saida.close()
+
+def _cabecalho_npy(arquivo):
+    """Lê o cabeçalho de um .npy aberto e retorna (formato, dtype); o arquivo fica posicionado nos dados."""
+    versao = np.lib.format.read_magic(arquivo)
+    leitor = np.lib.format.read_array_header_1_0 if versao == (1, 0) else np.lib.format.read_array_header_2_0
+    formato, _, dtype = leitor(arquivo)
+    return formato, dtype
+
+def contar_sorteios(caminho):
+    """Retorna a quantidade de sorteios de um arquivo .npy (sem lê-lo) ou .csv (contando linhas)."""
+    if caminho.endswith(".npy"):
+        with open(caminho, "rb") as arquivo:
+            return _cabecalho_npy(arquivo)[0][0]
+    with open(caminho, "rb") as arquivo:
+        return sum(1 for _ in arquivo) - 1
+
+def ler_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO, inicio=0, fim=None):
+    """
+    Lê um histórico em blocos de tamanho limitado.
+
+    Retorna:
+      Gerador de tuplas (bolas, concursos): matriz (b x 15) de números e array com o número de cada concurso.
+    """
+    colunas = [f"Bola{i}" for i in range(1, 16)]
+    if caminho.endswith(".npy"):
+        # Leitura explícita por deslocamento: ao contrário da memória mapeada, as páginas já lidas
+        # não se acumulam na memória residente do processo
+        with open(caminho, "rb") as arquivo:
+            formato, dtype = _cabecalho_npy(arquivo)
+            deslocamento = arquivo.tell()
+            fim = formato[0] if fim is None else fim
+            for posicao in range(inicio, fim, tamanho_bloco):
+                limite = min(posicao + tamanho_bloco, fim)
+                arquivo.seek(deslocamento + posicao * 15 * dtype.itemsize)
+                bolas = np.fromfile(arquivo, dtype=dtype, count=(limite - posicao) * 15).reshape(-1, 15)
+                yield bolas.astype(np.int64), np.arange(posicao + 1, limite + 1)
+    else:
+        posicao = 0
+        for bloco in pd.read_csv(caminho, chunksize=tamanho_bloco):
+            concursos = bloco["Concurso"].to_numpy() if "Concurso" in bloco.columns else np.arange(posicao + 1, posicao + len(bloco) + 1)
+            posicao += len(bloco)
+            yield bloco[colunas].to_numpy(dtype=np.int64), concursos
+
+# --------------------------------------------------
+# MAP-REDUCE SOBRE OS BLOCOS
+# --------------------------------------------------
+def combinar_parciais(a, b):
+    """Combina dois resultados parciais: chaves iniciadas por "max_" usam o máximo, as demais são somadas."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return {chave: (np.maximum(a[chave], b[chave]) if chave.startswith("max_") else a[chave] + b[chave]) for chave in a}
+
+def _mapear_intervalo(caminho, inicio, fim, tamanho_bloco, funcao, argumentos):
+    """Executado em um processo: aplica `funcao` a cada bloco do intervalo e acumula os parciais."""
+    parcial = None
+    for bolas, concursos in ler_blocos(caminho, tamanho_bloco, inicio, fim):
+        parcial = combinar_parciais(parcial, funcao(bolas, concursos, *argumentos))
+    return parcial
+
+def processar_em_blocos(caminho, funcao, argumentos=(), tamanho_bloco=TAMANHO_BLOCO, max_workers=None):
+    """
+    Aplica `funcao(bolas, concursos, *argumentos)` a cada bloco do histórico e combina os resultados
+    parciais (dicionários de arrays) com combinar_parciais, no estilo map-reduce.
+
+    A memória de pico depende apenas do tamanho do bloco e do número de processos, não do tamanho
+    do histórico: arquivos .npy são divididos em intervalos lidos diretamente do disco em cada processo;
+    arquivos .csv são lidos em pedaços pelo processo principal, com no máximo 2 blocos por processo em voo.
+
+    Parâmetros:
+      funcao      : Função de nível de módulo (precisa ser serializável para os processos).
+      max_workers : Número de processos (padrão: recursos.numero_workers; 1 executa tudo no próprio processo).
+    """
+    max_workers = max_workers or numero_workers()
+    if max_workers == 1:
+        return _mapear_intervalo(caminho, 0, None, tamanho_bloco, funcao, argumentos)
+
+    resultado = None
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=inicializar_worker, initargs=(max_workers,)) as pool:
+        if caminho.endswith(".npy"):
+            total = contar_sorteios(caminho)
+            passo = max(-(-total // max_workers), 1)
+            futuros = [
+                pool.submit(_mapear_intervalo, caminho, inicio, min(inicio + passo, total), tamanho_bloco, funcao, argumentos)
+                for inicio in range(0, total, passo)
+            ]
+            for futuro in futuros:
+                resultado = combinar_parciais(resultado, futuro.result())
+        else:
+            pendentes = set()
+            for bolas, concursos in ler_blocos(caminho, tamanho_bloco):
+                if len(pendentes) >= 2 * max_workers:
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        resultado = combinar_parciais(resultado, futuro.result())
+                pendentes.add(pool.submit(funcao, bolas, concursos, *argumentos))
+            for futuro in pendentes:
+                resultado = combinar_parciais(resultado, futuro.result())
+    return resultado
+
+# --------------------------------------------------
+# FUNÇÕES DE MAPEAMENTO (RESULTADOS PARCIAIS POR BLOCO)
+# --------------------------------------------------
+def parcial_frequencias(bolas, concursos):
+    """Contagem de cada número, total de sorteios e maior concurso do bloco."""
+    return {
+        "sorteios": len(bolas),
+        "contagem": matriz_binaria(bolas).sum(axis=0, dtype=np.int64),
+        "max_concurso": int(concursos.max()) if len(concursos) else 0,
+    }
+
+def parcial_coocorrencias(bolas, concursos):
+    """Matriz 25 x 25 de co-ocorrências do bloco (X^T X)."""
+    # Produto em ponto flutuante (BLAS); as contagens são exatas até 2^53
+    binario = matriz_binaria(bolas).astype(np.float64)
+    return {"coocorrencias": np.rint(binario.T @ binario).astype(np.int64)}
+
+def parcial_kmeans(bolas, concursos, centros):
+    """Um passo de Lloyd do K-Means no bloco: soma e quantidade dos sorteios atribuídos a cada centro."""
+    binario = matriz_binaria(bolas).astype(float)
+    distancias = (binario ** 2).sum(axis=1)[:, None] - 2 * binario @ centros.T + (centros ** 2).sum(axis=1)[None, :]
+    rotulos = distancias.argmin(axis=1)
+    somas = np.zeros_like(centros)
+    np.add.at(somas, rotulos, binario)
+    return {
+        "somas": somas,
+        "quantidades": np.bincount(rotulos, minlength=len(centros)).astype(np.int64),
+        "inercia": float(distancias[np.arange(len(rotulos)), rotulos].sum()),
+    }
+
+if __name__ == "__main__":
+    # Teste do módulo: simula um histórico grande e calcula as estatísticas em blocos
+    import time
+    from estatisticas import obter_estatisticas_blocos
+    from frequencia import calcular_frequencia_condicional_blocos
+    from clustering import clusterizar_sorteios_blocos
+
+    caminho = "data/historico_simulado.npy"
+    inicio = time.time()
+    simular_historico(caminho, 5_000_000, semente=42)
+    print(f"🔎 Histórico simulado gravado em {time.time() - inicio:.1f}s")
+
+    inicio = time.time()
+    print(obter_estatisticas_blocos(caminho))
+    print(calcular_frequencia_condicional_blocos(caminho).round(4).iloc[:5, :5])
+    centros, tamanhos = clusterizar_sorteios_blocos(caminho, num_clusters=5)
+    print("Tamanho dos clusters:", tamanhos)
+    print(f"🔎 Processamento em blocos concluído em {time.time() - inicio:.1f}s")
\ No newline at end of file
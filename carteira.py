@@ -0,0 +1,169 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+from arquivo_apostas import TAMANHO_BLOCO, carregar_apostas, ler_apostas_em_blocos, mascaras_de_jogos
+from binario import mascara_de_numeros, popcount
+from blocos import combinar_parciais
+from recursos import inicializar_worker, numero_workers
+from significancia import distribuicao_acertos
+
+# 📌 Faixas premiadas da Lotofácil (quantidade de acertos)
+FAIXAS_PREMIADAS = [11, 12, 13, 14, 15]
+
+# O espaço de resultados (todas as combinações de 15 entre 25) é percorrido como o intervalo de
+# inteiros [0, 2^25), mantendo apenas as máscaras com 15 bits ligados. Cada tarefa cobre 2^19 inteiros
+# (cerca de 51 mil resultados), o que limita a memória da matriz resultados x jogos de cada bloco.
+BITS_TOTAIS = 25
+NUMEROS_SORTEADOS = 15
+TAMANHO_TAREFA = 2**19
+TOTAL_RESULTADOS = comb(BITS_TOTAIS, NUMEROS_SORTEADOS)
+
+# --------------------------------------------------
+# ENUMERAÇÃO DOS RESULTADOS POSSÍVEIS
+# --------------------------------------------------
+def resultados_no_intervalo(inicio, fim):
+    """Máscaras de todos os resultados possíveis (15 números) no intervalo de inteiros [inicio, fim)."""
+    candidatos = np.arange(inicio, fim, dtype=np.uint32)
+    return candidatos[popcount(candidatos) == NUMEROS_SORTEADOS]
+
+# --------------------------------------------------
+# AVALIAÇÃO NOS PROCESSOS
+# --------------------------------------------------
+_jogos_worker = None
+
+def _inicializar_worker(jogos):
+    """Guarda as máscaras dos jogos no processo, para não reenviá-las a cada bloco."""
+    global _jogos_worker
+    _jogos_worker = jogos
+
+def _avaliar_intervalo(inicio, fim):
+    """
+    Conta, para os resultados do intervalo, os acertos de cada jogo com popcount.
+
+    Retorna o parcial com:
+      melhor_acerto : Quantidade de resultados por maior número de acertos entre os jogos (0 a 15).
+      algum_jogo    : Para cada faixa premiada, resultados em que ao menos um jogo faz exatamente a faixa.
+    """
+    resultados = resultados_no_intervalo(inicio, fim)
+    acertos = popcount(resultados[:, None] & _jogos_worker[None, :])
+    # Bit k ligado quando algum jogo faz exatamente k acertos naquele resultado
+    presentes = np.bitwise_or.reduce(np.left_shift(np.uint16(1), acertos.astype(np.uint16)), axis=1)
+    return {
+        "melhor_acerto": np.bincount(acertos.max(axis=1), minlength=16).astype(np.int64),
+        "algum_jogo": np.array([((presentes >> faixa) & 1).sum() for faixa in FAIXAS_PREMIADAS], dtype=np.int64),
+    }
+
+# --------------------------------------------------
+# AVALIAÇÃO EXATA DA CARTEIRA DE APOSTAS
+# --------------------------------------------------
+def avaliar_carteira(jogos, max_workers=None):
+    """
+    Avalia exatamente um grupo de apostas frente a todos os 3.268.760 resultados possíveis,
+    enumerados em blocos e distribuídos entre os processos (ver recursos.numero_workers).
+
+    Parâmetros:
+      jogos       : Lista de jogos (cada um, lista de números de 1 a 25), array de máscaras ou caminho de
+                    um arquivo de apostas (ver arquivo_apostas.py).
+      max_workers : Número de processos (padrão: recursos.numero_workers; 1 executa no próprio processo).
+
+    Retorna:
+      DataFrame indexado pela faixa (11 a 15 acertos) com:
+        prob_algum_jogo    : Probabilidade de ao menos um jogo fazer exatamente a faixa.
+        prob_melhor_faixa  : Probabilidade de a faixa ser o melhor resultado do grupo.
+        prob_pelo_menos    : Probabilidade de o melhor jogo fazer a faixa ou mais.
+        jogos_esperados    : Número esperado de jogos premiados na faixa.
+      O número esperado total de jogos premiados fica em df.attrs["jogos_premiados_esperados"].
+      Um grupo vazio resulta em probabilidades e valores esperados nulos.
+    
+    O número esperado de jogos por faixa é a soma das distribuições hipergeométricas exatas de cada
+    jogo (ver significancia.distribuicao_acertos), que dispensa a enumeração; as probabilidades que
+    dependem da sobreposição entre os jogos vêm da enumeração completa.
+    """
+    jogos_mascaras = carregar_apostas(jogos)[0] if isinstance(jogos, (str, os.PathLike)) else mascaras_de_jogos(jogos)
+    intervalos = [(inicio, min(inicio + TAMANHO_TAREFA, 2**BITS_TOTAIS)) for inicio in range(0, 2**BITS_TOTAIS, TAMANHO_TAREFA)]
+    max_workers = max_workers or numero_workers(len(intervalos))
+
+    parcial = None
+    if len(jogos_mascaras) == 0:
+        # Grupo vazio: nenhuma faixa é alcançada, sem necessidade de enumerar os resultados
+        parcial = {"melhor_acerto": np.zeros(16, dtype=np.int64), "algum_jogo": np.zeros(len(FAIXAS_PREMIADAS), dtype=np.int64)}
+    elif max_workers == 1:
+        _inicializar_worker(jogos_mascaras)
+        for inicio, fim in intervalos:
+            parcial = combinar_parciais(parcial, _avaliar_intervalo(inicio, fim))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=inicializar_worker, initargs=(max_workers, _inicializar_worker, jogos_mascaras)) as pool:
+            for resultado in pool.map(_avaliar_intervalo, *zip(*intervalos)):
+                parcial = combinar_parciais(parcial, resultado)
+
+    faixas = np.array(FAIXAS_PREMIADAS)
+    melhor = parcial["melhor_acerto"] / TOTAL_RESULTADOS
+    # Quantidade de jogos de cada tamanho (15 a 20 números)
+    tamanhos = np.bincount(popcount(jogos_mascaras).astype(np.int64), minlength=BITS_TOTAIS + 1)
+    avaliacao = pd.DataFrame({
+        "prob_algum_jogo": parcial["algum_jogo"] / TOTAL_RESULTADOS,
+        "prob_melhor_faixa": melhor[faixas],
+        "prob_pelo_menos": [melhor[faixa:].sum() for faixa in faixas],
+        "jogos_esperados": [
+            sum((quantidade * distribuicao_acertos(tamanho)[faixa]
+                 for tamanho, quantidade in enumerate(tamanhos) if quantidade and faixa <= tamanho), 0.0)
+            for faixa in faixas
+        ],
+    }, index=pd.Index(faixas, name="acertos"))
+    avaliacao.attrs["jogos_premiados_esperados"] = float(avaliacao["jogos_esperados"].sum())
+    avaliacao.attrs["prob_algum_premio"] = float(melhor[FAIXAS_PREMIADAS[0]:].sum())
+    return avaliacao
+
+# --------------------------------------------------
+# CONFERÊNCIA DE GRANDES CONJUNTOS DE APOSTAS
+# --------------------------------------------------
+def conferir_apostas(jogos, resultado, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Confere um conjunto de apostas, possivelmente com milhões de jogos, contra um resultado sorteado.
+    Arquivos de apostas são lidos em fluxo, bloco a bloco; os acertos de cada jogo são contados com popcount.
+
+    Parâmetros:
+      jogos     : Caminho de um arquivo de apostas, array de máscaras ou lista de jogos.
+      resultado : Números sorteados.
+
+    Retorna:
+      Tupla (contagem, premiados):
+        contagem  : Series com a quantidade de jogos por número de acertos (0 a 25).
+        premiados : Array com as posições (no conjunto) dos jogos com acertos em uma faixa premiada.
+    """
+    mascara_resultado = np.uint32(mascara_de_numeros(resultado))
+    blocos = ler_apostas_em_blocos(jogos, tamanho_bloco) if isinstance(jogos, (str, os.PathLike)) else [mascaras_de_jogos(jogos)]
+
+    contagem = np.zeros(BITS_TOTAIS + 1, dtype=np.int64)
+    premiados = [np.empty(0, dtype=np.int64)]
+    inicio = 0
+    for masks in blocos:
+        acertos = popcount(masks & mascara_resultado).astype(np.int64)
+        contagem += np.bincount(acertos, minlength=BITS_TOTAIS + 1)
+        premiados.append(inicio + np.flatnonzero(acertos >= FAIXAS_PREMIADAS[0]))
+        inicio += len(masks)
+    return pd.Series(contagem, index=pd.Index(range(BITS_TOTAIS + 1), name="acertos"), name="jogos"), np.concatenate(premiados)
+
+def imprimir_avaliacao(avaliacao):
+    """Imprime a avaliação exata do grupo de apostas."""
+    print("\n🎯 **Probabilidades Exatas do Grupo de Apostas**")
+    for faixa, linha in avaliacao.iterrows():
+        print(f"- {faixa} acertos: algum jogo {linha['prob_algum_jogo']:.6%} | "
+              f"melhor resultado {linha['prob_melhor_faixa']:.6%} | "
+              f"{faixa}+ {linha['prob_pelo_menos']:.6%} | jogos esperados {linha['jogos_esperados']:.6f}")
+    print(f"- Probabilidade de algum prêmio: {avaliacao.attrs['prob_algum_premio']:.4%}")
+    print(f"- Número esperado de jogos premiados: {avaliacao.attrs['jogos_premiados_esperados']:.4f}")
+
+if __name__ == "__main__":
+    # Teste do módulo: avalia 100 jogos aleatórios e mede o tempo
+    import time
+
+    rng = np.random.default_rng(42)
+    jogos = [sorted(rng.choice(np.arange(1, 26), 15, replace=False)) for _ in range(100)]
+    inicio = time.time()
+    imprimir_avaliacao(avaliar_carteira(jogos))
+    print(f"⏱️ Avaliação concluída em {time.time() - inicio:.1f}s")
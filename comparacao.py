@@ -0,0 +1,114 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from servidor_predicao import executar_predicao
+from varredura import executar_varredura, resultados_varredura
+from recursos import inicializar_worker, numero_workers
+
+# Métodos comparados: nome exibido -> (método de predição, parâmetros). O backtest exibido ao lado de cada
+# método é o do modelo "Pontuacao" da varredura com exatamente esse método e esses parâmetros
+# (ver backtest_pontuacao.py), ou seja, o mesmo preditor que gera a predição comparada.
+METODOS_COMPARACAO = {
+    "RandomForest": ("supervisionada", {"modelo_escolhido": "RandomForest"}),
+    "MLP": ("supervisionada", {"modelo_escolhido": "MLP"}),
+    "Frequência Condicional": ("frequencia", {}),
+    "Clustering": ("clustering", {}),
+    "Transição (Markov)": ("markov", {}),
+}
+
+# --------------------------------------------------
+# EXECUÇÃO NOS PROCESSOS (DADOS CARREGADOS UMA VEZ POR PROCESSO)
+# --------------------------------------------------
+_df_worker = None
+
+def _inicializar_worker(df):
+    """Guarda o histórico no processo, para não reenviá-lo a cada método."""
+    global _df_worker
+    _df_worker = df
+
+def _executar_metodo(nome, metodo, params):
+    """Executa um método no processo e mede o tempo de cálculo."""
+    inicio = time.perf_counter()
+    previsao = executar_predicao(_df_worker, metodo, params)
+    return nome, previsao, time.perf_counter() - inicio
+
+# --------------------------------------------------
+# TAXA DE ACERTO RECENTE (BACKTEST)
+# --------------------------------------------------
+def desempenho_recente(metodo, params=None, num_sorteios=100, meta_acertos=11):
+    """
+    Retorna o backtest walk-forward já registrado na varredura para o método com exatamente esses
+    parâmetros, nos últimos num_sorteios concursos calculados (ver executar_backtests_comparacao).
+
+    Retorna:
+      Dicionário com sorteios, media_acertos e taxa_meta, ou None se o método não tiver sido avaliado.
+    """
+    acertos = resultados_varredura("Pontuacao", {"metodo": metodo, **(params or {})}).iloc[-num_sorteios:]
+    if acertos.empty:
+        return None
+    return {
+        "sorteios": len(acertos),
+        "media_acertos": float(acertos.mean()),
+        "taxa_meta": float((acertos >= meta_acertos).mean()),
+    }
+
+def executar_backtests_comparacao(df, metodos=None, num_sorteios=100, max_workers=None):
+    """Calcula (ou completa) na varredura os backtests dos métodos comparados, nos últimos num_sorteios concursos."""
+    for nome in metodos or METODOS_COMPARACAO:
+        metodo, params = METODOS_COMPARACAO[nome]
+        grade = {parametro: [valor] for parametro, valor in {"metodo": metodo, **params}.items()}
+        executar_varredura(df, "Pontuacao", grade, num_sorteios, max_workers)
+
+# --------------------------------------------------
+# COMPARAÇÃO EM PARALELO
+# --------------------------------------------------
+def comparar_metodos(df, metodos=None, max_workers=None, num_sorteios=100, meta_acertos=11):
+    """
+    Executa todos os métodos de predição ao mesmo tempo, em um pool de processos que compartilha
+    o mesmo histórico carregado, e entrega os resultados à medida que cada método termina.
+    O tempo total fica próximo ao do método mais lento, e não à soma dos tempos.
+
+    Parâmetros:
+      df          : DataFrame com o histórico de sorteios.
+      metodos     : Lista de nomes de METODOS_COMPARACAO (None para todos).
+      max_workers : Número de processos (padrão: um por método, limitado por recursos.numero_workers).
+
+    Retorna:
+      Gerador de dicionários com nome, previsao, tempo (segundos), erro e backtest (ver desempenho_recente).
+    """
+    metodos = list(metodos or METODOS_COMPARACAO)
+    max_workers = max_workers or numero_workers(len(metodos))
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=inicializar_worker, initargs=(max_workers, _inicializar_worker, df)) as pool:
+        futuros = {
+            pool.submit(_executar_metodo, nome, *METODOS_COMPARACAO[nome]): nome
+            for nome in metodos
+        }
+        # A consulta ao backtest roda no processo principal enquanto os métodos calculam
+        backtests = {nome: desempenho_recente(*METODOS_COMPARACAO[nome], num_sorteios, meta_acertos) for nome in metodos}
+
+        for futuro in as_completed(futuros):
+            nome = futuros[futuro]
+            try:
+                _, previsao, tempo = futuro.result()
+                yield {"nome": nome, "previsao": previsao, "tempo": tempo, "erro": None, "backtest": backtests[nome]}
+            except Exception as erro:
+                yield {"nome": nome, "previsao": None, "tempo": None, "erro": str(erro), "backtest": backtests[nome]}
+
+if __name__ == "__main__":
+    # Teste do módulo: compara todos os métodos e mostra o tempo total
+    from dados import carregar_dados
+
+    df = carregar_dados("data/Lotofacil.xlsx")
+    if df is not None:
+        inicio = time.perf_counter()
+        soma_tempos = 0.0
+        for resultado in comparar_metodos(df):
+            if resultado["erro"]:
+                print(f"❌ {resultado['nome']}: {resultado['erro']}")
+                continue
+            soma_tempos += resultado["tempo"]
+            print(f"✅ {resultado['nome']} ({resultado['tempo']:.1f}s): {resultado['previsao']}")
+        print(f"\n⏱️ Tempo total: {time.perf_counter() - inicio:.1f}s (soma dos métodos: {soma_tempos:.1f}s)")
+    else:
+        print("Erro ao carregar os dados.")
@@ -1,54 +1,80 @@
+import numpy as np
 import pandas as pd
 
 def validar_dados(df):
     """
-    Valida o DataFrame verificando:
-      - Valores ausentes em colunas críticas
-      - Registros duplicados (baseados na coluna 'Concurso')
-      - Inconsistências de formatação, especialmente em 'Data Sorteio' e colunas de bolas
-    """
-    print("\n🔎 VALIDACAO: Verificando valores ausentes em cada coluna:")
-    print(df.isna().sum())
+    Valida o DataFrame em uma única passada vetorizada sobre a matriz de bolas, verificando:
+      - Valores ausentes ou não numéricos nas colunas "Bola1" a "Bola15"
+      - Valores não inteiros ou fora do intervalo 1..25
+      - Sorteios sem 15 números distintos
+      - Concursos ausentes, inválidos, duplicados (a última ocorrência é a mantida) ou com numeração
+        não contígua (verificada em ordem de concurso, independentemente da ordem das linhas)
+      - Datas inconsistentes em 'Data Sorteio'
+
+    O DataFrame não é alterado. Cabe a quem chama decidir o que fazer com as linhas rejeitadas.
 
-    # Definir as colunas críticas (sorteio, data e bolas)
+    Retorna:
+      relatorio : DataFrame com uma linha por problema encontrado, com as colunas
+                  "linha" (índice no DataFrame), "Concurso", "motivo" e "rejeitado"
+                  (False para avisos que não invalidam o sorteio, como lacunas na numeração).
+    """
     colunas_bolas = [f"Bola{i}" for i in range(1, 16)]
-    colunas_criticas = ["Concurso", "Data Sorteio"] + colunas_bolas
-
-    for coluna in colunas_criticas:
-        if coluna in df.columns:
-            missing = df[coluna].isna().sum()
-            if missing > 0:
-                print(f"⚠️ AVISO: A coluna '{coluna}' possui {missing} valores ausentes.")
-
-    # Verifica registros duplicados na coluna "Concurso"
-    if "Concurso" in df.columns:
-        duplicados = df["Concurso"].duplicated().sum()
-        if duplicados > 0:
-            print(f"⚠️ AVISO: Encontrado(s) {duplicados} registro(s) duplicado(s) na coluna 'Concurso'.")
-            # Se desejar, descomente as linhas abaixo para remover duplicatas automaticamente.
-            # df.drop_duplicates(subset=["Concurso"], inplace=True)
-            # print("Duplicatas removidas com base na coluna 'Concurso'.")
-
-    # Tenta converter a coluna "Data Sorteio" para datetime com o formato correto
+    problemas = []  # Lista de (máscara booleana por linha, motivo, rejeitado)
+
+    colunas_faltantes = [c for c in ["Concurso"] + colunas_bolas if c not in df.columns]
+    if colunas_faltantes:
+        raise ValueError(f"Colunas ausentes no arquivo: {', '.join(colunas_faltantes)}")
+
+    # Matriz de bolas convertida para float de uma só vez (NaN marca valores ausentes ou não numéricos)
+    brutos = df[colunas_bolas].to_numpy()
+    if brutos.dtype.kind in "iuf":
+        bolas = brutos.astype(float, copy=False)
+    else:
+        bolas = pd.to_numeric(pd.Series(brutos.ravel()), errors="coerce").to_numpy(dtype=float).reshape(brutos.shape)
+    ausentes = pd.isna(df[colunas_bolas]).to_numpy()
+    invalidos = np.isnan(bolas)
+
+    problemas.append((ausentes.any(axis=1), "bola ausente", True))
+    problemas.append(((invalidos & ~ausentes).any(axis=1), "bola não numérica", True))
+    with np.errstate(invalid="ignore"):
+        problemas.append(((~invalidos & (bolas != np.floor(bolas))).any(axis=1), "bola não inteira", True))
+        problemas.append((((bolas < 1) | (bolas > 25)).any(axis=1), "bola fora do intervalo 1..25", True))
+    ordenadas = np.sort(bolas, axis=1)
+    problemas.append(((np.diff(ordenadas, axis=1) == 0).any(axis=1), "números repetidos no sorteio", True))
+
+    # Numeração dos concursos
+    concursos = pd.to_numeric(df["Concurso"], errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        problemas.append((np.isnan(concursos) | (concursos <= 0), "concurso ausente ou inválido", True))
+    # Como no tratamento anterior (drop_duplicates com keep="last"), vale a última ocorrência de cada concurso
+    duplicados = pd.Series(concursos).duplicated(keep="last").to_numpy() & ~np.isnan(concursos)
+    problemas.append((duplicados, "concurso duplicado", True))
+    # A contiguidade é verificada na ordem dos concursos, não na ordem das linhas do arquivo: cada concurso
+    # mantido é comparado ao concurso mantido imediatamente anterior
+    saltos = np.zeros(len(df), dtype=bool)
+    mantidos = np.flatnonzero(~np.isnan(concursos) & ~duplicados)
+    mantidos = mantidos[np.argsort(concursos[mantidos], kind="stable")]
+    saltos[mantidos[1:]] = np.diff(concursos[mantidos]) != 1
+    problemas.append((saltos, "numeração de concurso não contígua", False))
+
+    # Datas
     if "Data Sorteio" in df.columns:
-        try:
-            df["Data Sorteio"] = pd.to_datetime(df["Data Sorteio"], errors="coerce", dayfirst=True)
-            inconsistentes = df["Data Sorteio"].isna().sum()
-            if inconsistentes > 0:
-                print(f"⚠️ AVISO: Encontrados {inconsistentes} registro(s) com formato de data inconsistente em 'Data Sorteio'.")
-        except Exception as e:
-            print("Erro ao converter 'Data Sorteio' para datetime:", e)
-
-    # Converter as colunas de bolas para numérico e tratar possíveis inconsistências
-    for coluna in colunas_bolas:
-        if coluna in df.columns:
-            df[coluna] = pd.to_numeric(df[coluna], errors="coerce")
-            inconsistentes = df[coluna].isna().sum()
-            if inconsistentes > 0:
-                print(f"⚠️ AVISO: Coluna '{coluna}' possui {inconsistentes} valor(es) inconsistentes que foram convertidos para NaN.")
-            df[coluna] = df[coluna].fillna(0).astype(int)
-
-    return df
+        datas = pd.to_datetime(df["Data Sorteio"], errors="coerce", dayfirst=True)
+        problemas.append((datas.isna().to_numpy(), "data inconsistente", False))
+
+    linhas = []
+    for mascara, motivo, rejeitado in problemas:
+        posicoes = np.flatnonzero(mascara)
+        if len(posicoes):
+            linhas.append(pd.DataFrame({
+                "linha": df.index[posicoes],
+                "Concurso": df["Concurso"].to_numpy()[posicoes],
+                "motivo": motivo,
+                "rejeitado": rejeitado,
+            }))
+    if not linhas:
+        return pd.DataFrame(columns=["linha", "Concurso", "motivo", "rejeitado"])
+    return pd.concat(linhas, ignore_index=True).sort_values("linha", kind="stable").reset_index(drop=True)
 
 def carregar_dados(arquivo="data/Lotofacil.xlsx"):
     """Carrega e valida os dados da Lotofácil, exibindo debug essencial para a validação do dataset completo."""
@@ -69,12 +95,24 @@ def carregar_dados(arquivo="data/Lotofacil.xlsx"):
         print("⚠️ ERRO: Coluna 'Concurso' não encontrada no arquivo! Verifique o cabeçalho da planilha.")
         return None
 
-    # Converter a coluna "Concurso" para numérico
-    df["Concurso"] = pd.to_numeric(df["Concurso"], errors="coerce").fillna(0).astype(int)
-    print("🔎 DEBUG: Valores únicos em 'Concurso' após conversão:", df["Concurso"].unique())
+    # Validação dos dados: nenhuma correção silenciosa, as linhas rejeitadas são informadas e removidas
+    relatorio = validar_dados(df)
+    for motivo, quantidade in relatorio["motivo"].value_counts(sort=False).items():
+        print(f"⚠️ AVISO: {quantidade} registro(s) com '{motivo}'.")
+
+    linhas_rejeitadas = relatorio.loc[relatorio["rejeitado"], "linha"].unique()
+    if len(linhas_rejeitadas) > 0:
+        print(f"⚠️ AVISO: {len(linhas_rejeitadas)} registro(s) rejeitado(s) e removido(s). Consulte df.attrs['relatorio_validacao'].")
+        df = df.drop(index=linhas_rejeitadas)
+
+    # Após a validação, as conversões são seguras e não precisam ser refeitas adiante
+    colunas_bolas = [f"Bola{i}" for i in range(1, 16)]
+    df = df.copy()
+    df["Concurso"] = pd.to_numeric(df["Concurso"]).astype(int)
+    df[colunas_bolas] = df[colunas_bolas].apply(pd.to_numeric).astype(int)
+    if "Data Sorteio" in df.columns:
+        df["Data Sorteio"] = pd.to_datetime(df["Data Sorteio"], errors="coerce", dayfirst=True)
+    df.attrs["relatorio_validacao"] = relatorio
     print("🔎 DEBUG: Maior valor em 'Concurso':", df["Concurso"].max())
 
-    # Validação adicional dos dados
-    df = validar_dados(df)
-    
     return df
\ No newline at end of file
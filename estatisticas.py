@@ -1,4 +1,5 @@
 import pandas as pd
+from blocos import TAMANHO_BLOCO, parcial_frequencias, processar_em_blocos
 
 def obter_estatisticas(df):
     """Calcula estatísticas gerais dos sorteios."""
@@ -18,8 +19,7 @@ def obter_estatisticas(df):
     for coluna in colunas_numeros:
         print(f"\n🔎 DEBUG: Valores únicos em '{coluna}':\n", df[coluna].unique())
     
-    # Converter as colunas de números sorteados para garantir o tipo numérico
-    df[colunas_numeros] = df[colunas_numeros].apply(pd.to_numeric, errors="coerce").fillna(0).astype(int)
+    # As colunas de números já chegam validadas e convertidas por dados.carregar_dados
     
     # Contagem de frequência dos números sorteados
     contagem_numeros = df[colunas_numeros].apply(pd.Series.value_counts).sum(axis=1).sort_values(ascending=False)
@@ -30,13 +30,8 @@ def obter_estatisticas(df):
     
     # Processamento do último sorteio baseado na coluna "Concurso"
     if not df.empty and "Concurso" in df.columns:
-        df_temp = df.copy()  # Use uma cópia para não modificar o DataFrame original
-        df_temp["Concurso"] = pd.to_numeric(df_temp["Concurso"], errors="coerce")
-        df_temp.dropna(subset=["Concurso"], inplace=True)  # Remove linhas onde 'Concurso' não é numérico
-        df_temp = df_temp[df_temp["Concurso"] > 0]  # Filtra valores inválidos (zero e negativos)
-        df_temp.drop_duplicates(subset=["Concurso"], keep="last", inplace=True)  # Remove duplicatas, se houver
-        df_temp.sort_values(by="Concurso", ascending=True, inplace=True)  # Ordena corretamente pelo número do concurso
-        ultimo_sorteio = int(df_temp["Concurso"].max()) if not df_temp.empty else None
+        # Concursos inválidos ou duplicados já foram rejeitados na validação
+        ultimo_sorteio = int(df["Concurso"].max())
     else:
         ultimo_sorteio = None  # Garante que a variável sempre será definida
     
@@ -49,4 +44,21 @@ def obter_estatisticas(df):
          "ultimo_sorteio": ultimo_sorteio if ultimo_sorteio is not None else 0,
          "mais_sorteados": mais_sorteados,
          "media_acertos": media_acertos
+    }
+
+def obter_estatisticas_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO, max_workers=None):
+    """
+    Versão em blocos de obter_estatisticas para históricos que não cabem em memória.
+    Lê o arquivo (.npy ou .csv, ver blocos.py) em blocos e combina as contagens parciais de cada processo.
+    """
+    parcial = processar_em_blocos(caminho, parcial_frequencias, tamanho_bloco=tamanho_bloco, max_workers=max_workers)
+    
+    contagem_numeros = pd.Series(parcial["contagem"], index=range(1, 26)).sort_values(ascending=False, kind="stable")
+    print("\n✅ Contagem de números mais sorteados:\n", contagem_numeros.head(10))
+    
+    return {
+         "total_jogos": int(parcial["sorteios"]),
+         "ultimo_sorteio": int(parcial["max_concurso"]),
+         "mais_sorteados": contagem_numeros.head(10).index.tolist(),
+         "media_acertos": round(contagem_numeros.mean(), 2)
     }
\ No newline at end of file
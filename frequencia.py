@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+from binario import matriz_binaria
+from blocos import TAMANHO_BLOCO, parcial_coocorrencias, processar_em_blocos
 
 def calcular_frequencia_condicional(df):
     """
@@ -14,30 +16,53 @@ def calcular_frequencia_condicional(df):
       - Um DataFrame onde cada célula (i, j) representa a probabilidade de o número j ser sorteado
         dado que o número i saiu.
     """
-    # Definir as colunas dos números sorteados
-    colunas = [f"Bola{i}" for i in range(1, 16)]
-    
     # Os números possíveis são de 1 a 25 (Lotofácil)
     numeros = range(1, 26)
-    # Inicializa a matriz de contagem com zeros
-    frequencias = pd.DataFrame(0, index=numeros, columns=numeros, dtype=float)
-    
-    # Atualiza as contagens para cada sorteio
-    for _, row in df[colunas].iterrows():
-        sorteio = row.tolist()
-        # Para cada par de números distintos dentro do mesmo sorteio
-        for i in sorteio:
-            for j in sorteio:
-                if i != j:
-                    frequencias.loc[i, j] += 1
+    prob_cond = frequencia_condicional_de_matriz(matriz_binaria(df))
+    
+    return pd.DataFrame(prob_cond, index=numeros, columns=numeros)
+
+def frequencia_condicional_de_matriz(binario):
+    """
+    Calcula a matriz de probabilidade condicional a partir da matriz binária dos sorteios.
+    
+    As co-ocorrências de todos os pares são obtidas com um único produto matricial (X^T X),
+    sem percorrer os sorteios um a um.
+    
+    Retorna:
+      - Array 25 x 25 onde [i - 1, j - 1] é a probabilidade de j ser sorteado dado que i saiu.
+    """
+    binario = np.asarray(binario, dtype=float)
+    return frequencia_condicional_de_contagens(binario.T @ binario)
+
+def frequencia_condicional_de_contagens(coocorrencias):
+    """
+    Normaliza uma matriz 25 x 25 de co-ocorrências (X^T X, possivelmente somada entre blocos)
+    na matriz de probabilidade condicional.
+    """
+    frequencias = np.array(coocorrencias, dtype=float)
+    # Conta apenas pares de números distintos dentro do mesmo sorteio
+    np.fill_diagonal(frequencias, 0)
     
     # Normaliza as contagens em cada linha para obter a probabilidade condicional
     soma_por_numero = frequencias.sum(axis=1)
     # Evita divisão por zero (caso algum número nunca tenha saído)
     soma_por_numero[soma_por_numero == 0] = 1
-    prob_cond = frequencias.div(soma_por_numero, axis=0)
+    return frequencias / soma_por_numero[:, None]
+
+def calcular_frequencia_condicional_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO, max_workers=None):
+    """
+    Versão em blocos de calcular_frequencia_condicional para históricos que não cabem em memória.
     
-    return prob_cond
+    Lê os sorteios do arquivo (.npy ou .csv, ver blocos.py) em blocos de tamanho limitado, calcula as
+    co-ocorrências de cada bloco em processos separados e soma os resultados parciais.
+    
+    Retorna:
+      - O mesmo DataFrame 25 x 25 de calcular_frequencia_condicional.
+    """
+    parcial = processar_em_blocos(caminho, parcial_coocorrencias, tamanho_bloco=tamanho_bloco, max_workers=max_workers)
+    numeros = range(1, 26)
+    return pd.DataFrame(frequencia_condicional_de_contagens(parcial["coocorrencias"]), index=numeros, columns=numeros)
 
 if __name__ == "__main__":
     # Teste do módulo individualmente
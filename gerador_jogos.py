@@ -1,26 +1,204 @@
 import random
+from math import comb
+
+import numpy as np
 import pandas as pd
 
-def gerar_jogos(df, modelo, mlb, quantidade=5):
+from arquivo_apostas import EscritorApostas
+from binario import bolas_de_mascaras, mascara_de_numeros, popcount
+
+# Quantidade máxima de jogos sorteados por lote (matriz lote x 25 de chaves em float32, cerca de 25 MB)
+TAMANHO_LOTE = 2**18
+
+def _sortear_com_repetidos(ultimo_sorteio, repetidos):
+    """
+    Sorteia uma combinação de 15 números com quantidade de repetidos do último sorteio dentro da faixa
+    (mínimo, máximo). A quantidade k é escolhida com peso C(15, k) * C(10, 15 - k), de modo que o resultado
+    é uniforme entre todas as combinações que atendem ao filtro.
+    """
+    ultimo = sorted(int(n) for n in ultimo_sorteio)
+    restantes = [n for n in range(1, 26) if n not in ultimo]
+    faixa = [k for k in range(max(repetidos[0], 15 - len(restantes)), min(repetidos[1], len(ultimo)) + 1)]
+    if not faixa:
+        raise ValueError(f"Faixa de repetidos inválida: {repetidos}")
+    pesos = [comb(len(ultimo), k) * comb(len(restantes), 15 - k) for k in faixa]
+    k = random.choices(faixa, weights=pesos)[0]
+    return sorted(random.sample(ultimo, k) + random.sample(restantes, 15 - k))
+
+# --------------------------------------------------
+# AMOSTRAGEM PONDERADA PELO MODELO (GUMBEL-TOP-K)
+# --------------------------------------------------
+def pesos_amostragem(pontuacao, temperatura=1.0):
+    """
+    Converte um vetor de 25 pontuações nos pesos de amostragem de cada número.
+
+    Pontuações não negativas (frequências, probabilidades) viram pesos proporcionais a
+    pontuacao ** (1 / temperatura); pontuações com valores negativos (como as padronizadas do ensemble)
+    passam por um softmax das pontuações padronizadas divididas pela temperatura. Temperaturas abaixo de 1
+    concentram os jogos nos números de maior pontuação; acima de 1, aproximam a escolha uniforme.
+
+    Retorna:
+      Array de 25 pesos positivos que somam 1.
+    """
+    pontuacao = np.nan_to_num(np.asarray(pontuacao, dtype=float))
+    if temperatura <= 0:
+        raise ValueError("A temperatura deve ser positiva.")
+    if pontuacao.min() >= 0:
+        pesos = pontuacao ** (1.0 / temperatura)
+    else:
+        desvio = pontuacao.std()
+        padronizada = (pontuacao - pontuacao.mean()) / desvio if desvio > 0 else np.zeros_like(pontuacao)
+        pesos = np.exp((padronizada - padronizada.max()) / temperatura)
+    if pesos.max() <= 0 or not np.isfinite(pesos).all():
+        pesos = np.ones_like(pontuacao)
+    # Números de peso zero continuam possíveis (com peso ínfimo), para que sempre haja 15 números a escolher
+    pesos = np.maximum(pesos, 1e-12 * pesos.max())
+    return pesos / pesos.sum()
+
+def _jogos_novos(masks, vistos, limite=None):
+    """
+    Mantém a primeira ocorrência de cada jogo, na ordem em que foram sorteados, descartando os já marcados
+    na tabela `vistos` (um booleano por máscara de 25 bits); marca os até `limite` jogos mantidos.
+    """
+    masks = masks[np.sort(np.unique(masks, return_index=True)[1])]
+    masks = masks[~vistos[masks]][:limite]
+    vistos[masks] = True
+    return masks
+
+def amostrar_jogos(pontuacao, quantidade=5, semente=None, unicos=False, temperatura=1.0, repetidos=None,
+                   ultimo_sorteio=None, tamanho=15, max_lotes=100):
+    """
+    Sorteia jogos de `tamanho` números com probabilidades dadas pelas pontuações de um modelo.
+
+    Cada jogo é uma amostra sem reposição em que cada número é escolhido, entre os restantes, com
+    probabilidade proporcional ao seu peso (ver pesos_amostragem). O sorteio é feito em lote pelo truque
+    Gumbel-top-k: somam-se ruídos de Gumbel aos log-pesos de uma matriz (jogos x 25) e os `tamanho`
+    maiores valores de cada linha formam o jogo, sem laços em Python por jogo.
+
+    Parâmetros:
+      pontuacao      : Vetor de 25 pontuações (por exemplo, de predicao.PONTUACOES).
+      quantidade     : Número de jogos.
+      semente        : Semente ou np.random.Generator (a mesma semente reproduz os mesmos jogos).
+      unicos         : Se True, descarta jogos repetidos e sorteia novos lotes até completar a quantidade.
+      temperatura    : Concentração da amostragem (ver pesos_amostragem).
+      repetidos      : Faixa opcional (mínimo, máximo) de números repetidos de ultimo_sorteio; jogos fora
+                       da faixa são descartados e substituídos.
+      ultimo_sorteio : Números do último sorteio, exigidos quando repetidos é informado.
+      max_lotes      : Limite de lotes sorteados antes de desistir de completar a quantidade.
+
+    Retorna:
+      Array uint32 com a máscara de bits de cada jogo (ver binario.bolas_de_mascaras para os números).
+    """
+    log_pesos = np.log(pesos_amostragem(pontuacao, temperatura)).astype(np.float32)
+    total = len(log_pesos)
+    if repetidos is not None:
+        if ultimo_sorteio is None:
+            raise ValueError("Informe o último sorteio para filtrar por números repetidos.")
+        ultima_mascara = np.uint32(mascara_de_numeros(ultimo_sorteio))
+
+    rng = np.random.default_rng(semente)
+    escolhidos = []
+    obtidos = 0
+    vistos = np.zeros(2**25, dtype=bool) if unicos else None
+    for _ in range(max_lotes):
+        faltam = quantidade - obtidos
+        if faltam <= 0:
+            break
+        # Folga para os jogos descartados por repetição ou pelo filtro
+        lote = min(TAMANHO_LOTE, faltam if not unicos and repetidos is None else 2 * faltam + 64)
+        # Ruído de Gumbel -log(-log(u)) em float32: metade da memória e do tempo do gerador em float64
+        with np.errstate(divide="ignore"):
+            chaves = log_pesos - np.log(-np.log(rng.random((lote, total), dtype=np.float32)))
+        indices = np.argpartition(chaves, total - tamanho, axis=1)[:, total - tamanho:]
+        masks = (np.uint32(1) << indices.astype(np.uint32)).sum(axis=1, dtype=np.uint32)
+
+        if repetidos is not None:
+            comuns = popcount(masks & ultima_mascara)
+            masks = masks[(comuns >= repetidos[0]) & (comuns <= repetidos[1])]
+        if unicos:
+            masks = _jogos_novos(masks, vistos, faltam)
+        escolhidos.append(masks[:faltam])
+        obtidos += len(escolhidos[-1])
+
+    if obtidos < quantidade:
+        raise ValueError(f"Só foi possível sortear {obtidos} de {quantidade} jogos com esses filtros.")
+    return np.concatenate(escolhidos)
+
+def gerar_arquivo_jogos(destino, pontuacao, quantidade, semente=None, unicos=False, temperatura=1.0,
+                        codificacao="mascara", metadados=None, tamanho_bloco=TAMANHO_LOTE):
+    """
+    Sorteia uma grande quantidade de jogos com amostrar_jogos e os grava em fluxo, bloco a bloco, em um
+    arquivo de apostas (ver arquivo_apostas.py), com memória limitada ao tamanho do bloco.
+
+    Parâmetros:
+      destino        : Caminho do arquivo (extensão arquivo_apostas.EXTENSAO) ou objeto de arquivo binário.
+      pontuacao      : Vetor de 25 pontuações do modelo.
+      quantidade     : Total de jogos gravados.
+      semente        : Semente do gerador (o mesmo arquivo é reproduzido com a mesma semente).
+      unicos         : Se True, nenhum jogo se repete no arquivo inteiro (controle por uma tabela de 2^25 bits).
+      codificacao    : "mascara" ou "rank".
+      metadados      : Dicionário gravado no cabeçalho; a semente, a temperatura e a pontuação são acrescentadas.
+
+    Retorna:
+      Cabeçalho do arquivo gravado (ver arquivo_apostas.ler_cabecalho), sem o deslocamento.
+    """
+    rng = np.random.default_rng(semente)
+    vistos = np.zeros(2**25, dtype=bool) if unicos else None
+    metadados = dict(metadados or {}, semente=semente, temperatura=temperatura, unicos=unicos,
+                     pontuacao=[float(v) for v in pontuacao])
+    blocos_sem_novos = 0
+    with EscritorApostas(destino, codificacao, metadados=metadados) as escritor:
+        while escritor.quantidade < quantidade:
+            # O mesmo gerador segue de um bloco para o outro, mantendo a sequência reprodutível
+            faltam = quantidade - escritor.quantidade
+            bloco = min(tamanho_bloco, faltam if not unicos else 2 * faltam + 64)
+            masks = amostrar_jogos(pontuacao, bloco, semente=rng, temperatura=temperatura)
+            if unicos:
+                masks = _jogos_novos(masks, vistos, faltam)
+                blocos_sem_novos = 0 if len(masks) else blocos_sem_novos + 1
+                if blocos_sem_novos == 100:
+                    raise ValueError(f"Só foi possível sortear {escritor.quantidade} de {quantidade} jogos distintos.")
+            escritor.escrever(masks)
+    return {"codificacao": codificacao, "quantidade": escritor.quantidade, "crc32": escritor.crc, "metadados": metadados}
+
+# --------------------------------------------------
+# GERAÇÃO DE JOGOS
+# --------------------------------------------------
+def gerar_jogos(df, modelo, mlb, quantidade=5, repetidos=None, pontuacao=None, semente=None, unicos=True, temperatura=1.0):
     """
     Gera uma quantidade de jogos (combinações aleatórias) para a Lotofácil.
     
     Como a função simulacao_monte_carlo não será utilizada, 
-    optamos por gerar combinações aleatórias de 15 números (de 1 a 25).
+    optamos por gerar combinações aleatórias de 15 números (de 1 a 25). Com `pontuacao`, os jogos são
+    sorteados com probabilidades dadas pelas pontuações do modelo escolhido (ver amostrar_jogos).
 
     Parâmetros:
-      - df: DataFrame com os dados históricos (não utilizado neste exemplo).
+      - df: DataFrame com os dados históricos (usado apenas pelo filtro de repetidos).
       - modelo, mlb: Parâmetros mantidos para compatibilidade, mas não são utilizados.
       - quantidade: Número de jogos a serem gerados.
+      - repetidos: Faixa opcional (mínimo, máximo) de números repetidos do último sorteio de df,
+        por exemplo a obtida com sobreposicao.MotorSobreposicao.faixa_repetidos().
+      - pontuacao: Vetor opcional de 25 pontuações de um modelo (por exemplo, de predicao.PONTUACOES).
+      - semente, unicos, temperatura: Repassados a amostrar_jogos quando há pontuação.
 
     Retorna:
       Um DataFrame cuja _index_ contém as combinações geradas.
       Assim, a interface que usa "gerar_jogos(...).index" continua funcionando.
     """
+    colunas = [f"Bola{i}" for i in range(1, 16)]
+    if pontuacao is not None:
+        ultimo_sorteio = df[colunas].iloc[-1].tolist() if repetidos is not None else None
+        masks = amostrar_jogos(pontuacao, quantidade, semente, unicos, temperatura, repetidos, ultimo_sorteio)
+        return pd.DataFrame(index=[tuple(int(n) for n in jogo) for jogo in bolas_de_mascaras(masks)])
+
     jogos = []
     for _ in range(quantidade):
-        # Gera uma combinação aleatória de 15 números dentre 1 a 25, sem repetição
-        jogo = sorted(random.sample(range(1, 26), 15))
+        if repetidos is not None:
+            # Restringe a quantidade de números repetidos do último sorteio
+            jogo = _sortear_com_repetidos(df[colunas].iloc[-1].tolist(), repetidos)
+        else:
+            # Gera uma combinação aleatória de 15 números dentre 1 a 25, sem repetição
+            jogo = sorted(random.sample(range(1, 26), 15))
         jogos.append(tuple(jogo))
     # Cria um DataFrame vazio e atribui o índice como sendo as combinações geradas
     return pd.DataFrame(index=jogos)
@@ -32,4 +210,12 @@ if __name__ == "__main__":
     jogos_gerados = gerar_jogos(dummy_df, None, None, quantidade=5)
     print("Jogos gerados:")
     for jogo in jogos_gerados.index:
-        print(list(jogo))
\ No newline at end of file
+        print(list(jogo))
+
+    # Amostragem ponderada: pontuações crescentes do 1 ao 25, com medição de desempenho
+    import time
+    pontuacao = np.arange(1, 26, dtype=float)
+    print("Jogos ponderados:", [list(jogo) for jogo in gerar_jogos(dummy_df, None, None, quantidade=3, pontuacao=pontuacao, semente=42).index])
+    inicio = time.time()
+    masks = amostrar_jogos(pontuacao, 1_000_000, semente=42)
+    print(f"⏱️ {len(masks):,} jogos ponderados em {time.time() - inicio:.2f}s")
\ No newline at end of file
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from binario import binario_de_mascaras, mascaras, matriz_bolas, popcount
+
+# 📌 Grupos de números do volante da Lotofácil (grade 5 x 5)
+PRIMOS = [2, 3, 5, 7, 11, 13, 17, 19, 23]
+MOLDURA = [1, 2, 3, 4, 5, 6, 10, 11, 15, 16, 20, 21, 22, 23, 24, 25]
+CENTRO = [7, 8, 9, 12, 13, 14, 17, 18, 19]
+
+DESCRITORES = ["soma", "impares", "primos", "moldura", "centro", "repetidos"]
+
+def calcular_descritores(df):
+    """
+    Calcula as colunas descritivas de cada sorteio de forma vetorizada.
+
+    Retorna:
+      DataFrame com Concurso, soma, impares, primos, moldura, centro e repetidos (números repetidos
+      do sorteio anterior; -1 no primeiro sorteio, que não tem anterior).
+    """
+    bolas = matriz_bolas(df)
+    masks = mascaras(bolas)
+    binario = binario_de_mascaras(masks).astype(np.int64)
+    repetidos = np.full(len(masks), -1, dtype=np.int64)
+    repetidos[1:] = popcount(masks[1:] & masks[:-1])
+    return pd.DataFrame({
+        "Concurso": df["Concurso"].to_numpy(dtype=np.int64),
+        "soma": bolas.sum(axis=1),
+        "impares": binario[:, 0::2].sum(axis=1),
+        "primos": binario[:, np.array(PRIMOS) - 1].sum(axis=1),
+        "moldura": binario[:, np.array(MOLDURA) - 1].sum(axis=1),
+        "centro": binario[:, np.array(CENTRO) - 1].sum(axis=1),
+        "repetidos": repetidos,
+    })
+
+class IndiceSorteios:
+    """
+    Índice invertido de bitmaps sobre o histórico: um bitmap por número (bit t ligado se o número saiu
+    no sorteio t) e, para cada descritor, bitmaps codificados por faixa (bit t ligado se o descritor do
+    sorteio t é <= v), de modo que qualquer intervalo [a, b] custa uma única operação AND NOT.
+
+    As consultas combinam os bitmaps com AND/OR e contam os resultados com popcount, sem percorrer
+    o DataFrame. Os bitmaps são arrays uint8 empacotados (np.packbits, ordem de bits "little").
+
+    Exemplo: sorteios com 1, 2 e 3, sem o 25, soma acima de 200, a partir do concurso 2000:
+        indice.contar(contem=[1, 2, 3], exclui=[25], soma=(201, None), concurso=(2000, None))
+    """
+
+    def __init__(self, descritores, binario):
+        ordem = np.argsort(descritores["Concurso"].to_numpy(), kind="stable")
+        self.descritores = descritores.iloc[ordem].reset_index(drop=True)
+        self.concursos = self.descritores["Concurso"].to_numpy()
+        self.total = len(self.concursos)
+        self._todos = self._empacotar(np.ones(self.total, dtype=bool))
+        self._numeros = np.array([self._empacotar(coluna) for coluna in np.asarray(binario, dtype=bool)[ordem].T])
+
+        # Codificação por faixa: para cada valor v distinto, bitmap dos sorteios com descritor <= v
+        self._faixas = {}
+        for nome in DESCRITORES:
+            coluna = self.descritores[nome].to_numpy()
+            valores = np.unique(coluna)
+            self._faixas[nome] = (valores, np.array([self._empacotar(coluna <= v) for v in valores]))
+
+    @classmethod
+    def de_historico(cls, df):
+        """Constrói o índice a partir do DataFrame com "Concurso" e "Bola1" a "Bola15"."""
+        return cls(calcular_descritores(df), binario_de_mascaras(mascaras(df)))
+
+    def _empacotar(self, booleanos):
+        return np.packbits(booleanos, bitorder="little")
+
+    def _ate(self, nome, limite):
+        """Bitmap dos sorteios com descritor <= limite."""
+        valores, bitmaps = self._faixas[nome]
+        posicao = np.searchsorted(valores, limite, side="right") - 1
+        return bitmaps[posicao] if posicao >= 0 else np.zeros_like(self._todos)
+
+    def _intervalo(self, nome, intervalo):
+        """Bitmap dos sorteios com descritor no intervalo (minimo, maximo), inclusivo; None deixa o lado aberto."""
+        minimo, maximo = intervalo if isinstance(intervalo, (tuple, list)) else (intervalo, intervalo)
+        bitmap = self._todos if maximo is None else self._ate(nome, maximo)
+        if minimo is not None:
+            bitmap = bitmap & ~self._ate(nome, minimo - 1)
+        return bitmap
+
+    def _intervalo_concursos(self, intervalo):
+        """Bitmap de um intervalo de concursos: como o índice é ordenado por concurso, são bits contíguos."""
+        minimo, maximo = intervalo if isinstance(intervalo, (tuple, list)) else (intervalo, intervalo)
+        inicio = 0 if minimo is None else np.searchsorted(self.concursos, minimo, side="left")
+        fim = self.total if maximo is None else np.searchsorted(self.concursos, maximo, side="right")
+        booleanos = np.zeros(self.total, dtype=bool)
+        booleanos[inicio:fim] = True
+        return self._empacotar(booleanos)
+
+    def consultar(self, contem=None, exclui=None, qualquer=None, concurso=None, **descritores):
+        """
+        Retorna o bitmap dos sorteios que satisfazem todas as condições. Números fora de 1..25 geram ValueError.
+
+        Parâmetros:
+          contem     : Números que precisam estar no sorteio (AND).
+          exclui     : Números que não podem estar no sorteio.
+          qualquer   : Ao menos um destes números precisa estar no sorteio (OR).
+          concurso   : Intervalo (minimo, maximo) de concursos, ou um concurso específico.
+          descritores: Intervalos (minimo, maximo) ou valores exatos para soma, impares, primos,
+                       moldura, centro e repetidos. None em um dos lados deixa o intervalo aberto.
+        """
+        for numeros in (contem, exclui, qualquer):
+            if numeros is not None and any(not 1 <= int(n) <= 25 for n in numeros):
+                raise ValueError("Números inválidos! Informe números de 1 a 25.")
+        bitmap = self._todos.copy()
+        for numero in contem or []:
+            bitmap &= self._numeros[numero - 1]
+        for numero in exclui or []:
+            bitmap &= ~self._numeros[numero - 1]
+        if qualquer:
+            bitmap &= np.bitwise_or.reduce(self._numeros[np.asarray(qualquer) - 1], axis=0)
+        if concurso is not None:
+            bitmap &= self._intervalo_concursos(concurso)
+        for nome, intervalo in descritores.items():
+            if nome not in self._faixas:
+                raise ValueError(f"Descritor inválido! Escolha entre: {', '.join(DESCRITORES)}.")
+            bitmap &= self._intervalo(nome, intervalo)
+        return bitmap & self._todos
+
+    def contar(self, **filtros):
+        """Quantidade de sorteios que satisfazem os filtros (ver consultar)."""
+        return int(popcount(self.consultar(**filtros)).sum())
+
+    def posicoes(self, **filtros):
+        """Posições (no histórico ordenado por concurso) dos sorteios que satisfazem os filtros."""
+        return np.flatnonzero(np.unpackbits(self.consultar(**filtros), count=self.total, bitorder="little"))
+
+    def buscar_concursos(self, **filtros):
+        """Números dos concursos que satisfazem os filtros (ver consultar)."""
+        return self.concursos[self.posicoes(**filtros)]
+
+    def buscar(self, **filtros):
+        """Linhas da tabela de descritores dos sorteios que satisfazem os filtros."""
+        return self.descritores.iloc[self.posicoes(**filtros)]
+
+if __name__ == "__main__":
+    # Teste do módulo individualmente
+    import time
+    from dados import carregar_dados
+
+    df = carregar_dados("data/Lotofacil.xlsx")
+    if df is not None:
+        indice = IndiceSorteios.de_historico(df)
+        filtros = {"contem": [1, 2, 3], "exclui": [25], "soma": (201, None), "concurso": (2000, None)}
+        inicio = time.perf_counter()
+        total = indice.contar(**filtros)
+        print(f"🔎 Sorteios com 1, 2 e 3, sem 25, soma > 200, desde o concurso 2000: {total} "
+              f"({(time.perf_counter() - inicio) * 1e6:.0f} µs)")
+        print("Concursos:", indice.buscar_concursos(**filtros))
+    else:
+        print("Erro ao carregar os dados.")
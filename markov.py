@@ -0,0 +1,140 @@
+from collections import deque
+
+import numpy as np
+
+def _normalizar_transicoes(contagens, origens):
+    """Divide cada linha de contagens pelo número de ocorrências do número de origem."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(origens[..., None] > 0, contagens / np.maximum(origens[..., None], 1), 0.0)
+
+def matriz_transicao(binario, k=1, janela=None):
+    """
+    Estima P(número j no sorteio t+1 | número i no sorteio t) com produtos das matrizes binárias deslocadas.
+
+    Com k > 1, considera as transições dos k sorteios anteriores (t, t-1, ..., t-k+1) para o sorteio t+1.
+
+    Parâmetros:
+      binario : Matriz binária dos sorteios (n_sorteios x 25), ver binario.matriz_binaria.
+      k       : Quantidade de sorteios anteriores considerados.
+      janela  : Se informado, usa apenas as transições cujo sorteio de destino está entre os últimos `janela`.
+
+    Retorna:
+      Array 25 x 25 onde [i - 1, j - 1] é a probabilidade de transição de i para j.
+    """
+    binario = np.asarray(binario, dtype=float)
+    n = len(binario)
+    inicio = 0 if janela is None else max(n - janela, 0)
+    contagens = np.zeros((25, 25))
+    origens = np.zeros(25)
+    for lag in range(1, k + 1):
+        primeiro_destino = max(lag, inicio)
+        if primeiro_destino >= n:
+            continue
+        destinos = binario[primeiro_destino:]
+        fontes = binario[primeiro_destino - lag:n - lag]
+        contagens += fontes.T @ destinos
+        origens += fontes.sum(axis=0)
+    return _normalizar_transicoes(contagens, origens)
+
+def pontuacao_transicao(binario, k=1, janela=None):
+    """
+    Pontuação dos 25 números para o próximo sorteio: média das probabilidades de transição a partir
+    dos números dos últimos k sorteios.
+    """
+    binario = np.asarray(binario, dtype=float)
+    fontes = binario[-k:].sum(axis=0)
+    if fontes.sum() == 0:
+        return np.zeros(25)
+    return fontes @ matriz_transicao(binario, k, janela) / fontes.sum()
+
+def pontuacoes_lote(binario, k=1, janela=None):
+    """
+    Pontua todos os passos históricos de uma só vez: a linha t contém a pontuação que o modelo daria
+    ao sorteio t usando apenas as transições observadas até o sorteio t - 1.
+
+    As contagens de cada passo são somas acumuladas das contribuições outer(origem_t, sorteio_t),
+    então o custo é O(n_sorteios x 25 x 25) em tempo e memória.
+
+    Retorna:
+      Array (n_sorteios x 25). A primeira linha é zero (não há histórico anterior).
+    """
+    binario = np.asarray(binario, dtype=float)
+    n = len(binario)
+
+    # Origem de cada transição com destino t: soma dos k sorteios anteriores
+    origem = np.zeros_like(binario)
+    for lag in range(1, k + 1):
+        origem[lag:] += binario[:-lag]
+
+    contagens = np.cumsum(origem[:, :, None] * binario[:, None, :], axis=0)
+    origens = np.cumsum(origem, axis=0)
+    if janela is not None:
+        contagens[janela:] -= contagens[:-janela].copy()
+        origens[janela:] -= origens[:-janela].copy()
+
+    # Para prever o sorteio t, usam-se as contagens acumuladas até t - 1
+    anteriores = np.zeros_like(contagens)
+    anteriores[1:] = contagens[:-1]
+    origens_anteriores = np.zeros_like(origens)
+    origens_anteriores[1:] = origens[:-1]
+    transicoes = _normalizar_transicoes(anteriores, origens_anteriores)
+
+    pesos = origem.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(pesos > 0, np.einsum("ni,nij->nj", origem, transicoes) / np.maximum(pesos, 1), 0.0)
+
+class TransicaoIncremental:
+    """
+    Mantém as contagens de transição e as atualiza a cada novo sorteio em tempo constante (O(25 x 25)).
+    Com `janela`, as contribuições das transições mais antigas são subtraídas ao sair da janela.
+    """
+
+    def __init__(self, k=1, janela=None):
+        self.k = k
+        self.janela = janela
+        self.contagens = np.zeros((25, 25))
+        self.origens = np.zeros(25)
+        self._recentes = deque(maxlen=k)
+        self._contribuicoes = deque()
+
+    def adicionar(self, sorteio):
+        """Incorpora um novo sorteio (lista com os 15 números)."""
+        vetor = np.zeros(25)
+        vetor[np.asarray(sorteio, dtype=int) - 1] = 1
+        if self._recentes:
+            origem = np.sum(self._recentes, axis=0)
+            self.contagens += np.outer(origem, vetor)
+            self.origens += origem
+            if self.janela is not None:
+                self._contribuicoes.append((origem, vetor))
+                if len(self._contribuicoes) > self.janela:
+                    origem_antiga, vetor_antigo = self._contribuicoes.popleft()
+                    self.contagens -= np.outer(origem_antiga, vetor_antigo)
+                    self.origens -= origem_antiga
+        self._recentes.append(vetor)
+
+    def matriz(self):
+        """Matriz 25 x 25 de probabilidades de transição atual."""
+        return _normalizar_transicoes(self.contagens, self.origens)
+
+    def pontuacao(self):
+        """Pontuação dos 25 números para o próximo sorteio."""
+        fontes = np.sum(self._recentes, axis=0) if self._recentes else np.zeros(25)
+        if fontes.sum() == 0:
+            return np.zeros(25)
+        return fontes @ self.matriz() / fontes.sum()
+
+if __name__ == "__main__":
+    # Teste do módulo individualmente
+    from dados import carregar_dados
+    from binario import matriz_binaria
+
+    df = carregar_dados("data/Lotofacil.xlsx")
+    if df is not None:
+        binario = matriz_binaria(df)
+        print("\nMatriz de transição (t -> t+1), primeiras linhas:")
+        print(np.round(matriz_transicao(binario)[:5], 3))
+        pontuacao = pontuacao_transicao(binario)
+        print("Pontuação para o próximo sorteio:", np.round(pontuacao, 3))
+    else:
+        print("Erro ao carregar os dados.")
\ No newline at end of file
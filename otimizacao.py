@@ -0,0 +1,149 @@
+import heapq
+
+import numpy as np
+
+from binario import binario_de_mascaras, numeros_de_mascara
+
+# --------------------------------------------------
+# OBJETIVO: TERMOS POR NÚMERO E POR PAR
+# --------------------------------------------------
+# O valor de uma combinação S é
+#     f(S) = soma_{i em S} pontuacao[i] + peso_pares * soma_{i < j em S} pares[i, j]
+# de modo que a escolha considera a estrutura de pares, e não apenas os 15 melhores números isolados.
+
+def matriz_pares(binario):
+    """
+    Termo de par a partir das co-ocorrências do histórico: o "lift" P(i e j) / (P(i) P(j)) - 1,
+    positivo para pares que saem juntos mais do que o esperado pela frequência de cada número.
+
+    Parâmetros:
+      binario : Matriz binária dos sorteios (n_sorteios x 25), ver binario.matriz_binaria.
+
+    Retorna:
+      Array 25 x 25 simétrico, com diagonal zero.
+    """
+    binario = np.asarray(binario, dtype=float)
+    n = max(len(binario), 1)
+    frequencias = binario.sum(axis=0) / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lift = (binario.T @ binario / n) / np.outer(frequencias, frequencias) - 1
+    lift = np.nan_to_num(lift, nan=0.0, posinf=0.0, neginf=0.0)
+    np.fill_diagonal(lift, 0)
+    return lift
+
+def valor_combinacoes(masks, pontuacao, pares, peso_pares=1.0):
+    """Valor do objetivo para um array de máscaras (vetorizado: x·u + peso_pares · x·P·x / 2)."""
+    x = binario_de_mascaras(masks).astype(float)
+    return x @ np.asarray(pontuacao, dtype=float) + peso_pares * ((x @ pares) * x).sum(axis=-1) / 2
+
+# --------------------------------------------------
+# BUSCA EM FEIXE (BEAM SEARCH)
+# --------------------------------------------------
+def busca_feixe(pontuacao, pares, peso_pares=1.0, tamanho=15, n_combinacoes=10, largura=2000):
+    """
+    Constrói as combinações número a número, mantendo a cada passo as `largura` combinações parciais
+    de maior valor. Os estados são máscaras de bits; as expansões (estado x número) são avaliadas de
+    uma vez com o ganho marginal de cada número, e máscaras repetidas são descartadas.
+
+    Retorna:
+      Lista de até n_combinacoes tuplas (números, valor), em ordem decrescente de valor.
+    """
+    pontuacao = np.asarray(pontuacao, dtype=float)
+    pares = peso_pares * np.asarray(pares, dtype=float)
+    total = len(pontuacao)
+    bits = np.uint32(1) << np.arange(total, dtype=np.uint32)
+
+    masks = np.zeros(1, dtype=np.uint32)
+    valores = np.zeros(1)
+    ganhos = pontuacao[None, :].copy()  # Ganho marginal de cada número para cada estado
+
+    for _ in range(tamanho):
+        livres = (masks[:, None] & bits[None, :]) == 0
+        estados, numeros = np.nonzero(livres)
+        novas_masks = masks[estados] | bits[numeros]
+        novos_valores = valores[estados] + ganhos[estados, numeros]
+
+        # Máscaras repetidas têm o mesmo valor: mantém uma só e fica com as `largura` melhores
+        novas_masks, unicos = np.unique(novas_masks, return_index=True)
+        estados, numeros, novos_valores = estados[unicos], numeros[unicos], novos_valores[unicos]
+        melhores = np.argsort(-novos_valores, kind="stable")[:largura]
+
+        masks = novas_masks[melhores]
+        valores = novos_valores[melhores]
+        ganhos = ganhos[estados[melhores]] + pares[numeros[melhores]]
+
+    return [(numeros_de_mascara(m, total), float(v)) for m, v in zip(masks[:n_combinacoes], valores[:n_combinacoes])]
+
+# --------------------------------------------------
+# BRANCH-AND-BOUND (TOP-N EXATO)
+# --------------------------------------------------
+def branch_and_bound(pontuacao, pares, peso_pares=1.0, tamanho=15, n_combinacoes=10):
+    """
+    Encontra as n_combinacoes melhores combinações exatas com busca em profundidade (incluir / excluir
+    cada número, na ordem das maiores pontuações) e poda por limite superior.
+
+    Limite superior de um nó com r números ainda a escolher entre os restantes R:
+        valor atual + soma dos r maiores (ganho_j + peso_pares * h_j), j em R
+    onde ganho_j é o ganho marginal exato de j frente aos números já escolhidos e h_j é metade da soma
+    dos r - 1 maiores termos de par positivos de j (pré-calculados). Um ramo é podado quando o limite
+    não supera a pior das n_combinacoes melhores já encontradas.
+
+    Retorna:
+      Lista de até n_combinacoes tuplas (números, valor), em ordem decrescente de valor.
+    """
+    pontuacao = np.asarray(pontuacao, dtype=float)
+    pares = peso_pares * np.asarray(pares, dtype=float)
+    total = len(pontuacao)
+    ordem = np.argsort(-pontuacao, kind="stable")
+
+    # h[j, t]: metade da soma dos t maiores termos de par positivos do número j
+    positivos = -np.sort(-np.maximum(pares, 0), axis=1)
+    h = np.zeros((total, total + 1))
+    h[:, 1:] = np.cumsum(positivos, axis=1) / 2
+
+    melhores = []  # heap mínimo de (valor, máscara)
+
+    def explorar(posicao, mascara, escolhidos, valor, ganhos):
+        faltam = tamanho - escolhidos
+        if faltam == 0:
+            item = (valor, mascara)
+            if len(melhores) < n_combinacoes:
+                heapq.heappush(melhores, item)
+            elif item > melhores[0]:
+                heapq.heapreplace(melhores, item)
+            return
+        restantes = ordem[posicao:]
+        if len(restantes) < faltam:
+            return
+        if len(melhores) == n_combinacoes:
+            otimista = ganhos[restantes] + h[restantes, faltam - 1]
+            limite = valor + np.partition(otimista, len(otimista) - faltam)[-faltam:].sum()
+            if limite <= melhores[0][0]:
+                return
+        numero = ordem[posicao]
+        explorar(posicao + 1, mascara | (1 << int(numero)), escolhidos + 1, valor + ganhos[numero], ganhos + pares[numero])
+        explorar(posicao + 1, mascara, escolhidos, valor, ganhos)
+
+    explorar(0, 0, 0, 0.0, pontuacao.copy())
+    return [(numeros_de_mascara(m, total), float(v)) for v, m in sorted(melhores, reverse=True)]
+
+def otimizar_combinacoes(pontuacao, pares, peso_pares=1.0, tamanho=15, n_combinacoes=10, metodo="feixe", largura=2000):
+    """
+    Busca as combinações de `tamanho` números que maximizam o objetivo com termos por número e por par.
+
+    Parâmetros:
+      pontuacao     : Vetor de 25 pontuações (por exemplo, de predicao.pontuacao_frequencia).
+      pares         : Matriz 25 x 25 de termos de par (por exemplo, matriz_pares).
+      peso_pares    : Peso dos termos de par (0 equivale a escolher os maiores números isoladamente).
+      n_combinacoes : Quantidade de combinações distintas retornadas.
+      metodo        : "feixe" (busca em feixe, rápida) ou "exato" (branch-and-bound).
+      largura       : Largura do feixe.
+
+    Retorna:
+      Lista de tuplas (números, valor), em ordem decrescente de valor.
+    """
+    if metodo == "feixe":
+        return busca_feixe(pontuacao, pares, peso_pares, tamanho, n_combinacoes, largura)
+    if metodo == "exato":
+        return branch_and_bound(pontuacao, pares, peso_pares, tamanho, n_combinacoes)
+    raise ValueError("Método inválido! Escolha 'feixe' ou 'exato'.")
@@ -1,11 +1,75 @@
 import streamlit as st
+import pandas as pd
 import uuid
 import datetime
+import io
+from contextlib import closing
 from dados import carregar_dados
 from estatisticas import obter_estatisticas
-from predicao import predicao_supervisionada, predicao_frequencia, predicao_clustering
-from gerador_jogos import gerar_jogos
-from banco import listar_grupos_apostas, salvar_grupo_apostas, remover_grupo_apostas, listar_sorteios_com_apostas, listar_apostas_por_sorteio
+from servidor_predicao import pontuar
+from comparacao import METODOS_COMPARACAO, comparar_metodos, executar_backtests_comparacao
+from carteira import avaliar_carteira
+from gerador_jogos import gerar_jogos, gerar_arquivo_jogos
+from arquivo_apostas import EXTENSAO, jogos_de_mascaras
+from predicao import combinacoes_otimizadas, selecionar_numeros
+from sobreposicao import MotorSobreposicao
+from indice import IndiceSorteios
+from backtest_iterativo import iterar_backtest, estatisticas_parciais
+from varredura import MODELOS
+from significancia import media_acaso
+from banco import salvar_grupo_apostas, remover_grupo_apostas, listar_sorteios_com_apostas, listar_apostas_por_sorteio, contar_apostas_por_sorteio, obter_grupo_apostas, exportar_grupo_apostas, importar_grupo_apostas
+
+# 📌 Quantidade de grupos exibidos por página em "Gerenciar Apostas"
+GRUPOS_POR_PAGINA = 20
+# 📌 Jogos exibidos por grupo (grupos importados podem ter milhões de jogos)
+JOGOS_EXIBIDOS = 100
+
+def exibir_backtest(resultados, meta_acertos, grafico, metricas):
+    """Atualiza o gráfico de acertos e as estatísticas acumuladas de um backtest (completo ou parcial)."""
+    validos = [r for r in resultados if r["acertos"] is not None]
+    if not validos:
+        return
+    acertos = pd.Series([r["acertos"] for r in validos], index=[r["concurso"] for r in validos], name="Acertos")
+    acaso = media_acaso()
+    grafico.line_chart(pd.DataFrame({
+        "Acertos": acertos,
+        "Média acumulada": acertos.expanding().mean(),
+        "Média ao acaso": acaso,
+    }))
+    resumo = estatisticas_parciais(acertos.tolist(), meta_acertos)
+    with metricas.container():
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("🎯 Sorteios avaliados", resumo["sorteios"])
+        col2.metric("📊 Média de acertos", f"{resumo['media_acertos']:.2f}", f"{resumo['media_acertos'] - acaso:+.2f} vs acaso")
+        col3.metric(f"🏆 Taxa >= {meta_acertos}", f"{resumo['taxa_meta']:.1%}")
+        col4.metric("📐 Valor-p (média)", f"{resumo['p_valor_media']:.4f}")
+
+def exibir_avaliacao_exata(jogos):
+    """Calcula e exibe as probabilidades exatas de premiação de um grupo de apostas (ver carteira.py)."""
+    with st.spinner("Avaliando o grupo frente aos 3.268.760 resultados possíveis..."):
+        avaliacao = avaliar_carteira(jogos)
+    col1, col2 = st.columns(2)
+    col1.metric("🏆 Probabilidade de algum prêmio", f"{avaliacao.attrs['prob_algum_premio']:.4%}")
+    col2.metric("🎯 Jogos premiados esperados", f"{avaliacao.attrs['jogos_premiados_esperados']:.4f}")
+    st.dataframe(avaliacao.rename(columns={
+        "prob_algum_jogo": "Algum jogo na faixa",
+        "prob_melhor_faixa": "Melhor resultado do grupo",
+        "prob_pelo_menos": "Faixa ou superior",
+        "jogos_esperados": "Jogos esperados",
+    }).style.format({
+        "Algum jogo na faixa": "{:.6%}", "Melhor resultado do grupo": "{:.6%}",
+        "Faixa ou superior": "{:.6%}", "Jogos esperados": "{:.6f}",
+    }))
+
+# 📌 Estruturas pré-calculadas do histórico: construídas uma vez por versão dos dados (o DataFrame é a
+# chave do cache) e compartilhadas entre as execuções do script, em vez de refeitas a cada interação
+@st.cache_resource
+def carregar_motor_sobreposicao(df):
+    return MotorSobreposicao.de_historico(df)
+
+@st.cache_resource
+def carregar_indice(df):
+    return IndiceSorteios.de_historico(df)
 
 # 📌 Carregar dados históricos da Lotofácil
 df = carregar_dados()
@@ -22,7 +86,7 @@ st.title("🎲 Painel de Controle - Lotofácil")
 st.sidebar.title("📌 Menu de Navegação")
 
 # 📌 Criar menu de navegação na sidebar
-menu_opcao = st.sidebar.radio("Escolha uma seção:", ["Dashboard", "Gerar Apostas", "Gerenciar Apostas"])
+menu_opcao = st.sidebar.radio("Escolha uma seção:", ["Dashboard", "Gerar Apostas", "Gerenciar Apostas", "Backtest"])
 
 ### **1️⃣ Dashboard - Exibição de Estatísticas**
 if menu_opcao == "Dashboard":
@@ -35,37 +99,123 @@ if menu_opcao == "Dashboard":
     with col2:
         st.metric("📊 Total de Jogos", estatisticas['total_jogos'])
         st.metric("⭐ Números mais Frequentes", ", ".join(map(str, estatisticas['mais_sorteados'])))
+    
+    # 🔁 Repetição de números entre sorteios consecutivos (sobreposição com defasagem)
+    st.subheader("🔁 Repetição de Números entre Sorteios")
+    motor_sobreposicao = carregar_motor_sobreposicao(df)
+    lag = st.slider("Defasagem (sorteios anteriores):", min_value=1, max_value=motor_sobreposicao.max_lag, value=1)
+    janela = st.slider("Janela (últimos sorteios):", min_value=20, max_value=500, step=10, value=100)
+    resumo = motor_sobreposicao.resumo(lag=lag, janela=janela)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🔁 Média de repetidos", f"{resumo['media']:.2f}")
+    col2.metric("📉 Mínimo / Máximo", f"{resumo['minimo']} / {resumo['maximo']}")
+    col3.metric("🎯 Faixa típica (80%)", "%d a %d" % motor_sobreposicao.faixa_repetidos(lag=lag, janela=janela))
+    
+    st.line_chart(pd.DataFrame({
+        "Repetidos": motor_sobreposicao.serie(lag=lag),
+        "Média móvel (20)": motor_sobreposicao.media_movel(lag=lag, janela=20),
+    }).tail(janela))
+    st.write("**Probabilidade de cada número se repetir:**")
+    st.bar_chart(pd.Series(motor_sobreposicao.probabilidades_persistencia(lag=lag, janela=janela), index=range(1, 26), name="Persistência"))
+    
+    # 🔎 Consulta ao histórico pelo índice de bitmaps (números, descritores e intervalo de concursos)
+    st.subheader("🔎 Consulta ao Histórico")
+    indice = carregar_indice(df)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        contem = st.multiselect("Contém os números:", list(range(1, 26)))
+        exclui = st.multiselect("Não contém os números:", list(range(1, 26)))
+    with col2:
+        faixa_soma = st.slider("Soma dos números:", min_value=120, max_value=270, value=(120, 270))
+        faixa_impares = st.slider("Quantidade de ímpares:", min_value=0, max_value=15, value=(0, 15))
+        faixa_repetidos_consulta = st.slider("Repetidos do sorteio anterior:", min_value=0, max_value=15, value=(0, 15))
+    with col3:
+        faixa_primos = st.slider("Quantidade de primos:", min_value=0, max_value=9, value=(0, 9))
+        faixa_moldura = st.slider("Números na moldura:", min_value=0, max_value=15, value=(0, 15))
+        faixa_concursos = st.slider("Concursos:", min_value=1, max_value=max(ultimo_sorteio, 2), value=(1, max(ultimo_sorteio, 2)))
+    
+    filtros_consulta = {
+        "contem": contem, "exclui": exclui, "soma": faixa_soma, "impares": faixa_impares, "primos": faixa_primos,
+        "moldura": faixa_moldura, "concurso": faixa_concursos,
+        # O primeiro sorteio não tem anterior (repetidos = -1): só é excluído se a faixa começar acima de zero
+        "repetidos": (faixa_repetidos_consulta[0] or None, faixa_repetidos_consulta[1]),
+    }
+    inicio_consulta = datetime.datetime.now()
+    posicoes = indice.posicoes(**filtros_consulta)
+    tempo_consulta = (datetime.datetime.now() - inicio_consulta).total_seconds() * 1e6
+    encontrados = indice.descritores.iloc[posicoes]
+    st.metric("📌 Sorteios encontrados", f"{len(encontrados)} de {indice.total}")
+    st.caption(f"⏱️ Consulta respondida em {tempo_consulta:.0f} µs")
+    st.dataframe(encontrados.merge(df[["Concurso"] + [f"Bola{i}" for i in range(1, 16)]], on="Concurso").set_index("Concurso"))
 
 ### **2️⃣ Gerar novas apostas**
 elif menu_opcao == "Gerar Apostas":
     st.header("🧠 Escolher Método de Predição")
     
-    # Novo select box com 3 opções: Supervisionada, Frequência Condicional e Clustering
+    # Select box com os métodos disponíveis
     metodo_predicao = st.selectbox(
         "Selecione o método de predição:",
-        ["Supervisionada", "Frequência Condicional", "Clustering"]
+        ["Supervisionada", "Frequência Condicional", "Clustering", "Frequência com Decaimento", "Transição (Markov)", "Ensemble", "Otimização de Combinações"]
     )
     
     # Caso o método seja supervisionado, exibe uma opção adicional para escolher o modelo
     if metodo_predicao == "Supervisionada":
         modelo_escolhido = st.radio("Selecione o modelo supervisionado:", ["RandomForest", "MLP"])
+    elif metodo_predicao == "Clustering":
+        algoritmo_clustering = st.radio("Algoritmo de clustering:", ["kmeans", "kmodes", "kmedoids"], horizontal=True)
+    elif metodo_predicao == "Frequência com Decaimento":
+        meia_vida = st.slider("Meia-vida (em concursos):", min_value=5, max_value=1000, step=5, value=50)
+    elif metodo_predicao == "Otimização de Combinações":
+        pontuacao_base = st.selectbox("Pontuação por número:", ["frequencia", "decaimento", "markov", "clustering", "supervisionada", "ensemble"])
+        peso_pares = st.slider("Peso dos pares (0 = apenas números isolados):", min_value=0.0, max_value=5.0, step=0.1, value=1.0)
+        busca_exata = st.checkbox("Busca exata (branch-and-bound)")
+    
+    # Filtro opcional: quantidade de números repetidos do último sorteio nas apostas sugeridas
+    faixa_repetidos = None
+    if st.checkbox("Filtrar apostas por números repetidos do último sorteio"):
+        faixa_padrao = carregar_motor_sobreposicao(df).faixa_repetidos(janela=200)
+        faixa_repetidos = st.slider("Quantidade de repetidos:", min_value=0, max_value=15, value=faixa_padrao)
     
     # Opcional: Definir quantidade de simulações se aplicável (você pode manter ou remover esse slider, conforme a necessidade)
     n_simulacoes = st.slider("Quantidade de simulações (se aplicável):", min_value=100, max_value=5000, step=100, value=1000)
 
+    # Amostragem das apostas pelas pontuações do modelo (ver gerador_jogos.amostrar_jogos)
+    if metodo_predicao != "Otimização de Combinações":
+        temperatura = st.slider("Temperatura da amostragem (menor = mais concentrada nos números de maior pontuação):",
+                                min_value=0.05, max_value=3.0, step=0.05, value=1.0)
+        semente = st.number_input("Semente da amostragem (0 = aleatória):", min_value=0, value=0, step=1)
+
     if st.button("🔄 Gerar sugestão de aposta"):
-        # Chama a função de predição de acordo com a escolha do usuário
+        # Obtém o vetor de 25 pontuações do método escolhido
+        # (via servidor de predição local, se estiver rodando; caso contrário, no próprio processo)
         if metodo_predicao == "Supervisionada":
-            previsao = predicao_supervisionada(df, modelo_escolhido=modelo_escolhido)
+            pontuacao = pontuar("supervisionada", {"modelo_escolhido": modelo_escolhido}, df=df)
         elif metodo_predicao == "Frequência Condicional":
-            previsao = predicao_frequencia(df)
+            pontuacao = pontuar("frequencia", df=df)
         elif metodo_predicao == "Clustering":
-            previsao = predicao_clustering(df)
+            pontuacao = pontuar("clustering", {"algoritmo": algoritmo_clustering}, df=df)
+        elif metodo_predicao == "Frequência com Decaimento":
+            pontuacao = pontuar("decaimento", {"meia_vida": meia_vida}, df=df)
+        elif metodo_predicao == "Transição (Markov)":
+            pontuacao = pontuar("markov", df=df)
+        elif metodo_predicao == "Ensemble":
+            pontuacao = pontuar("ensemble", df=df)
+
+        if metodo_predicao == "Otimização de Combinações":
+            # As 5 combinações de maior valor conjunto já são as apostas sugeridas
+            combinacoes = combinacoes_otimizadas(df, pontuacao_base, peso_pares, n_combinacoes=5, busca="exato" if busca_exata else "feixe")
+            previsao = combinacoes[0][0]
         else:
-            previsao = []
+            # A sugestão são os 15 números de maior pontuação (o mesmo resultado de predicao.predicao_<método>)
+            previsao = selecionar_numeros(pontuacao)
         
-        # Gerar apostas sugeridas: aqui usamos a função gerar_jogos que foi atualizada para combinações aleatórias
-        sugestao_jogos = [list(jogo) for jogo in gerar_jogos(df, None, None, quantidade=5).index]
+        # Gerar apostas sugeridas: jogos distintos sorteados com as probabilidades dadas pelas pontuações do modelo
+        if metodo_predicao == "Otimização de Combinações":
+            sugestao_jogos = [numeros for numeros, _ in combinacoes]
+        else:
+            sugestao_jogos = [list(jogo) for jogo in gerar_jogos(df, None, None, quantidade=5, repetidos=faixa_repetidos, pontuacao=pontuacao,
+                                                                 semente=semente or None, temperatura=temperatura).index]
 
         id_grupo = str(uuid.uuid4())
         data_geracao = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -73,9 +223,13 @@ elif menu_opcao == "Gerar Apostas":
             "id_grupo": id_grupo,
             "data_geracao": data_geracao,
             "sorteio_vinculado": proximo_sorteio,
-            "modelo_utilizado": f"{metodo_predicao}" + (f" - {modelo_escolhido}" if metodo_predicao == "Supervisionada" else ""),
+            "modelo_utilizado": f"{metodo_predicao}" + (f" - {modelo_escolhido}" if metodo_predicao == "Supervisionada" else "")
+                                + (f" - {algoritmo_clustering}" if metodo_predicao == "Clustering" else "")
+                                + (f" - meia-vida {meia_vida}" if metodo_predicao == "Frequência com Decaimento" else "")
+                                + (f" - {pontuacao_base} - pares {peso_pares}" if metodo_predicao == "Otimização de Combinações" else ""),
             "sugestao_gerada": previsao,
-            "apostas_sugeridas": sugestao_jogos
+            "apostas_sugeridas": sugestao_jogos,
+            "pontuacao": pontuacao if metodo_predicao != "Otimização de Combinações" else None
         }
         st.success(f"✅ Grupo de apostas gerado! ID: {id_grupo[-8:]} | Vinculado ao Sorteio {proximo_sorteio}")
     
@@ -90,34 +244,185 @@ elif menu_opcao == "Gerar Apostas":
         for i, jogo in enumerate(st.session_state["grupo_apostas"]["apostas_sugeridas"], start=1):
             st.write(f"✅ **Jogo {i}:** {', '.join(map(str, jogo))}")
         
+        if st.button("🎯 Calcular probabilidades exatas de premiação"):
+            exibir_avaliacao_exata(st.session_state["grupo_apostas"]["apostas_sugeridas"])
+        
         if st.button("💾 Salvar Grupo de Apostas no Banco"):
             salvar_grupo_apostas(st.session_state["grupo_apostas"])
             st.success(f"✅ Grupo `{st.session_state['grupo_apostas']['id_grupo'][-8:]}` salvo!")
+        
+        # Lote grande de jogos sorteados pelas mesmas pontuações, gravado no formato binário (4 bytes por jogo)
+        if st.session_state["grupo_apostas"].get("pontuacao") is not None:
+            with st.expander("📦 Gerar lote grande de jogos em arquivo"):
+                quantidade_lote = st.number_input("Quantidade de jogos:", min_value=1000, max_value=50_000_000, value=1_000_000, step=100_000)
+                unicos_lote = st.checkbox("Sem jogos repetidos no lote", value=True)
+                if st.button("📦 Gerar arquivo de apostas"):
+                    grupo = st.session_state["grupo_apostas"]
+                    buffer = io.BytesIO()
+                    inicio_lote = datetime.datetime.now()
+                    with st.spinner(f"Sorteando {quantidade_lote:,} jogos..."):
+                        gerar_arquivo_jogos(buffer, grupo["pontuacao"], int(quantidade_lote), unicos=unicos_lote, metadados={
+                            "id_grupo": grupo["id_grupo"], "data_geracao": grupo["data_geracao"], "sorteio_vinculado": grupo["sorteio_vinculado"],
+                            "modelo_utilizado": grupo["modelo_utilizado"], "sugestao_gerada": grupo["sugestao_gerada"],
+                        })
+                    tempo_lote = (datetime.datetime.now() - inicio_lote).total_seconds()
+                    st.success(f"✅ {quantidade_lote:,} jogos em {tempo_lote:.1f}s ({len(buffer.getvalue()) / 1e6:.1f} MB)")
+                    st.download_button("⬇️ Baixar arquivo de apostas", buffer.getvalue(), file_name=f"apostas_{grupo['id_grupo'][-8:]}{EXTENSAO}")
+    
+    # ⚡ Comparação de todos os métodos em paralelo (resultados exibidos à medida que terminam)
+    st.subheader("⚡ Comparar Todos os Métodos")
+    col_sorteios, col_meta = st.columns(2)
+    num_sorteios_comparacao = col_sorteios.slider("Concursos do backtest de cada método:", min_value=10, max_value=200, step=10, value=50)
+    meta_comparacao = col_meta.slider("Meta de acertos do backtest:", min_value=11, max_value=15, value=11)
+    # Os backtests ficam na varredura: calcular de novo só completa os concursos que faltam
+    if st.button("🎯 Calcular backtests dos métodos"):
+        with st.spinner(f"Calculando os backtests dos últimos {num_sorteios_comparacao} concursos..."):
+            executar_backtests_comparacao(df, num_sorteios=num_sorteios_comparacao)
+        st.success("✅ Backtests atualizados.")
+    if st.button("⚡ Comparar métodos em paralelo"):
+        colunas_comparacao = st.columns(len(METODOS_COMPARACAO))
+        espacos = {}
+        for coluna, nome in zip(colunas_comparacao, METODOS_COMPARACAO):
+            with coluna:
+                st.markdown(f"**{nome}**")
+                espacos[nome] = st.empty()
+                espacos[nome].info("⏳ Calculando...")
+        
+        inicio = datetime.datetime.now()
+        soma_tempos = 0.0
+        for resultado in comparar_metodos(df, num_sorteios=num_sorteios_comparacao, meta_acertos=meta_comparacao):
+            with espacos[resultado["nome"]].container():
+                if resultado["erro"]:
+                    st.error(f"❌ {resultado['erro']}")
+                    continue
+                soma_tempos += resultado["tempo"]
+                st.write(f"`{', '.join(map(str, resultado['previsao']))}`")
+                st.caption(f"⏱️ Tempo de cálculo: {resultado['tempo']:.1f}s")
+                backtest = resultado["backtest"]
+                if backtest:
+                    st.caption(f"🎯 Backtest ({backtest['sorteios']} sorteios): média {backtest['media_acertos']:.2f} | "
+                               f">= {meta_comparacao} acertos: {backtest['taxa_meta']:.1%}")
+                else:
+                    st.caption("🎯 Backtest: ainda não calculado (use \"🎯 Calcular backtests dos métodos\")")
+        tempo_total = (datetime.datetime.now() - inicio).total_seconds()
+        st.success(f"✅ Comparação concluída em {tempo_total:.1f}s (soma dos tempos individuais: {soma_tempos:.1f}s)")
 
 ### **3️⃣ Gerenciar Apostas**
 elif menu_opcao == "Gerenciar Apostas":
     st.header("📂 Seleção de Sorteios com Apostas")
     
+    # Importação de um arquivo de apostas (formato binário de arquivo_apostas.py)
+    with st.expander("📥 Importar grupo de apostas"):
+        arquivo_importado = st.file_uploader("Arquivo de apostas:", type=[EXTENSAO.lstrip(".")])
+        sorteio_importado = st.number_input("Sorteio vinculado (0 = o do arquivo):", min_value=0, value=0, step=1)
+        if arquivo_importado is not None and st.button("📥 Importar"):
+            try:
+                grupo_importado = importar_grupo_apostas(io.BytesIO(arquivo_importado.getvalue()), sorteio_vinculado=sorteio_importado or None)
+                st.success(f"✅ Grupo `{grupo_importado['id_grupo'][-8:]}` importado com {grupo_importado['quantidade']:,} jogos "
+                           f"(sorteio {grupo_importado['sorteio_vinculado']})")
+            except ValueError as e:
+                st.error(f"❌ {e}")
+    
     sorteios_disponiveis = listar_sorteios_com_apostas()
     if sorteios_disponiveis:
         sorteio_escolhido = st.selectbox("Escolha um sorteio para visualizar apostas:", sorteios_disponiveis)
-        grupos_por_sorteio = listar_apostas_por_sorteio(sorteio_escolhido)
+        
+        # Paginação por cursor: guarda o cursor de início de cada página já visitada
+        if st.session_state.get("paginas_sorteio") != sorteio_escolhido:
+            st.session_state["paginas_sorteio"] = sorteio_escolhido
+            st.session_state["cursores_grupos"] = [None]
+        cursores = st.session_state["cursores_grupos"]
+        grupos_por_sorteio = listar_apostas_por_sorteio(sorteio_escolhido, limite=GRUPOS_POR_PAGINA + 1, apos=cursores[-1])
+        tem_proxima = len(grupos_por_sorteio) > GRUPOS_POR_PAGINA
+        grupos_por_sorteio = grupos_por_sorteio[:GRUPOS_POR_PAGINA]
+        
+        col_anterior, col_pagina, col_proxima = st.columns([1, 2, 1])
+        with col_anterior:
+            if st.button("⬅️ Anterior", disabled=len(cursores) == 1):
+                cursores.pop()
+                st.rerun()
+        with col_pagina:
+            st.write(f"Página {len(cursores)} | {contar_apostas_por_sorteio(sorteio_escolhido)} grupo(s) no sorteio")
+        with col_proxima:
+            if st.button("Próxima ➡️", disabled=not tem_proxima):
+                ultimo = grupos_por_sorteio[-1]
+                cursores.append((ultimo["data_geracao"], ultimo["id_grupo"]))
+                st.rerun()
+        
         if grupos_por_sorteio:
-            opcoes_grupo = {f"{g['id_grupo'][-8:]} - {g['modelo_utilizado']} - {g['data_geracao']}": g for g in grupos_por_sorteio}
+            opcoes_grupo = {f"{g['id_grupo'][-8:]} - {g['modelo_utilizado']} - {g['data_geracao']}": g["id_grupo"] for g in grupos_por_sorteio}
             id_escolhido = st.selectbox("Selecione o grupo de apostas:", list(opcoes_grupo.keys()))
-            grupo_selecionado = opcoes_grupo[id_escolhido]
+            # As apostas só são carregadas e decodificadas para o grupo aberto
+            grupo_selecionado = obter_grupo_apostas(opcoes_grupo[id_escolhido], como_mascaras=True)
             st.write(f"**Data de Geração:** `{grupo_selecionado['data_geracao']}`")
             st.write(f"**Vinculado ao Sorteio:** `{grupo_selecionado['sorteio_vinculado']}`")
             st.write(f"**Sugestão Gerada:** `{', '.join(map(str, grupo_selecionado['sugestao_gerada']))}`")
             st.write(f"**Modelo utilizado:** `{grupo_selecionado['modelo_utilizado']}`")
             
-            st.write("**Apostas Sugeridas:**")
-            for i, jogo in enumerate(grupo_selecionado["apostas_sugeridas"], start=1):
+            mascaras_grupo = grupo_selecionado["apostas_sugeridas"]
+            st.write(f"**Apostas Sugeridas:** {len(mascaras_grupo):,} jogo(s)")
+            for i, jogo in enumerate(jogos_de_mascaras(mascaras_grupo[:JOGOS_EXIBIDOS]), start=1):
                 st.write(f"✅ **Jogo {i}:** {', '.join(map(str, jogo))}")
+            if len(mascaras_grupo) > JOGOS_EXIBIDOS:
+                st.caption(f"Exibindo os {JOGOS_EXIBIDOS} primeiros jogos.")
+            
+            if st.button("🎯 Calcular probabilidades exatas de premiação"):
+                exibir_avaliacao_exata(mascaras_grupo)
+            
+            buffer_exportacao = io.BytesIO()
+            exportar_grupo_apostas(grupo_selecionado["id_grupo"], buffer_exportacao)
+            st.download_button("⬇️ Exportar grupo (arquivo binário)", buffer_exportacao.getvalue(),
+                               file_name=f"apostas_{grupo_selecionado['id_grupo'][-8:]}{EXTENSAO}")
             
             if st.button("🗑️ Remover Grupo de Apostas"):
                 remover_grupo_apostas(grupo_selecionado["id_grupo"])
                 st.success(f"❌ Grupo `{grupo_selecionado['id_grupo'][-8:]}` removido do banco!")
                 st.rerun()
     else:
-        st.write("⚠️ Nenhum sorteio com apostas registradas ainda.")
\ No newline at end of file
+        st.write("⚠️ Nenhum sorteio com apostas registradas ainda.")
+
+### **4️⃣ Backtest com resultados em tempo real**
+elif menu_opcao == "Backtest":
+    st.header("📈 Backtest dos Modelos")
+    
+    modelo_backtest = st.selectbox("Modelo:", list(MODELOS))
+    num_sorteios_backtest = st.slider("Concursos avaliados:", min_value=10, max_value=500, step=10, value=50)
+    meta_backtest = st.slider("Meta de acertos:", min_value=11, max_value=15, value=11)
+    
+    col_executar, col_parar = st.columns(2)
+    executar = col_executar.button("▶️ Executar backtest")
+    # Clicar em "Parar" marca a parada na sessão: nenhum passo novo é iniciado, os passos na fila são
+    # cancelados e os resultados parciais ficam na sessão
+    col_parar.button("⏹️ Parar", on_click=lambda: st.session_state.update(parar_backtest=True))
+    
+    progresso = st.empty()
+    metricas = st.empty()
+    grafico = st.empty()
+    
+    if executar:
+        st.session_state["backtest"] = {"modelo": modelo_backtest, "meta": meta_backtest, "resultados": [], "concluido": False}
+        st.session_state["parar_backtest"] = False
+        estado = st.session_state["backtest"]
+        progresso.info(f"⏳ Iniciando backtest de {modelo_backtest}...")
+        # closing garante que o pool de processos seja encerrado (e a fila cancelada) assim que o laço termina
+        passos = iterar_backtest(df, MODELOS[modelo_backtest], num_sorteios_backtest, max_workers=None,
+                                 parar=lambda: st.session_state.get("parar_backtest", False))
+        with closing(passos):
+            for resultado in passos:
+                estado["resultados"].append(resultado)
+                progresso.progress(len(estado["resultados"]) / num_sorteios_backtest,
+                                   text=f"Concurso {resultado['concurso']}: {resultado['acertos']} acertos "
+                                        f"({len(estado['resultados'])}/{num_sorteios_backtest})")
+                exibir_backtest(estado["resultados"], meta_backtest, grafico, metricas)
+        estado["concluido"] = not st.session_state["parar_backtest"]
+        if estado["concluido"]:
+            progresso.success(f"✅ Backtest de {modelo_backtest} concluído ({len(estado['resultados'])} concursos).")
+        else:
+            progresso.warning(f"⏹️ Backtest de {modelo_backtest} interrompido: exibindo {len(estado['resultados'])} resultado(s) parcial(is).")
+    elif "backtest" in st.session_state:
+        estado = st.session_state["backtest"]
+        if estado["concluido"]:
+            progresso.success(f"✅ Backtest de {estado['modelo']} concluído ({len(estado['resultados'])} concursos).")
+        else:
+            progresso.warning(f"⏹️ Backtest de {estado['modelo']} interrompido: exibindo {len(estado['resultados'])} resultado(s) parcial(is).")
+        exibir_backtest(estado["resultados"], estado["meta"], grafico, metricas)
@@ -4,30 +4,60 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neural_network import MLPClassifier
 from sklearn.preprocessing import MultiLabelBinarizer
+from binario import matriz_bolas, matriz_binaria, mascaras_de_binario
+from clustering import clusterizar_matriz, distancias_mascaras
+from frequencia import frequencia_condicional_de_matriz
+from markov import pontuacao_transicao
+from otimizacao import matriz_pares, otimizar_combinacoes
+from recursos import n_jobs
+
+# --------------------------------------------------
+# INTERFACE COMUM: VETOR DE 25 PONTUAÇÕES
+# --------------------------------------------------
+# Cada método expõe uma função pontuacao_<metodo>(df, ..., intermediarios=None) que retorna um array
+# de 25 posições, onde a posição k é a pontuação do número k + 1. A predição de 15 números é sempre
+# a seleção dos maiores valores desse vetor (selecionar_numeros), exceto na otimização de combinações,
+# que usa o vetor como termo por número e acrescenta termos por par (ver otimizacao.py).
+
+def preparar_intermediarios(df):
+    """
+    Monta, uma única vez, as estruturas compartilhadas pelos métodos de predição:
+      - "bolas"  : matriz (n_sorteios x 15) com os números sorteados.
+      - "binario": matriz binária (n_sorteios x 25) dos sorteios.
+    As demais estruturas (matriz condicional, clusters, modelos ajustados) são derivadas sob demanda e guardadas
+    no mesmo dicionário.
+    """
+    bolas = matriz_bolas(df)
+    return {"bolas": bolas, "binario": matriz_binaria(bolas)}
+
+def selecionar_numeros(pontuacao, n_numeros=15):
+    """Retorna, em ordem crescente, os n_numeros números com maior pontuação (empates favorecem o menor número)."""
+    ordem = np.argsort(-np.asarray(pontuacao, dtype=float), kind="stable")
+    return sorted(int(k) + 1 for k in ordem[:n_numeros])
 
 # --------------------------------------------------
 # MÉTODO SUPERVISIONADO
 # --------------------------------------------------
-def treinar_modelo(df, modelo_escolhido="RandomForest"):
+def treinar_modelo(df, modelo_escolhido="RandomForest", intermediarios=None):
     """
     Treina um modelo supervisionado utilizando os dados de sorteios.
     Usa como features os sorteios deslocados (shift de 1) e como alvo o sorteio corrente.
     """
-    # Seleciona somente as colunas dos números sorteados
-    colunas = [f"Bola{i}" for i in range(1, 16)]
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
     
     # Define X como o sorteio anterior e y como o sorteio corrente
-    X = df[colunas].shift(1).dropna()
-    y = df.loc[X.index, colunas]
+    X = intermediarios["bolas"][:-1]
     
-    # Binariza a saída — cada sorteio é representado como uma lista de 15 números
-    mlb = MultiLabelBinarizer()
-    y_bin = mlb.fit_transform(y.values.tolist())
+    # Saída binarizada — cada sorteio é representado pelos seus 15 números entre 1 e 25
+    mlb = MultiLabelBinarizer(classes=list(range(1, 26)))
+    mlb.fit([])
+    y_bin = intermediarios["binario"][1:]
     
     X_train, X_test, y_train, y_test = train_test_split(X, y_bin, test_size=0.2, random_state=42)
 
     if modelo_escolhido == "RandomForest":
-        modelo = RandomForestClassifier()
+        modelo = RandomForestClassifier(n_jobs=n_jobs())
     elif modelo_escolhido == "MLP":
         modelo = MLPClassifier(hidden_layer_sizes=(50, 50), max_iter=500)
     else:
@@ -36,6 +66,36 @@ def treinar_modelo(df, modelo_escolhido="RandomForest"):
     modelo.fit(X_train, y_train)
     return modelo, mlb
 
+def pontuacao_supervisionada(df, modelo_escolhido="RandomForest", intermediarios=None):
+    """
+    Treina o modelo supervisionado e retorna a probabilidade prevista de cada número (1 a 25)
+    sair no próximo sorteio, dado o último sorteio.
+    """
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
+    # O modelo ajustado fica nos intermediários: o ensemble e o servidor de predição reaproveitam o mesmo ajuste
+    chave = ("modelo", modelo_escolhido)
+    if chave not in intermediarios:
+        intermediarios[chave] = treinar_modelo(df, modelo_escolhido, intermediarios)
+    modelo, mlb = intermediarios[chave]
+    last_sample = intermediarios["bolas"][-1:]
+    
+    # Verifica se o modelo possui o método 'predict_proba'
+    if not hasattr(modelo, "predict_proba"):
+        # Fallback: usa a predição binária como pontuação
+        return np.asarray(modelo.predict(last_sample)[0], dtype=float)
+    
+    probas = modelo.predict_proba(last_sample)
+    
+    # Se o retorno for uma lista (como acontece com RandomForest), há um array [prob(0), prob(1)] por número
+    if isinstance(probas, list):
+        return np.array([
+            p[0][list(classes).index(1)] if 1 in classes else 0.0
+            for p, classes in zip(probas, modelo.classes_)
+        ])
+    # Se o retorno for um ndarray (como ocorre para MLP), ele terá shape (n_samples, n_labels)
+    return np.asarray(probas[0], dtype=float)
+
 def predicao_supervisionada(df, modelo_escolhido="RandomForest"):
     """
     Utiliza o modelo supervisionado para gerar uma predição baseada no último sorteio,
@@ -47,48 +107,26 @@ def predicao_supervisionada(df, modelo_escolhido="RandomForest"):
       3. Ordena as classes (números) pela probabilidade da classe 1.
       4. Seleciona os 15 números com maiores probabilidades e retorna a combinação ordenada.
     """
-    modelo, mlb = treinar_modelo(df, modelo_escolhido)
-    colunas = [f"Bola{i}" for i in range(1, 16)]
-    X = df[colunas].shift(1).dropna()
-    last_sample = X.iloc[-1:]
-    
-    # Verifica se o modelo possui o método 'predict_proba'
-    if hasattr(modelo, "predict_proba"):
-        probas = modelo.predict_proba(last_sample)
-        
-        # Se o retorno for uma lista (como acontece com RandomForest):
-        if isinstance(probas, list):
-            probs = []
-            for p in probas:
-                # p deve ter o shape (1,2): [prob(0), prob(1)]
-                probs.append(p[0][1])
-        # Se o retorno for um ndarray (como ocorre para MLP), ele terá shape (n_samples, n_labels)
-        elif isinstance(probas, np.ndarray):
-            probs = list(probas[0])
-        else:
-            probs = []
-        
-        # mlb.classes_ contém os números (por exemplo, array([1, 2, 3, …, 25]))
-        classes = mlb.classes_
-        prob_dict = dict(zip(classes, probs))
-        
-        # Seleciona os 15 números com maior probabilidade e monta a predição
-        top15 = sorted(prob_dict, key=prob_dict.get, reverse=True)[:15]
-        prediction = sorted(top15)
-        print("Predição Supervisionada:", prediction)
-        return prediction
-    else:
-        # Fallback: usa o método predict se predict_proba não estiver disponível
-        pred_bin = modelo.predict(last_sample)
-        prediction = mlb.inverse_transform(pred_bin)[0]
-        if len(prediction) != 15:
-            prediction = sorted([int(n) for n in prediction])[:15]
-        print("Predição Supervisionada:", prediction)
-        return prediction
+    prediction = selecionar_numeros(pontuacao_supervisionada(df, modelo_escolhido))
+    print("Predição Supervisionada:", prediction)
+    return prediction
 
 # --------------------------------------------------
 # MÉTODO POR FREQUÊNCIA CONDICIONAL
 # --------------------------------------------------
+def pontuacao_frequencia(df, intermediarios=None):
+    """
+    Para cada número de 1 a 25, retorna a média das probabilidades condicionais de co-ocorrência
+    com os números do último sorteio.
+    """
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
+    if "frequencia_condicional" not in intermediarios:
+        intermediarios["frequencia_condicional"] = frequencia_condicional_de_matriz(intermediarios["binario"])
+    freq_matrix = intermediarios["frequencia_condicional"]
+    last_draw = intermediarios["bolas"][-1]
+    return freq_matrix[last_draw - 1].mean(axis=0)
+
 def predicao_frequencia(df, n_numeros=15):
     """
     Utiliza a matriz de frequência condicional para sugerir uma combinação baseada no último sorteio.
@@ -98,45 +136,375 @@ def predicao_frequencia(df, n_numeros=15):
       - Para cada número de 1 a 25, calcula a média das probabilidades condicionais com base no último sorteio.
       - Seleciona os n_numeros com maiores pontuações.
     """
-    from frequencia import calcular_frequencia_condicional
-    freq_matrix = calcular_frequencia_condicional(df)
-    colunas = [f"Bola{i}" for i in range(1, 16)]
-    last_draw = df[colunas].iloc[-1].tolist()
-    scores = {}
-    for j in range(1, 26):
-        score = np.mean([freq_matrix.loc[i, j] for i in last_draw])
-        scores[j] = score
-    sorted_nums = sorted(scores, key=scores.get, reverse=True)
-    prediction = sorted(sorted_nums[:n_numeros])
+    prediction = selecionar_numeros(pontuacao_frequencia(df), n_numeros)
     print("Predição por Frequência Condicional:", prediction)
     return prediction
 
 # --------------------------------------------------
 # MÉTODO POR CLUSTERING
 # --------------------------------------------------
-def predicao_clustering(df, n_numeros=15, num_clusters=5):
+def pontuacao_clustering(df, num_clusters=5, intermediarios=None, algoritmo="kmeans", metrica="jaccard"):
+    """
+    Retorna o centro do cluster mais próximo do último sorteio: a fração de sorteios do cluster
+    em que cada número saiu.
+    
+    Com algoritmo "kmodes" ou "kmedoids" (ver clustering.clusterizar_mascaras), o centro é uma
+    combinação real: seus números recebem 1 mais metade da fração de sorteios do cluster em que saíram,
+    e os demais apenas essa metade, de modo que os 15 primeiros são exatamente os números do centro.
     """
-    Converte os sorteios em vetores binários e aplica K-Means para identificar clusters.
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
+    chave = ("clusters", num_clusters, algoritmo, metrica)
+    if chave not in intermediarios:
+        intermediarios[chave] = clusterizar_matriz(intermediarios["binario"], num_clusters=num_clusters, algoritmo=algoritmo, metrica=metrica)
+    labels, centers = intermediarios[chave]
+    last_vector = intermediarios["binario"][-1]
+    if algoritmo == "kmeans":
+        distances = np.linalg.norm(centers - last_vector, axis=1)
+        return centers[np.argmin(distances)]
+    
+    centros_mascaras = mascaras_de_binario(centers)
+    ultima_mascara = mascaras_de_binario(last_vector[None, :])
+    mais_proximo = np.argmin(distancias_mascaras(ultima_mascara, centros_mascaras, metrica)[0])
+    frequencias = intermediarios["binario"][labels == mais_proximo].mean(axis=0)
+    return centers[mais_proximo] + frequencias / 2
+
+def predicao_clustering(df, n_numeros=15, num_clusters=5, algoritmo="kmeans", metrica="jaccard"):
+    """
+    Converte os sorteios em vetores binários e aplica o clustering escolhido para identificar clusters.
     Em seguida, usa o centro do cluster mais próximo do último sorteio para sugerir uma combinação.
     
     Estratégia:
       - Converte o último sorteio em vetor binário.
-      - Calcula a distância Euclidiana entre esse vetor e cada centro.
+      - Calcula a distância (Euclidiana no K-Means; Jaccard/Hamming por popcount no k-modes/k-medoids)
+        entre esse vetor e cada centro.
       - Seleciona os índices com maiores valores no centro do cluster mais próximo.
     """
-    from clustering import clusterizar_sorteios, vetorizar_sorteio
-    labels, centers = clusterizar_sorteios(df, num_clusters=num_clusters)
-    colunas = [f"Bola{i}" for i in range(1, 16)]
-    last_draw = df[colunas].iloc[-1].tolist()
-    last_vector = vetorizar_sorteio(last_draw)
-    distances = [np.linalg.norm(last_vector - center) for center in centers]
-    best_cluster = np.argmin(distances)
-    center = centers[best_cluster]
-    candidate_order = np.argsort(-center)
-    prediction = sorted([int(n + 1) for n in candidate_order[:n_numeros]])
+    prediction = selecionar_numeros(pontuacao_clustering(df, num_clusters=num_clusters, algoritmo=algoritmo, metrica=metrica), n_numeros)
     print("Predição por Clustering:", prediction)
     return prediction
 
+# --------------------------------------------------
+# MÉTODO POR FREQUÊNCIA COM DECAIMENTO EXPONENCIAL
+# --------------------------------------------------
+class FrequenciaDecaimento:
+    """
+    Mantém pesos por número e de co-ocorrência com decaimento exponencial: um sorteio de
+    `meia_vida` concursos atrás vale metade de um sorteio recente.
+
+    A atualização por sorteio é O(1): em vez de multiplicar todos os pesos pelo fator de decaimento,
+    acumula-se uma escala global e somam-se 1/escala apenas aos 15 números (e 225 pares) do sorteio.
+    """
+
+    def __init__(self, meia_vida=50):
+        self.meia_vida = meia_vida
+        self.fator = 0.5 ** (1 / meia_vida)
+        self.escala = 1.0
+        self._pesos = np.zeros(25)
+        self._coocorrencias = np.zeros((25, 25))
+        self._total = 0.0
+
+    @classmethod
+    def de_historico(cls, df, meia_vida=50, intermediarios=None):
+        """Constrói os pesos a partir do histórico completo com produtos matriciais ponderados."""
+        if intermediarios is None:
+            intermediarios = preparar_intermediarios(df)
+        binario = intermediarios["binario"].astype(float)
+        modelo = cls(meia_vida)
+        idades = np.arange(len(binario) - 1, -1, -1)
+        pesos_sorteio = modelo.fator ** idades
+        modelo._pesos = pesos_sorteio @ binario
+        modelo._coocorrencias = binario.T @ (pesos_sorteio[:, None] * binario)
+        modelo._total = pesos_sorteio.sum()
+        return modelo
+
+    def atualizar(self, sorteio):
+        """Incorpora um novo sorteio (lista com os 15 números) em tempo constante."""
+        self.escala *= self.fator
+        if self.escala < 1e-150:
+            # Renormaliza para evitar estouro numérico em históricos muito longos
+            self._pesos *= self.escala
+            self._coocorrencias *= self.escala
+            self._total *= self.escala
+            self.escala = 1.0
+        indices = np.asarray(sorteio, dtype=int) - 1
+        incremento = 1 / self.escala
+        self._pesos[indices] += incremento
+        self._coocorrencias[np.ix_(indices, indices)] += incremento
+        self._total += incremento
+
+    @property
+    def pesos(self):
+        """Peso decaído de cada número (1 a 25), normalizado pela soma dos pesos dos sorteios."""
+        return self._pesos / self._total if self._total > 0 else np.zeros(25)
+
+    def probabilidade_condicional(self):
+        """Matriz 25 x 25 de probabilidade condicional decaída (mesma normalização de frequencia.py)."""
+        frequencias = self._coocorrencias.copy()
+        np.fill_diagonal(frequencias, 0)
+        soma_por_numero = frequencias.sum(axis=1)
+        soma_por_numero[soma_por_numero == 0] = 1
+        return frequencias / soma_por_numero[:, None]
+
+    def pontuacao(self, ultimo_sorteio=None):
+        """
+        Sem ultimo_sorteio, retorna o peso decaído de cada número. Com ultimo_sorteio, retorna a média
+        das probabilidades condicionais decaídas em relação aos números desse sorteio.
+        """
+        if ultimo_sorteio is None:
+            return self.pesos
+        return self.probabilidade_condicional()[np.asarray(ultimo_sorteio, dtype=int) - 1].mean(axis=0)
+
+def pontuacao_decaimento(df, meia_vida=50, condicional=False, intermediarios=None):
+    """Pontuação dos 25 números pela frequência com decaimento exponencial (opcionalmente condicional ao último sorteio)."""
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
+    modelo = FrequenciaDecaimento.de_historico(df, meia_vida, intermediarios)
+    return modelo.pontuacao(intermediarios["bolas"][-1] if condicional else None)
+
+def predicao_decaimento(df, n_numeros=15, meia_vida=50, condicional=False):
+    """
+    Sugere uma combinação pelos números de maior frequência recente, com sorteios antigos pesando
+    menos (meia-vida em quantidade de concursos).
+    """
+    prediction = selecionar_numeros(pontuacao_decaimento(df, meia_vida, condicional), n_numeros)
+    print("Predição por Frequência com Decaimento:", prediction)
+    return prediction
+
+def avaliar_meias_vidas(df, meias_vidas=(5, 10, 20, 50, 100, 200, 500, 1000), num_sorteios=None, meta_acertos=11):
+    """
+    Backtest walk-forward de várias meias-vidas em uma única passada pelo histórico.
+
+    Os pesos de todas as meias-vidas ficam em uma matriz (n_meias_vidas x 25). A cada sorteio,
+    prevê-se os 15 maiores pesos de cada linha, contam-se os acertos e atualiza-se a matriz inteira
+    com uma operação vetorizada.
+
+    Parâmetros:
+      meias_vidas  : Meias-vidas (em concursos) a comparar.
+      num_sorteios : Quantidade de concursos finais avaliados (None para todos, a partir do segundo).
+      meta_acertos : Limiar de acertos considerado na taxa de sucesso.
+
+    Retorna:
+      DataFrame com meia_vida, sorteios, média de acertos, taxa >= meta_acertos e valor-p exato da média,
+      ordenado pela média de acertos.
+    """
+    from significancia import valor_p_soma
+
+    binario = matriz_binaria(df.sort_values(by="Concurso", ascending=True)).astype(float)
+    n = len(binario)
+    inicio = 1 if num_sorteios is None else max(n - num_sorteios, 1)
+
+    fatores = 0.5 ** (1 / np.asarray(meias_vidas, dtype=float))
+    pesos = np.zeros((len(fatores), 25))
+    acertos = np.zeros((len(fatores), n - inicio), dtype=int)
+
+    for t in range(n):
+        if t >= inicio:
+            preditos = np.argsort(-pesos, axis=1, kind="stable")[:, :15]
+            acertos[:, t - inicio] = binario[t][preditos].sum(axis=1)
+        pesos = pesos * fatores[:, None] + binario[t]
+
+    return pd.DataFrame({
+        "meia_vida": list(meias_vidas),
+        "sorteios": n - inicio,
+        "media_acertos": acertos.mean(axis=1),
+        "taxa_meta": (acertos >= meta_acertos).mean(axis=1),
+        "p_valor_media": valor_p_soma(acertos.sum(axis=1), n - inicio),
+    }).sort_values("media_acertos", ascending=False).reset_index(drop=True)
+
+# --------------------------------------------------
+# MÉTODO POR TRANSIÇÃO (MARKOV)
+# --------------------------------------------------
+def pontuacao_markov(df, k=1, janela=None, intermediarios=None):
+    """
+    Probabilidade média de cada número sair no próximo sorteio dado cada número dos últimos k
+    sorteios, estimada pela matriz de transição t -> t+1 (ver markov.py).
+    """
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
+    return pontuacao_transicao(intermediarios["binario"], k=k, janela=janela)
+
+def predicao_markov(df, n_numeros=15, k=1, janela=None):
+    """
+    Sugere uma combinação pelo que costuma suceder os últimos sorteios, segundo a matriz de transição
+    P(número j no sorteio t+1 | número i no sorteio t).
+    """
+    prediction = selecionar_numeros(pontuacao_markov(df, k, janela), n_numeros)
+    print("Predição por Transição (Markov):", prediction)
+    return prediction
+
+# --------------------------------------------------
+# ENSEMBLE DE PONTUAÇÕES
+# --------------------------------------------------
+# Os pesos do ensemble vêm de backtests walk-forward das próprias funções de pontuação combinadas, com os
+# mesmos parâmetros usados no ensemble (modelo "Pontuacao" da varredura, ver backtest_pontuacao.py), todos
+# avaliados na mesma janela de JANELA_ENSEMBLE concursos.
+COMPONENTES_ENSEMBLE = ["supervisionada", "frequencia", "clustering", "decaimento", "markov"]
+JANELA_ENSEMBLE = 100
+
+def parametros_componentes(modelo_escolhido="RandomForest", num_clusters=5, meia_vida=50, k=1):
+    """Parâmetros da varredura ("Pontuacao") de cada componente, iguais aos usados em calcular_pontuacoes."""
+    return {
+        "supervisionada": {"metodo": "supervisionada", "modelo_escolhido": modelo_escolhido},
+        "frequencia": {"metodo": "frequencia"},
+        "clustering": {"metodo": "clustering", "num_clusters": num_clusters},
+        "decaimento": {"metodo": "decaimento", "meia_vida": meia_vida},
+        "markov": {"metodo": "markov", "k": k},
+    }
+
+def ajustar_pesos_ensemble(df, num_sorteios=JANELA_ENSEMBLE, modelo_escolhido="RandomForest", num_clusters=5, meia_vida=50, k=1,
+                           max_workers=None):
+    """
+    Executa (ou completa) na varredura os backtests de cada componente do ensemble nos últimos
+    num_sorteios concursos de df, para que pesos_ensemble tenha os resultados de que precisa.
+    """
+    from varredura import executar_varredura
+
+    for parametros in parametros_componentes(modelo_escolhido, num_clusters, meia_vida, k).values():
+        executar_varredura(df, "Pontuacao", {nome: [valor] for nome, valor in parametros.items()}, num_sorteios, max_workers)
+
+def pesos_ensemble(num_sorteios=JANELA_ENSEMBLE, modelo_escolhido="RandomForest", num_clusters=5, meia_vida=50, k=1, ate_concurso=None):
+    """
+    Ajusta os pesos do ensemble a partir dos backtests salvos pela varredura (ver ajustar_pesos_ensemble).
+
+    A janela são os últimos num_sorteios concursos calculados para todos os componentes, de modo que todos
+    são comparados nos mesmos sorteios, cada um com os parâmetros configurados (sem escolher a melhor
+    célula da grade). O peso de cada componente é o ganho da sua média de acertos sobre a média ao acaso;
+    sem resultados completos na janela (ou sem ganho algum), os componentes recebem pesos iguais.
+
+    ate_concurso é o último concurso do histórico de treino: só entram na janela os concursos até ele,
+    cujos resultados já eram conhecidos. Em um backtest walk-forward do ensemble isso impede que os pesos
+    usem acertos de sorteios posteriores ao treino. None usa todos os resultados salvos.
+    """
+    from significancia import media_acaso
+    from varredura import resultados_varredura
+
+    iguais = {componente: 1 / len(COMPONENTES_ENSEMBLE) for componente in COMPONENTES_ENSEMBLE}
+    resultados = {
+        componente: resultados_varredura("Pontuacao", parametros)
+        for componente, parametros in parametros_componentes(modelo_escolhido, num_clusters, meia_vida, k).items()
+    }
+    comuns = None
+    for acertos in resultados.values():
+        comuns = acertos.index if comuns is None else comuns.intersection(acertos.index)
+    if ate_concurso is not None:
+        comuns = comuns[comuns <= ate_concurso]
+    if len(comuns) < num_sorteios:
+        print(f"⚠️ Backtests do ensemble incompletos ({len(comuns)}/{num_sorteios} concursos em comum): usando pesos iguais.")
+        return iguais
+
+    janela = comuns.sort_values()[-num_sorteios:]
+    pesos = {componente: max(float(acertos.loc[janela].mean()) - media_acaso(), 0.0) for componente, acertos in resultados.items()}
+    total = sum(pesos.values())
+    if total == 0:
+        return iguais
+    return {componente: peso / total for componente, peso in pesos.items()}
+
+def calcular_pontuacoes(df, modelo_escolhido="RandomForest", num_clusters=5, meia_vida=50, k=1, intermediarios=None):
+    """
+    Calcula os vetores de pontuação de todos os métodos em uma única passada, a partir de uma
+    única leitura dos dados e de uma única construção das matrizes compartilhadas.
+
+    Retorna:
+      Dicionário {componente: array(25)} com os componentes de COMPONENTES_ENSEMBLE.
+    """
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
+    return {
+        "supervisionada": pontuacao_supervisionada(df, modelo_escolhido, intermediarios=intermediarios),
+        "frequencia": pontuacao_frequencia(df, intermediarios=intermediarios),
+        "clustering": pontuacao_clustering(df, num_clusters, intermediarios=intermediarios),
+        "decaimento": pontuacao_decaimento(df, meia_vida, intermediarios=intermediarios),
+        "markov": pontuacao_markov(df, k, intermediarios=intermediarios),
+    }
+
+def pontuacao_ensemble(df, pesos=None, modelo_escolhido="RandomForest", num_clusters=5, meia_vida=50, k=1, intermediarios=None):
+    """
+    Combina os vetores de pontuação de todos os métodos. Como cada método tem sua própria escala,
+    cada vetor é padronizado (média 0, desvio 1) antes da soma ponderada.
+
+    Parâmetros:
+      pesos : Dicionário {componente: peso}. Se None, usa pesos_ensemble() com os resultados de backtest
+              salvos até o último concurso de df.
+    """
+    if pesos is None:
+        # Apenas backtests de concursos já presentes em df (sem vazamento em backtests walk-forward)
+        pesos = pesos_ensemble(modelo_escolhido=modelo_escolhido, num_clusters=num_clusters, meia_vida=meia_vida, k=k,
+                               ate_concurso=int(df["Concurso"].max()))
+    pontuacoes = calcular_pontuacoes(df, modelo_escolhido, num_clusters, meia_vida, k, intermediarios)
+    combinada = np.zeros(25)
+    for componente, pontuacao in pontuacoes.items():
+        desvio = pontuacao.std()
+        padronizada = (pontuacao - pontuacao.mean()) / desvio if desvio > 0 else np.zeros(25)
+        combinada += pesos.get(componente, 0.0) * padronizada
+    return combinada
+
+def predicao_ensemble(df, n_numeros=15, pesos=None, modelo_escolhido="RandomForest", num_clusters=5, meia_vida=50, k=1):
+    """
+    Gera uma predição combinando, com pesos ajustados pelos backtests, as pontuações dos métodos
+    supervisionado, de frequência condicional, de clustering, de decaimento e de transição (Markov).
+    """
+    prediction = selecionar_numeros(pontuacao_ensemble(df, pesos, modelo_escolhido, num_clusters, meia_vida, k), n_numeros)
+    print("Predição por Ensemble:", prediction)
+    return prediction
+
+# --------------------------------------------------
+# OTIMIZAÇÃO DE COMBINAÇÕES (TERMOS POR NÚMERO E POR PAR)
+# --------------------------------------------------
+# Vetores de pontuação usados como termo por número na otimização
+PONTUACOES = {
+    "supervisionada": pontuacao_supervisionada,
+    "frequencia": pontuacao_frequencia,
+    "clustering": pontuacao_clustering,
+    "decaimento": pontuacao_decaimento,
+    "markov": pontuacao_markov,
+    "ensemble": pontuacao_ensemble,
+}
+
+def _padronizar(valores):
+    desvio = valores.std()
+    return (valores - valores.mean()) / desvio if desvio > 0 else np.zeros_like(valores)
+
+def combinacoes_otimizadas(df, metodo_pontuacao="frequencia", peso_pares=1.0, n_combinacoes=5, n_numeros=15,
+                           busca="feixe", intermediarios=None, **params_pontuacao):
+    """
+    Escolhe as combinações que maximizam a pontuação do método escolhido somada aos termos de par
+    (lift de co-ocorrência do histórico), em vez de apenas os n_numeros maiores valores isolados.
+
+    Os dois termos são padronizados (média 0, desvio 1) e os termos de par são divididos por
+    n_numeros - 1, de modo que, com peso_pares=1, cada número contribui em escala parecida com sua
+    pontuação individual e com o conjunto de seus pares.
+
+    Parâmetros:
+      metodo_pontuacao : Chave de PONTUACOES usada como termo por número.
+      peso_pares       : Peso dos termos de par (0 reproduz a seleção dos maiores valores).
+      n_combinacoes    : Quantidade de combinações distintas retornadas.
+      busca            : "feixe" (rápida) ou "exato" (branch-and-bound), ver otimizacao.otimizar_combinacoes.
+      params_pontuacao : Parâmetros repassados à função de pontuação (por exemplo, meia_vida).
+
+    Retorna:
+      Lista de tuplas (números, valor), em ordem decrescente de valor.
+    """
+    if metodo_pontuacao not in PONTUACOES:
+        raise ValueError(f"Método inválido! Escolha entre: {', '.join(PONTUACOES)}.")
+    if intermediarios is None:
+        intermediarios = preparar_intermediarios(df)
+    if "pares" not in intermediarios:
+        pares = matriz_pares(intermediarios["binario"])
+        fora_diagonal = ~np.eye(25, dtype=bool)
+        pares = (pares - pares[fora_diagonal].mean()) / max(pares[fora_diagonal].std(), 1e-12)
+        np.fill_diagonal(pares, 0)
+        intermediarios["pares"] = pares
+    pontuacao = PONTUACOES[metodo_pontuacao](df, intermediarios=intermediarios, **params_pontuacao)
+    return otimizar_combinacoes(_padronizar(np.asarray(pontuacao, dtype=float)), intermediarios["pares"] / (n_numeros - 1),
+                                peso_pares=peso_pares, tamanho=n_numeros, n_combinacoes=n_combinacoes, metodo=busca)
+
+def predicao_otimizada(df, n_numeros=15, metodo_pontuacao="frequencia", peso_pares=1.0, busca="feixe"):
+    """Sugere a combinação de maior valor conjunto (termos por número e por par), ver combinacoes_otimizadas."""
+    prediction = combinacoes_otimizadas(df, metodo_pontuacao, peso_pares, n_combinacoes=1, n_numeros=n_numeros, busca=busca)[0][0]
+    print("Predição por Otimização de Combinações:", prediction)
+    return prediction
+
 # --------------------------------------------------
 # BLOCO DE TESTE INTERATIVO
 # --------------------------------------------------
@@ -144,13 +512,22 @@ if __name__ == "__main__":
     from dados import carregar_dados
     df = carregar_dados("data/Lotofacil.xlsx")
     if df is not None:
-        metodo = input("Escolha o método de predição (supervisionada / frequencia / clustering): ").strip().lower()
+        metodo = input("Escolha o método de predição (supervisionada / frequencia / clustering / decaimento / markov / ensemble / otimizacao): ").strip().lower()
         if metodo == "supervisionada":
             predicao_supervisionada(df)
         elif metodo == "frequencia":
             predicao_frequencia(df)
         elif metodo == "clustering":
             predicao_clustering(df)
+        elif metodo == "decaimento":
+            predicao_decaimento(df)
+            print(avaliar_meias_vidas(df))
+        elif metodo == "markov":
+            predicao_markov(df)
+        elif metodo == "ensemble":
+            predicao_ensemble(df)
+        elif metodo == "otimizacao":
+            predicao_otimizada(df)
         else:
             print("Método Inválido!")
     else:
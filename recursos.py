@@ -0,0 +1,212 @@
+import json
+import os
+
+try:
+    import resource
+except ImportError:  # Windows: limite de memória por processo indisponível
+    resource = None
+
+try:
+    from threadpoolctl import threadpool_info, threadpool_limits
+except ImportError:  # threadpoolctl acompanha o scikit-learn, mas é opcional aqui
+    threadpool_info = threadpool_limits = None
+
+# --------------------------------------------------
+# CONFIGURAÇÃO DE RECURSOS DE CÁLCULO
+# --------------------------------------------------
+# Um único ponto decide quantos processos cada pool usa, quantas threads (n_jobs, BLAS/OpenMP) cada
+# processo pode abrir e quanta memória cada processo pode alocar, evitando a sobreinscrição
+# (N processos x M threads muito acima do número de CPUs).
+#
+# Ordem de precedência: variáveis de ambiente > arquivo recursos.json > padrões.
+#   LOTOFACIL_WORKERS            : processos por pool (padrão: número de CPUs disponíveis)
+#   LOTOFACIL_THREADS            : threads por processo dentro de um pool (padrão: CPUs / processos do pool
+#                                  efetivamente aberto, que pode ser menor que workers quando há menos tarefas)
+#   LOTOFACIL_MEMORIA_WORKER_MB  : limite de memória de cada processo do pool (padrão: sem limite)
+#
+# O limite de memória é aplicado com RLIMIT_AS, que limita o espaço de endereçamento virtual e não a
+# memória residente (RSS): bibliotecas de BLAS/OpenMP e pilhas de threads reservam endereços que nunca
+# chegam a ocupar RAM, então o valor deve ter folga sobre o uso real esperado (algumas centenas de MB por
+# processo). O kernel não oferece limite de RSS por processo via setrlimit; o número de processos é que é
+# reduzido para caber na memória física disponível.
+#
+# Exemplo de recursos.json: {"workers": 4, "threads": 2, "memoria_worker_mb": 2048}
+
+ARQUIVO_CONFIGURACAO = "recursos.json"
+
+VARIAVEIS_AMBIENTE = {
+    "workers": "LOTOFACIL_WORKERS",
+    "threads": "LOTOFACIL_THREADS",
+    "memoria_worker_mb": "LOTOFACIL_MEMORIA_WORKER_MB",
+}
+
+# Variáveis lidas pelas bibliotecas de BLAS/OpenMP carregadas depois da inicialização do processo
+VARIAVEIS_THREADS = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "BLIS_NUM_THREADS"]
+
+_configuracao = None
+_em_worker = False
+_threads_worker = None
+
+def cpus_disponiveis():
+    """Número de CPUs que o processo pode usar (respeita a afinidade de CPU quando disponível)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def memoria_disponivel_mb():
+    """Memória física disponível em MB, ou None se não for possível consultar."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2**20
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def carregar_configuracao(arquivo=ARQUIVO_CONFIGURACAO):
+    """
+    Lê a configuração de recursos (arquivo JSON e variáveis de ambiente) e completa os padrões.
+
+    Retorna:
+      Dicionário com cpus, workers, threads (para um pool de workers processos), threads_configuradas
+      (valor explícito de threads, ou None) e memoria_worker_mb.
+    """
+    global _configuracao
+    valores = {}
+    if arquivo and os.path.exists(arquivo):
+        with open(arquivo, encoding="utf-8") as f:
+            valores.update({chave: valor for chave, valor in json.load(f).items() if chave in VARIAVEIS_AMBIENTE})
+    for chave, variavel in VARIAVEIS_AMBIENTE.items():
+        if os.environ.get(variavel):
+            valores[chave] = int(os.environ[variavel])
+
+    cpus = cpus_disponiveis()
+    workers = max(int(valores.get("workers") or cpus), 1)
+    memoria_worker_mb = valores.get("memoria_worker_mb")
+    if memoria_worker_mb:
+        # Não abre mais processos do que cabem na memória disponível
+        disponivel = memoria_disponivel_mb()
+        if disponivel is not None:
+            workers = max(min(workers, disponivel // int(memoria_worker_mb)), 1)
+    threads_configuradas = int(valores["threads"]) if valores.get("threads") else None
+    threads = threads_configuradas or max(cpus // workers, 1)
+
+    _configuracao = {
+        "cpus": cpus,
+        "workers": workers,
+        "threads": threads,
+        "threads_configuradas": threads_configuradas,
+        "memoria_worker_mb": int(memoria_worker_mb) if memoria_worker_mb else None,
+    }
+    return _configuracao
+
+def configuracao():
+    """Configuração vigente (carregada na primeira chamada)."""
+    return _configuracao or carregar_configuracao()
+
+def numero_workers(tarefas=None):
+    """Quantidade de processos para um pool, limitada ao número de tarefas quando informado."""
+    workers = configuracao()["workers"]
+    return max(min(workers, tarefas), 1) if tarefas else workers
+
+def threads_por_worker(workers):
+    """
+    Threads por processo em um pool com `workers` processos: o valor configurado, se houver; senão,
+    as CPUs divididas pelo tamanho real do pool (um pool reduzido por ter poucas tarefas usa mais threads).
+    """
+    config = configuracao()
+    return config["threads_configuradas"] or max(config["cpus"] // max(int(workers), 1), 1)
+
+def n_jobs():
+    """
+    Threads que um ajuste de modelo pode usar no processo atual (parâmetro n_jobs do scikit-learn):
+    dentro de um pool, o limite por processo; fora dele, todas as CPUs.
+    """
+    return _threads_worker if _em_worker else configuracao()["cpus"]
+
+def limitar_threads(threads):
+    """Limita as threads de BLAS/OpenMP do processo atual (bibliotecas já carregadas e futuras)."""
+    for variavel in VARIAVEIS_THREADS:
+        os.environ[variavel] = str(threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads)
+
+def limitar_memoria(memoria_mb):
+    """
+    Limita o espaço de endereçamento virtual do processo atual (RLIMIT_AS); excedê-lo gera MemoryError
+    em vez de swap. Não é um limite de memória residente (ver o comentário no início do módulo).
+    """
+    if resource is None or not memoria_mb:
+        return
+    limite = int(memoria_mb) * 2**20
+    _, maximo = resource.getrlimit(resource.RLIMIT_AS)
+    if maximo != resource.RLIM_INFINITY:
+        limite = min(limite, maximo)
+    resource.setrlimit(resource.RLIMIT_AS, (limite, maximo))
+
+def inicializar_worker(workers, inicializador=None, *argumentos):
+    """
+    Inicializador dos pools de processos: aplica os limites de threads (calculados para o tamanho real
+    do pool, ver threads_por_worker) e de memória do processo e, em seguida, chama o inicializador
+    específico do pool (se houver).
+
+    Uso: ProcessPoolExecutor(max_workers=max_workers, initializer=inicializar_worker,
+                             initargs=(max_workers, _inicializar_worker, df))
+    """
+    global _em_worker, _threads_worker
+    _em_worker = True
+    _threads_worker = threads_por_worker(workers)
+    limitar_threads(_threads_worker)
+    limitar_memoria(configuracao()["memoria_worker_mb"])
+    if inicializador is not None:
+        inicializador(*argumentos)
+
+# --------------------------------------------------
+# DIAGNÓSTICO
+# --------------------------------------------------
+def diagnostico():
+    """
+    Resume o paralelismo efetivo: processos x threads frente às CPUs disponíveis, memória por
+    processo e as bibliotecas de threads (BLAS/OpenMP) carregadas.
+
+    Retorna:
+      Dicionário com a configuração, o total de threads simultâneas, a ocupação (1.0 = todas as CPUs
+      em uso sem sobreinscrição) e a lista de bibliotecas de threads.
+    """
+    config = configuracao()
+    threads_totais = config["workers"] * config["threads"]
+    bibliotecas = []
+    if threadpool_info is not None:
+        bibliotecas = [
+            {"biblioteca": info.get("internal_api"), "threads": info.get("num_threads"), "arquivo": os.path.basename(info.get("filepath", ""))}
+            for info in threadpool_info()
+        ]
+    return {
+        **config,
+        "threads_totais": threads_totais,
+        "ocupacao": threads_totais / config["cpus"],
+        "memoria_disponivel_mb": memoria_disponivel_mb(),
+        "bibliotecas_threads": bibliotecas,
+    }
+
+def imprimir_diagnostico():
+    """Imprime o diagnóstico de recursos com avisos de sobreinscrição ou CPUs ociosas."""
+    info = diagnostico()
+    print("\n⚙️ **Recursos de Cálculo**")
+    print(f"- CPUs disponíveis: {info['cpus']}")
+    print(f"- Processos por pool: {info['workers']} | Threads por processo: {info['threads']}")
+    print(f"- Threads simultâneas: {info['threads_totais']} (ocupação {info['ocupacao']:.0%})")
+    memoria = f"{info['memoria_worker_mb']} MB" if info["memoria_worker_mb"] else "sem limite"
+    print(f"- Memória por processo: {memoria} | Memória disponível: {info['memoria_disponivel_mb']} MB")
+    for biblioteca in info["bibliotecas_threads"]:
+        print(f"- {biblioteca['biblioteca']} ({biblioteca['arquivo']}): {biblioteca['threads']} thread(s) neste processo")
+    if info["ocupacao"] > 1:
+        print("⚠️ Sobreinscrição: há mais threads simultâneas que CPUs; reduza workers ou threads.")
+    elif info["ocupacao"] < 1:
+        print("⚠️ CPUs ociosas: aumente workers ou threads para usar toda a máquina.")
+    else:
+        print("✅ Todas as CPUs em uso, sem sobreinscrição.")
+
+if __name__ == "__main__":
+    # Carrega as bibliotecas numéricas para que o diagnóstico mostre as threads de BLAS/OpenMP
+    import numpy  # noqa: F401
+    import sklearn.ensemble  # noqa: F401
+
+    imprimir_diagnostico()
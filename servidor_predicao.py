@@ -0,0 +1,390 @@
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from dados import carregar_dados
+from predicao import PONTUACOES, combinacoes_otimizadas, parametros_componentes, preparar_intermediarios, selecionar_numeros, predicao_supervisionada, predicao_frequencia, predicao_clustering, predicao_decaimento, predicao_markov, predicao_ensemble, predicao_otimizada
+from recursos import numero_workers
+
+# 📌 Endereço do serviço local de predição
+HOST = "127.0.0.1"
+PORTA = 8765
+ARQUIVO_DADOS = "data/Lotofacil.xlsx"
+
+# Janela de agrupamento das requisições concorrentes (micro-batching)
+JANELA_LOTE = 0.01
+TAMANHO_MAXIMO_LOTE = 64
+
+METODOS = {
+    "supervisionada": predicao_supervisionada,
+    "frequencia": predicao_frequencia,
+    "clustering": predicao_clustering,
+    "decaimento": predicao_decaimento,
+    "markov": predicao_markov,
+    "ensemble": predicao_ensemble,
+    "otimizacao": predicao_otimizada,
+}
+
+def executar_predicao(df, metodo, params=None):
+    """Executa um método de predição no próprio processo e retorna a lista de números."""
+    if metodo not in METODOS:
+        raise ValueError(f"Método inválido! Escolha entre: {', '.join(METODOS)}.")
+    return [int(n) for n in METODOS[metodo](df, **(params or {}))]
+
+def executar_pontuacao(df, metodo, params=None):
+    """Calcula no próprio processo o vetor de 25 pontuações de um método (ver predicao.PONTUACOES)."""
+    if metodo not in PONTUACOES:
+        raise ValueError(f"Método inválido! Escolha entre: {', '.join(PONTUACOES)}.")
+    return [float(v) for v in PONTUACOES[metodo](df, **(params or {}))]
+
+# --------------------------------------------------
+# ESTADO COMPARTILHADO (DADOS E MODELOS AQUECIDOS)
+# --------------------------------------------------
+class ModelosAjustados:
+    """
+    Uma versão do histórico com os intermediários (matrizes, clusters e modelos ajustados, ver
+    predicao.preparar_intermediarios) e os vetores de pontuação já calculados para cada (método, parâmetros).
+
+    Predições são derivadas das pontuações em cache (os 15 maiores valores, ou a otimização de combinações
+    sobre os mesmos intermediários), de modo que /prever e /pontuar compartilham um único ajuste por modelo.
+    Chaves diferentes são calculadas em paralelo; a mesma chave é calculada uma única vez.
+    """
+
+    def __init__(self, df, versao):
+        self.df = df
+        self.versao = versao
+        self.intermediarios = preparar_intermediarios(df)
+        self.pontuacoes = {}
+        self.combinacoes = {}
+        self.travas = {}
+        self.trava = threading.Lock()
+
+    def _trava(self, chave):
+        with self.trava:
+            return self.travas.setdefault(chave, threading.Lock())
+
+    def pontuacao(self, metodo, params=None):
+        """Vetor de 25 pontuações de predicao.PONTUACOES[metodo], calculado uma vez por versão dos dados."""
+        if metodo not in PONTUACOES:
+            raise ValueError(f"Método inválido! Escolha entre: {', '.join(PONTUACOES)}.")
+        params = params or {}
+        if metodo == "ensemble":
+            # Ajusta antes cada componente pela própria chave, para que o ensemble reaproveite esses ajustes
+            # em vez de repeti-los em paralelo com uma requisição do componente
+            componentes = parametros_componentes(params.get("modelo_escolhido", "RandomForest"), params.get("num_clusters", 5),
+                                                 params.get("meia_vida", 50), params.get("k", 1))
+            for parametros in componentes.values():
+                parametros = dict(parametros)
+                self.pontuacao(parametros.pop("metodo"), parametros)
+        chave = (metodo, json.dumps(params, sort_keys=True))
+        with self._trava(chave):
+            if chave not in self.pontuacoes:
+                valores = PONTUACOES[metodo](self.df, intermediarios=self.intermediarios, **params)
+                self.pontuacoes[chave] = np.asarray(valores, dtype=float)
+        return self.pontuacoes[chave]
+
+    def pontuar(self, metodo, params=None):
+        return [float(v) for v in self.pontuacao(metodo, params)]
+
+    def prever(self, metodo, params=None):
+        if metodo not in METODOS:
+            raise ValueError(f"Método inválido! Escolha entre: {', '.join(METODOS)}.")
+        params = dict(params or {})
+        n_numeros = params.pop("n_numeros", 15)
+        if metodo == "otimizacao":
+            # O termo por número vem da pontuação em cache; só a busca de combinações é própria desta chave
+            params_pontuacao = {k: v for k, v in params.items() if k not in ("metodo_pontuacao", "peso_pares", "busca")}
+            self.pontuacao(params.get("metodo_pontuacao", "frequencia"), params_pontuacao)
+            chave = ("otimizacao", n_numeros, json.dumps(params, sort_keys=True))
+            with self._trava(chave):
+                if chave not in self.combinacoes:
+                    self.combinacoes[chave] = combinacoes_otimizadas(self.df, n_combinacoes=1, n_numeros=n_numeros,
+                                                                     intermediarios=self.intermediarios, **params)[0][0]
+            return [int(n) for n in self.combinacoes[chave]]
+        return selecionar_numeros(self.pontuacao(metodo, params), n_numeros)
+
+class EstadoPredicao:
+    """
+    Mantém o histórico carregado e seus modelos ajustados (ver ModelosAjustados).
+    Cada versão dos dados ajusta cada modelo uma única vez; ao recarregar, uma nova versão substitui a
+    anterior, e as requisições já em andamento terminam sobre a versão com que começaram.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_DADOS):
+        self.arquivo = arquivo
+        self.versao = 0
+        self.atual = None
+        self.modificado_em = None
+        self.recarregar()
+
+    @property
+    def df(self):
+        return self.atual.df
+
+    def recarregar(self):
+        """Relê o arquivo de dados e começa uma nova versão, sem modelos em cache."""
+        df = carregar_dados(self.arquivo)
+        if df is None:
+            raise RuntimeError(f"Não foi possível carregar {self.arquivo}.")
+        self.modificado_em = os.path.getmtime(self.arquivo)
+        self.versao += 1
+        self.atual = ModelosAjustados(df, self.versao)
+        print(f"🔄 Dados carregados (versão {self.versao}): {len(df)} sorteios")
+
+    def verificar_atualizacao(self):
+        """Recarrega automaticamente quando o arquivo de dados foi alterado (novo sorteio ingerido)."""
+        if os.path.getmtime(self.arquivo) != self.modificado_em:
+            self.recarregar()
+
+    def prever(self, metodo, params):
+        return self.atual.prever(metodo, params)
+
+    def pontuar(self, metodo, params):
+        return self.atual.pontuar(metodo, params)
+
+# --------------------------------------------------
+# MICRO-BATCHING DAS REQUISIÇÕES
+# --------------------------------------------------
+class LoteadorPredicoes:
+    """
+    Agrupa requisições que chegam dentro de JANELA_LOTE; requisições iguais no mesmo lote são calculadas
+    uma só vez, e as chaves diferentes (deste e dos próximos lotes) são calculadas em paralelo por um pool
+    de threads. O lock global protege apenas a troca de versão dos dados, não os cálculos.
+    """
+
+    def __init__(self, estado, max_workers=None):
+        self.estado = estado
+        self.fila = queue.Queue()
+        self.lock_estado = threading.Lock()
+        self.lock_metricas = threading.Lock()
+        self.total_requisicoes = 0
+        self.soma_latencias = 0.0
+        # Os ajustes (scikit-learn/NumPy) liberam o GIL na maior parte do tempo
+        self.pool = ThreadPoolExecutor(max_workers=max_workers or numero_workers())
+        threading.Thread(target=self._processar, daemon=True).start()
+
+    def submeter(self, metodo, params, operacao="prever"):
+        """
+        Enfileira uma requisição e aguarda o resultado. Retorna (resultado, erro, tamanho_lote, versao).
+        A operação é "prever" (15 números) ou "pontuar" (vetor de 25 pontuações).
+        """
+        pedido = {"metodo": metodo, "params": params or {}, "operacao": operacao, "pronto": threading.Event()}
+        self.fila.put(pedido)
+        pedido["pronto"].wait()
+        return pedido["resultado"], pedido["erro"], pedido["tamanho_lote"], pedido["versao"]
+
+    def registrar_latencia(self, latencia):
+        with self.lock_metricas:
+            self.total_requisicoes += 1
+            self.soma_latencias += latencia
+
+    def recarregar(self):
+        with self.lock_estado:
+            self.estado.recarregar()
+
+    @staticmethod
+    def _calcular(modelos, operacao, metodo, params, pedidos, tamanho_lote):
+        try:
+            resultado, erro = getattr(modelos, operacao)(metodo, params), None
+        except Exception as e:
+            resultado, erro = None, str(e)
+        for pedido in pedidos:
+            pedido["resultado"], pedido["erro"] = resultado, erro
+            pedido["tamanho_lote"] = tamanho_lote
+            pedido["versao"] = modelos.versao
+            pedido["pronto"].set()
+
+    def _processar(self):
+        while True:
+            lote = [self.fila.get()]
+            limite = time.perf_counter() + JANELA_LOTE
+            while len(lote) < TAMANHO_MAXIMO_LOTE:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self.fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            # O lock cobre só a verificação de novos dados e a leitura da versão vigente
+            with self.lock_estado:
+                try:
+                    self.estado.verificar_atualizacao()
+                except Exception as e:
+                    print("Erro ao verificar atualização dos dados:", e)
+                modelos = self.estado.atual
+
+            grupos = {}
+            for pedido in lote:
+                chave = (pedido["operacao"], pedido["metodo"], json.dumps(pedido["params"], sort_keys=True))
+                grupos.setdefault(chave, []).append(pedido)
+            for (operacao, metodo, _), pedidos in grupos.items():
+                self.pool.submit(self._calcular, modelos, operacao, metodo, pedidos[0]["params"], pedidos, len(lote))
+
+# --------------------------------------------------
+# SERVIDOR HTTP
+# --------------------------------------------------
+class ManipuladorPredicao(BaseHTTPRequestHandler):
+    loteador = None
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(tamanho) or b"{}")
+
+    def do_GET(self):
+        if self.path != "/status":
+            return self._responder(404, {"erro": "Rota não encontrada."})
+        loteador = self.loteador
+        estado = loteador.estado
+        self._responder(200, {
+            "versao": estado.versao,
+            "total_sorteios": len(estado.df),
+            "ultimo_sorteio": int(estado.df["Concurso"].max()),
+            "modelos_em_cache": len(estado.atual.pontuacoes),
+            "total_requisicoes": loteador.total_requisicoes,
+            "latencia_media_ms": round(1000 * loteador.soma_latencias / loteador.total_requisicoes, 3) if loteador.total_requisicoes else None,
+        })
+
+    def do_POST(self):
+        inicio = time.perf_counter()
+        if self.path == "/recarregar":
+            self.loteador.recarregar()
+            return self._responder(200, {"versao": self.loteador.estado.versao})
+        # Rota -> (operação do estado, campo da resposta)
+        rotas = {"/prever": ("prever", "predicao"), "/pontuar": ("pontuar", "pontuacao")}
+        if self.path not in rotas:
+            return self._responder(404, {"erro": "Rota não encontrada."})
+        operacao, campo = rotas[self.path]
+
+        try:
+            pedido = self._ler_json()
+        except json.JSONDecodeError:
+            return self._responder(400, {"erro": "JSON inválido."})
+
+        resultado, erro, tamanho_lote, versao = self.loteador.submeter(pedido.get("metodo"), pedido.get("params"), operacao)
+        latencia = time.perf_counter() - inicio
+        self.loteador.registrar_latencia(latencia)
+
+        if erro is not None:
+            return self._responder(400, {"erro": erro, "latencia_ms": round(1000 * latencia, 3)})
+        self._responder(200, {
+            campo: resultado,
+            "versao": versao,
+            "tamanho_lote": tamanho_lote,
+            "latencia_ms": round(1000 * latencia, 3),
+        })
+
+    def log_message(self, formato, *args):
+        print("🌐", formato % args)
+
+def iniciar_servidor(host=HOST, porta=PORTA, arquivo=ARQUIVO_DADOS):
+    """Carrega os dados uma vez e atende requisições de predição até ser interrompido."""
+    ManipuladorPredicao.loteador = LoteadorPredicoes(EstadoPredicao(arquivo))
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorPredicao)
+    print(f"✅ Servidor de predição em http://{host}:{porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+# --------------------------------------------------
+# CLIENTE (COM FALLBACK NO PRÓPRIO PROCESSO)
+# --------------------------------------------------
+def _requisitar(rota, corpo=None, timeout=600, host=HOST, porta=PORTA):
+    dados = json.dumps(corpo).encode("utf-8") if corpo is not None else None
+    requisicao = urllib.request.Request(
+        f"http://{host}:{porta}{rota}", data=dados,
+        headers={"Content-Type": "application/json"}, method="POST" if dados is not None else "GET"
+    )
+    with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+        return json.loads(resposta.read())
+
+def servidor_disponivel(host=HOST, porta=PORTA):
+    """Indica se o servidor de predição está respondendo."""
+    try:
+        _requisitar("/status", timeout=0.5, host=host, porta=porta)
+        return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+def prever(metodo, params=None, df=None, host=HOST, porta=PORTA):
+    """
+    Solicita uma predição ao servidor local; se ele não estiver rodando, calcula no próprio processo.
+
+    Parâmetros:
+      metodo : "supervisionada", "frequencia", "clustering", "decaimento", "markov", "ensemble" ou "otimizacao".
+      params : Dicionário de parâmetros repassado à função de predição (ex.: {"modelo_escolhido": "MLP"}).
+      df     : Histórico usado no fallback local (carregado do arquivo se não informado).
+
+    Retorna:
+      Lista com os 15 números preditos.
+    """
+    try:
+        resposta = _requisitar("/prever", {"metodo": metodo, "params": params or {}}, host=host, porta=porta)
+        print(f"🌐 Predição via servidor: {resposta['latencia_ms']} ms (lote de {resposta['tamanho_lote']})")
+        return resposta["predicao"]
+    except urllib.error.HTTPError as e:
+        raise ValueError(json.loads(e.read()).get("erro", str(e)))
+    except (urllib.error.URLError, ConnectionError) as e:
+        # Só recorre ao cálculo local quando o servidor não está rodando (não em caso de demora)
+        if isinstance(e, urllib.error.URLError) and not isinstance(e.reason, ConnectionError):
+            raise
+        if df is None:
+            df = carregar_dados(ARQUIVO_DADOS)
+        return executar_predicao(df, metodo, params)
+
+def pontuar(metodo, params=None, df=None, host=HOST, porta=PORTA):
+    """
+    Solicita ao servidor local o vetor de 25 pontuações de um método (usado, por exemplo, por
+    gerador_jogos.amostrar_jogos); se ele não estiver rodando, calcula no próprio processo.
+
+    Parâmetros:
+      metodo : Chave de predicao.PONTUACOES ("supervisionada", "frequencia", "clustering", "decaimento",
+               "markov" ou "ensemble").
+      params : Dicionário de parâmetros repassado à função de pontuação.
+      df     : Histórico usado no fallback local (carregado do arquivo se não informado).
+
+    Retorna:
+      Lista com as 25 pontuações (posição k para o número k + 1).
+    """
+    try:
+        resposta = _requisitar("/pontuar", {"metodo": metodo, "params": params or {}}, host=host, porta=porta)
+        print(f"🌐 Pontuação via servidor: {resposta['latencia_ms']} ms (lote de {resposta['tamanho_lote']})")
+        return resposta["pontuacao"]
+    except urllib.error.HTTPError as e:
+        raise ValueError(json.loads(e.read()).get("erro", str(e)))
+    except (urllib.error.URLError, ConnectionError) as e:
+        if isinstance(e, urllib.error.URLError) and not isinstance(e.reason, ConnectionError):
+            raise
+        if df is None:
+            df = carregar_dados(ARQUIVO_DADOS)
+        return executar_pontuacao(df, metodo, params)
+
+def recarregar_servidor(host=HOST, porta=PORTA):
+    """Pede ao servidor que releia os dados (por exemplo, após ingerir um novo sorteio)."""
+    try:
+        return _requisitar("/recarregar", {}, host=host, porta=porta)["versao"]
+    except (urllib.error.URLError, OSError):
+        return None
+
+if __name__ == "__main__":
+    iniciar_servidor()
\ No newline at end of file
@@ -0,0 +1,193 @@
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+import pandas as pd
+from scipy.stats import beta, binom
+
+# --------------------------------------------------
+# DISTRIBUIÇÃO EXATA DE ACERTOS AO ACASO
+# --------------------------------------------------
+@lru_cache(maxsize=None)
+def _distribuicao_acertos(numeros_aposta, total_numeros, numeros_sorteados):
+    pmf = np.array([
+        comb(numeros_aposta, k) * comb(total_numeros - numeros_aposta, numeros_sorteados - k) if k <= numeros_sorteados else 0
+        for k in range(numeros_aposta + 1)
+    ], dtype=float)
+    pmf /= comb(total_numeros, numeros_sorteados)
+    pmf.setflags(write=False)
+    return pmf
+
+def distribuicao_acertos(numeros_aposta=15, total_numeros=25, numeros_sorteados=15):
+    """
+    Calcula a distribuição exata de acertos de uma aposta aleatória (distribuição hipergeométrica).
+
+    Parâmetros:
+      numeros_aposta    : Quantidade de números marcados na aposta (15 na Lotofácil).
+      total_numeros     : Total de números possíveis (25).
+      numeros_sorteados : Quantidade de números sorteados por concurso (15).
+
+    Retorna:
+      Array onde a posição k é a probabilidade de exatamente k acertos.
+    """
+    return _distribuicao_acertos(numeros_aposta, total_numeros, numeros_sorteados)
+
+def media_acaso(numeros_aposta=15, total_numeros=25, numeros_sorteados=15):
+    """Retorna a média esperada de acertos ao acaso (9.0 para 15 números na Lotofácil)."""
+    return numeros_aposta * numeros_sorteados / total_numeros
+
+def probabilidade_meta(meta_acertos=11, numeros_aposta=15):
+    """Retorna a probabilidade exata de uma aposta aleatória ter >= meta_acertos acertos."""
+    return float(distribuicao_acertos(numeros_aposta)[meta_acertos:].sum())
+
+@lru_cache(maxsize=None)
+def _distribuicao_soma(num_sorteios, numeros_aposta):
+    # Convolução por quadrados sucessivos: soma de num_sorteios variáveis hipergeométricas independentes
+    resultado = np.array([1.0])
+    base = np.asarray(distribuicao_acertos(numeros_aposta))
+    n = num_sorteios
+    while n > 0:
+        if n & 1:
+            resultado = np.convolve(resultado, base)
+        base = np.convolve(base, base)
+        n >>= 1
+    resultado = np.clip(resultado, 0.0, None)
+    resultado.setflags(write=False)
+    return resultado
+
+def distribuicao_soma(num_sorteios, numeros_aposta=15):
+    """
+    Calcula a distribuição exata da soma de acertos em num_sorteios apostas aleatórias independentes.
+
+    Retorna:
+      Array onde a posição s é a probabilidade de a soma dos acertos ser exatamente s.
+    """
+    return _distribuicao_soma(int(num_sorteios), numeros_aposta)
+
+# --------------------------------------------------
+# VALORES-P E INTERVALOS
+# --------------------------------------------------
+def valor_p_soma(somas, num_sorteios, numeros_aposta=15):
+    """
+    Valor-p exato (unilateral) de obter soma de acertos >= somas ao acaso.
+
+    Parâmetros:
+      somas        : Escalar ou array com a soma de acertos de cada execução.
+      num_sorteios : Escalar ou array (mesmo formato) com a quantidade de sorteios de cada execução.
+
+    Retorna:
+      Array de valores-p com o mesmo formato de somas.
+    """
+    somas = np.asarray(somas, dtype=int)
+    num_sorteios = np.broadcast_to(np.asarray(num_sorteios, dtype=int), somas.shape)
+    valores_p = np.ones(somas.shape, dtype=float)
+
+    # Uma única distribuição por tamanho de execução, reaproveitada por todas as execuções de mesmo tamanho
+    for n in np.unique(num_sorteios):
+        if n <= 0:
+            continue
+        cauda = np.cumsum(distribuicao_soma(n, numeros_aposta)[::-1])[::-1]
+        selecao = num_sorteios == n
+        indices = np.clip(somas[selecao], 0, len(cauda))
+        valores_p[selecao] = np.append(cauda, 0.0)[indices]
+
+    return np.clip(valores_p, 0.0, 1.0)
+
+def valor_p_meta(sorteios_meta, num_sorteios, meta_acertos=11, numeros_aposta=15):
+    """
+    Valor-p exato (unilateral) de obter >= sorteios_meta concursos com >= meta_acertos acertos ao acaso.
+    A quantidade de sorteios que atingem a meta segue uma binomial com p exato da hipergeométrica.
+    """
+    p = probabilidade_meta(meta_acertos, numeros_aposta)
+    return binom.sf(np.asarray(sorteios_meta) - 1, np.asarray(num_sorteios), p)
+
+def limites_media_acaso(num_sorteios, nivel=0.95, numeros_aposta=15):
+    """
+    Faixa central da média de acertos esperada ao acaso para num_sorteios sorteios.
+
+    Retorna:
+      Tupla (limite_inferior, limite_superior): médias fora dessa faixa são significativas ao nível informado.
+      Sem sorteios (num_sorteios <= 0), retorna (nan, nan).
+    """
+    if num_sorteios <= 0:
+        return np.nan, np.nan
+    alfa = (1 - nivel) / 2
+    acumulada = np.cumsum(distribuicao_soma(num_sorteios, numeros_aposta))
+    inferior = int(np.searchsorted(acumulada, alfa))
+    superior = int(np.searchsorted(acumulada, 1 - alfa))
+    return inferior / num_sorteios, superior / num_sorteios
+
+def intervalo_taxa_meta(sorteios_meta, num_sorteios, nivel=0.95):
+    """
+    Intervalo de confiança exato (Clopper-Pearson) para a taxa de sorteios com >= meta_acertos acertos.
+
+    Retorna:
+      Tupla de arrays (limite_inferior, limite_superior).
+    """
+    k = np.asarray(sorteios_meta, dtype=float)
+    n = np.asarray(num_sorteios, dtype=float)
+    alfa = 1 - nivel
+    with np.errstate(invalid="ignore"):
+        inferior = np.where(k > 0, beta.ppf(alfa / 2, k, n - k + 1), 0.0)
+        superior = np.where(k < n, beta.ppf(1 - alfa / 2, k + 1, n - k), 1.0)
+    return inferior, superior
+
+# --------------------------------------------------
+# RESUMO PARA RESULTADOS DE BACKTEST
+# --------------------------------------------------
+def resumo_significancia(acertos, meta_acertos=11, nivel=0.95):
+    """
+    Compara vetores de acertos de backtest com a distribuição exata ao acaso.
+
+    Parâmetros:
+      acertos      : Lista de acertos de um backtest, matriz (execuções x sorteios) ou lista de listas
+                     com tamanhos diferentes (uma por execução ou célula de parâmetros).
+      meta_acertos : Limiar de acertos considerado na taxa de sucesso.
+      nivel        : Nível de confiança dos intervalos.
+
+    Retorna:
+      DataFrame com uma linha por execução: sorteios, média, valor-p da média, taxa >= meta,
+      valor-p da taxa e intervalo de confiança da taxa.
+    """
+    if len(acertos) > 0 and np.isscalar(acertos[0]):
+        acertos = [acertos]
+
+    num_sorteios = np.array([len(a) for a in acertos], dtype=int)
+    somas = np.array([int(np.sum(a)) for a in acertos], dtype=int)
+    sorteios_meta = np.array([int(np.sum(np.asarray(a) >= meta_acertos)) for a in acertos], dtype=int)
+    inferior, superior = intervalo_taxa_meta(sorteios_meta, num_sorteios, nivel)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "sorteios": num_sorteios,
+            "media_acertos": somas / num_sorteios,
+            "p_valor_media": valor_p_soma(somas, num_sorteios),
+            "taxa_meta": sorteios_meta / num_sorteios,
+            "taxa_meta_acaso": probabilidade_meta(meta_acertos),
+            "p_valor_meta": valor_p_meta(sorteios_meta, num_sorteios, meta_acertos),
+            "ic_taxa_inferior": inferior,
+            "ic_taxa_superior": superior,
+        })
+
+def imprimir_significancia(acertos_por_sorteio, meta_acertos=11, nivel=0.95):
+    """Exibe, no formato dos backtests, a comparação de um vetor de acertos com o acaso."""
+    # Sorteios sem predição (None, por falta de dados de treino) não entram na comparação
+    acertos_por_sorteio = [a for a in acertos_por_sorteio if a is not None]
+    if not acertos_por_sorteio:
+        return
+    resumo = resumo_significancia(acertos_por_sorteio, meta_acertos, nivel).iloc[0]
+    inferior, superior = limites_media_acaso(int(resumo["sorteios"]), nivel)
+
+    print(f"- Média esperada ao acaso: {media_acaso():.2f} (faixa de {nivel:.0%}: {inferior:.2f} a {superior:.2f})")
+    print(f"- Valor-p da média de acertos: {resumo['p_valor_media']:.4f}")
+    print(f"- Taxa >= {meta_acertos} acertos: {resumo['taxa_meta']:.2%} (acaso: {resumo['taxa_meta_acaso']:.2%}, "
+          f"IC {nivel:.0%}: {resumo['ic_taxa_inferior']:.2%} a {resumo['ic_taxa_superior']:.2%}, valor-p: {resumo['p_valor_meta']:.4f})")
+
+if __name__ == "__main__":
+    # Teste do módulo individualmente
+    pmf = distribuicao_acertos()
+    print("Distribuição exata de acertos de uma aposta aleatória de 15 números:")
+    for k in range(5, 16):
+        print(f"  {k:2d} acertos: {pmf[k]:.8f}")
+    print(f"Média ao acaso: {media_acaso():.2f} | P(>= 11): {probabilidade_meta(11):.6f}")
+    imprimir_significancia([9, 10, 8, 11, 9, 10, 12, 9, 8, 10])
\ No newline at end of file
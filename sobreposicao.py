@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from binario import binario_de_mascaras, mascara_de_numeros, mascaras, popcount
+
+class MotorSobreposicao:
+    """
+    Calcula a sobreposição (quantidade de números repetidos) entre cada sorteio e os sorteios
+    anteriores, para as defasagens 1..max_lag, usando popcount sobre as máscaras de bits.
+
+    Também mantém, para cada defasagem, as contagens de persistência por número: quantas vezes o
+    número k saiu no sorteio t - lag e quantas vezes voltou a sair no sorteio t.
+
+    Novos sorteios são incorporados incrementalmente com adicionar(), em tempo O(max_lag).
+    """
+
+    def __init__(self, max_lag=10):
+        self.max_lag = max_lag
+        self.total = 0
+        self._mascaras = np.zeros(1024, dtype=np.uint32)
+        # Sobreposição do sorteio t com o sorteio t - lag (-1 quando não existe sorteio t - lag)
+        self._sobreposicoes = np.full((1024, max_lag), -1, dtype=np.int16)
+        self.presencas = np.zeros((max_lag, 25), dtype=np.int64)
+        self.persistencias = np.zeros((max_lag, 25), dtype=np.int64)
+
+    @classmethod
+    def de_historico(cls, df, max_lag=10):
+        """Constrói o motor a partir do histórico completo, de forma vetorizada (um popcount por defasagem)."""
+        motor = cls(max_lag)
+        masks = mascaras(df)
+        n = len(masks)
+        motor._garantir_capacidade(n)
+        motor._mascaras[:n] = masks
+        motor.total = n
+
+        binario = binario_de_mascaras(masks).astype(np.int64)
+        for lag in range(1, max_lag + 1):
+            if n <= lag:
+                break
+            motor._sobreposicoes[lag:n, lag - 1] = popcount(masks[lag:] & masks[:-lag])
+            motor.presencas[lag - 1] = binario[:-lag].sum(axis=0)
+            motor.persistencias[lag - 1] = (binario[lag:] & binario[:-lag]).sum(axis=0)
+        return motor
+
+    def _garantir_capacidade(self, n):
+        if n <= len(self._mascaras):
+            return
+        capacidade = max(n, 2 * len(self._mascaras))
+        mascaras_novas = np.zeros(capacidade, dtype=np.uint32)
+        mascaras_novas[:self.total] = self._mascaras[:self.total]
+        sobreposicoes_novas = np.full((capacidade, self.max_lag), -1, dtype=np.int16)
+        sobreposicoes_novas[:self.total] = self._sobreposicoes[:self.total]
+        self._mascaras, self._sobreposicoes = mascaras_novas, sobreposicoes_novas
+
+    def adicionar(self, sorteio):
+        """Incorpora um novo sorteio (lista com os 15 números) atualizando séries e contagens."""
+        self._garantir_capacidade(self.total + 1)
+        mascara = np.uint32(mascara_de_numeros(sorteio))
+        t = self.total
+        vetor = binario_de_mascaras(mascara)
+        for lag in range(1, min(self.max_lag, t) + 1):
+            anterior = self._mascaras[t - lag]
+            self._sobreposicoes[t, lag - 1] = popcount(mascara & anterior)
+            self.presencas[lag - 1] += binario_de_mascaras(anterior)
+            self.persistencias[lag - 1] += vetor & binario_de_mascaras(anterior)
+        self._mascaras[t] = mascara
+        self.total += 1
+
+    @property
+    def mascaras(self):
+        return self._mascaras[:self.total]
+
+    def serie(self, lag=1, janela=None):
+        """
+        Retorna a série de sobreposições entre cada sorteio e o sorteio lag posições antes.
+
+        Parâmetros:
+          lag    : Defasagem (1 = sorteio imediatamente anterior).
+          janela : Se informado, considera apenas os últimos `janela` sorteios.
+        """
+        serie = self._sobreposicoes[lag:self.total, lag - 1]
+        return serie[-janela:] if janela else serie
+
+    def resumo(self, lag=1, janela=None):
+        """Resume a série de sobreposições: média, desvio, mínimo, máximo e distribuição dos valores."""
+        serie = self.serie(lag, janela)
+        if len(serie) == 0:
+            return {"sorteios": 0, "media": None, "desvio": None, "minimo": None, "maximo": None, "distribuicao": {}}
+        valores, contagens = np.unique(serie, return_counts=True)
+        return {
+            "sorteios": int(len(serie)),
+            "media": float(serie.mean()),
+            "desvio": float(serie.std()),
+            "minimo": int(serie.min()),
+            "maximo": int(serie.max()),
+            "distribuicao": {int(v): int(c) for v, c in zip(valores, contagens)},
+        }
+
+    def resumo_por_lag(self, janela=None):
+        """Retorna um DataFrame com a média e o desvio da sobreposição para cada defasagem 1..max_lag."""
+        linhas = []
+        for lag in range(1, self.max_lag + 1):
+            resumo = self.resumo(lag, janela)
+            linhas.append({"lag": lag, "media": resumo["media"], "desvio": resumo["desvio"], "sorteios": resumo["sorteios"]})
+        return pd.DataFrame(linhas).set_index("lag")
+
+    def media_movel(self, lag=1, janela=20):
+        """Média móvel da série de sobreposições, para acompanhamento no painel."""
+        return pd.Series(self.serie(lag)).rolling(janela, min_periods=1).mean().to_numpy()
+
+    def probabilidades_persistencia(self, lag=1, janela=None):
+        """
+        Probabilidade de cada número (1 a 25) sair no sorteio t dado que saiu no sorteio t - lag.
+
+        Parâmetros:
+          janela : Se informado, considera apenas os pares de sorteios dentro dos últimos `janela` sorteios.
+                   Sem janela, usa as contagens incrementais do histórico completo.
+
+        Retorna:
+          Array com 25 probabilidades (NaN para números que não saíram no período).
+        """
+        if janela is None:
+            presencas = self.presencas[lag - 1]
+            persistencias = self.persistencias[lag - 1]
+        else:
+            binario = binario_de_mascaras(self.mascaras[-(janela + lag):]).astype(np.int64)
+            presencas = binario[:-lag].sum(axis=0)
+            persistencias = (binario[lag:] & binario[:-lag]).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(presencas > 0, persistencias / presencas, np.nan)
+
+    def faixa_repetidos(self, lag=1, janela=None, cobertura=0.8):
+        """
+        Faixa central (mínimo, máximo) de números repetidos do sorteio t - lag que cobre a fração
+        `cobertura` dos sorteios observados. Usada como filtro em gerador_jogos.gerar_jogos.
+        """
+        serie = self.serie(lag, janela)
+        if len(serie) == 0:
+            return (0, 15)
+        cauda = (1 - cobertura) / 2
+        return int(np.floor(np.quantile(serie, cauda))), int(np.ceil(np.quantile(serie, 1 - cauda)))
+
+if __name__ == "__main__":
+    # Teste do módulo individualmente
+    from dados import carregar_dados
+
+    df = carregar_dados("data/Lotofacil.xlsx")
+    if df is not None:
+        motor = MotorSobreposicao.de_historico(df, max_lag=5)
+        print("\nSobreposição média por defasagem:")
+        print(motor.resumo_por_lag())
+        print("\nResumo (lag 1, últimos 100 sorteios):", motor.resumo(lag=1, janela=100))
+        print("Faixa de repetidos (80%):", motor.faixa_repetidos())
+        print("Persistência por número (lag 1):")
+        print(np.round(motor.probabilidades_persistencia(lag=1), 3))
+    else:
+        print("Erro ao carregar os dados.")
\ No newline at end of file
@@ -0,0 +1,311 @@
+import datetime
+import inspect
+import itertools
+import json
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from banco import conectar_banco
+from recursos import inicializar_worker, numero_workers
+from backtest_iterativo import PASSOS_POR_WORKER
+from backtest_clustering import prever_clustering
+from backtest_frequencia import prever_frequencia
+from backtest_markov import prever_markov
+from backtest_mlp import prever_mlp
+from backtest_otimizacao import prever_otimizacao
+from backtest_pontuacao import prever_pontuacao
+from backtest_randomforest import prever_randomforest
+from predicao import PONTUACOES
+from significancia import valor_p_meta, valor_p_soma
+
+# Modelos disponíveis para a varredura: cada função recebe (df_treino, df_teste, **parametros)
+# e retorna o conjunto de 15 números preditos, ou None se não houver dados suficientes.
+MODELOS = {
+    "RandomForest": prever_randomforest,
+    "MLP": prever_mlp,
+    "Clustering": prever_clustering,
+    "Frequencia": prever_frequencia,
+    "Markov": prever_markov,
+    "Otimizacao": prever_otimizacao,
+    # Funções de pontuação de predicao.py, exatamente como usadas pelo ensemble: {"metodo": ..., **parâmetros}
+    "Pontuacao": prever_pontuacao,
+}
+
+### **1. Criar tabela de resultados da varredura**
+def criar_tabela_varredura():
+    """Cria a tabela que guarda cada célula (modelo, parâmetros, concurso) já calculada."""
+    conexao = conectar_banco()
+    cursor = conexao.cursor()
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ResultadosVarredura (
+            modelo TEXT NOT NULL,
+            parametros TEXT NOT NULL,
+            concurso INTEGER NOT NULL,
+            acertos INTEGER,
+            data_execucao TEXT NOT NULL,
+            PRIMARY KEY (modelo, parametros, concurso)
+        )
+    """)
+
+    conexao.commit()
+    conexao.close()
+
+# 📌 Executar criação da tabela
+criar_tabela_varredura()
+
+### **2. Grade de parâmetros**
+def expandir_grade(grade):
+    """
+    Expande uma grade de parâmetros em todas as combinações possíveis.
+
+    Parâmetros:
+      grade : Dicionário {parametro: [valores]}, por exemplo {"n_estimators": [100, 200], "max_depth": [5, 10]}.
+
+    Retorna:
+      Lista de dicionários, um para cada combinação.
+    """
+    if not grade:
+        return [{}]
+    nomes = sorted(grade)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grade[n] for n in nomes))]
+
+def _padroes(funcao, ignorar=("df_treino", "df_teste", "intermediarios")):
+    """Valores padrão dos parâmetros nomeados de uma função."""
+    return {
+        nome: parametro.default for nome, parametro in inspect.signature(funcao).parameters.items()
+        if parametro.default is not inspect.Parameter.empty and nome not in ignorar
+    }
+
+def parametros_completos(modelo, parametros):
+    """
+    Completa os parâmetros com os valores padrão da função do modelo (e, no modelo "Pontuacao", da função
+    de pontuação escolhida), de modo que {} e {"num_clusters": 10} com o padrão 10 sejam a mesma célula.
+    """
+    if modelo not in MODELOS:
+        return dict(parametros)
+    completos = {**_padroes(MODELOS[modelo]), **parametros}
+    if modelo == "Pontuacao" and completos["metodo"] in PONTUACOES:
+        completos = {**_padroes(PONTUACOES[completos["metodo"]]), **completos}
+    return completos
+
+def chave_parametros(parametros, modelo=None):
+    """
+    Serializa os parâmetros de forma canônica para uso como chave na tabela. Com o modelo informado,
+    os valores padrão omitidos são incluídos antes (ver parametros_completos).
+    """
+    if modelo is not None:
+        parametros = parametros_completos(modelo, parametros)
+    return json.dumps(parametros, sort_keys=True)
+
+def normalizar_chaves_varredura():
+    """
+    Regrava com chave_parametros(parametros, modelo) as chaves de células gravadas antes da inclusão dos
+    valores padrão. Quando a mesma célula existe com as duas chaves, fica a já normalizada.
+    """
+    conexao = conectar_banco()
+    cursor = conexao.cursor()
+
+    combinacoes = cursor.execute("SELECT DISTINCT modelo, parametros FROM ResultadosVarredura").fetchall()
+    for modelo, parametros in combinacoes:
+        chave = chave_parametros(json.loads(parametros), modelo)
+        if chave != parametros:
+            cursor.execute("UPDATE OR IGNORE ResultadosVarredura SET parametros = ? WHERE modelo = ? AND parametros = ?", (chave, modelo, parametros))
+            cursor.execute("DELETE FROM ResultadosVarredura WHERE modelo = ? AND parametros = ?", (modelo, parametros))
+
+    conexao.commit()
+    conexao.close()
+
+# 📌 Bancos com células gravadas antes da inclusão dos valores padrão nas chaves
+normalizar_chaves_varredura()
+
+def listar_celulas_calculadas(modelo):
+    """Retorna o conjunto de pares (parametros, concurso) já calculados para o modelo."""
+    conexao = conectar_banco()
+    cursor = conexao.cursor()
+
+    cursor.execute("SELECT parametros, concurso FROM ResultadosVarredura WHERE modelo = ?", (modelo,))
+    calculadas = set(cursor.fetchall())
+
+    conexao.close()
+
+    return calculadas
+
+### **3. Execução das células nos processos**
+_df_worker = None
+_posicoes_worker = None
+
+def _inicializar_worker(df):
+    """Guarda o histórico ordenado em cada processo, evitando reenviá-lo a cada célula."""
+    global _df_worker, _posicoes_worker
+    _df_worker = df
+    _posicoes_worker = {int(c): i for i, c in enumerate(df["Concurso"])}
+
+def _avaliar_celula(modelo, parametros, concurso):
+    """Executa uma célula da varredura: treina com os sorteios anteriores e conta os acertos."""
+    colunas_numeros = [f"Bola{i}" for i in range(1, 16)]
+    i = _posicoes_worker[concurso]
+    df_treino = _df_worker.iloc[:i]
+    df_teste = _df_worker.iloc[i]
+
+    numeros_preditos = MODELOS[modelo](df_treino, df_teste, **json.loads(parametros))
+    if numeros_preditos is None:
+        return modelo, parametros, concurso, None
+
+    numeros_reais = set(int(n) for n in df_teste[colunas_numeros].values)
+    acertos = len(set(int(n) for n in numeros_preditos) & numeros_reais)
+    return modelo, parametros, concurso, acertos
+
+def executar_varredura(df, modelo, grade, num_sorteios=100, max_workers=None):
+    """
+    Executa uma varredura de hiperparâmetros para um modelo de backtest.
+
+    Cada célula (modelo, parâmetros, concurso) é gravada na tabela ResultadosVarredura assim que
+    termina. Ao rodar de novo, somente as células ausentes são calculadas, de modo que uma varredura
+    interrompida continua de onde parou. As células são distribuídas em um pool de processos, com no
+    máximo PASSOS_POR_WORKER células em andamento por processo.
+
+    Parâmetros:
+      df           : DataFrame com o histórico (colunas "Concurso" e "Bola1" a "Bola15").
+      modelo       : Nome do modelo em MODELOS ("RandomForest", "MLP", "Clustering", "Frequencia", "Markov",
+                     "Otimizacao" ou "Pontuacao").
+      grade        : Dicionário {parametro: [valores]} com a grade a varrer.
+      num_sorteios : Quantidade de concursos finais avaliados (janela do backtest).
+      max_workers  : Número de processos (padrão: recursos.numero_workers).
+
+    Retorna:
+      Quantidade de células calculadas nesta execução.
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo inválido! Escolha entre: {', '.join(MODELOS)}.")
+
+    df = df.sort_values(by="Concurso", ascending=True).reset_index(drop=True)
+    concursos = [int(c) for c in df["Concurso"].iloc[-num_sorteios:]]
+
+    calculadas = listar_celulas_calculadas(modelo)
+    pendentes = [
+        (chave, concurso)
+        for chave in dict.fromkeys(chave_parametros(parametros, modelo) for parametros in expandir_grade(grade))
+        for concurso in concursos
+        if (chave, concurso) not in calculadas
+    ]
+
+    print(f"🔎 Varredura {modelo}: {len(pendentes)} célula(s) pendente(s) de {len(expandir_grade(grade)) * len(concursos)}")
+    if not pendentes:
+        return 0
+
+    conexao = conectar_banco()
+    cursor = conexao.cursor()
+    concluidas = 0
+
+    try:
+        max_workers = max_workers or numero_workers(len(pendentes))
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=inicializar_worker, initargs=(max_workers, _inicializar_worker, df))
+        try:
+            # Janela limitada de células em andamento (como em backtest_iterativo.iterar_backtest): uma
+            # interrupção deixa pouca coisa na fila, e a fila é cancelada no finally
+            celulas = iter(pendentes)
+            em_andamento = set()
+            while True:
+                while len(em_andamento) < max_workers * PASSOS_POR_WORKER:
+                    celula = next(celulas, None)
+                    if celula is None:
+                        break
+                    em_andamento.add(pool.submit(_avaliar_celula, modelo, *celula))
+                if not em_andamento:
+                    break
+                terminadas, em_andamento = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    _, parametros, concurso, acertos = futuro.result()
+                    cursor.execute(
+                        "INSERT OR REPLACE INTO ResultadosVarredura (modelo, parametros, concurso, acertos, data_execucao) VALUES (?, ?, ?, ?, ?)",
+                        (modelo, parametros, concurso, acertos, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                    )
+                    conexao.commit()  # Cada célula fica salva imediatamente, permitindo retomar a varredura
+                    concluidas += 1
+                    print(f"🎯 {modelo} {parametros} | Sorteio {concurso}: {acertos} acertos ({concluidas}/{len(pendentes)})")
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    finally:
+        conexao.close()
+
+    return concluidas
+
+def resultados_varredura(modelo, parametros):
+    """
+    Acertos por concurso de uma única combinação (modelo, parâmetros) já calculada.
+
+    Retorna:
+      Series indexada pelo concurso, em ordem crescente (vazia se a combinação ainda não foi calculada).
+    """
+    conexao = conectar_banco()
+    resultados = pd.read_sql_query(
+        "SELECT concurso, acertos FROM ResultadosVarredura WHERE modelo = ? AND parametros = ? AND acertos IS NOT NULL ORDER BY concurso",
+        conexao, params=(modelo, chave_parametros(parametros, modelo))
+    )
+    conexao.close()
+    return resultados.set_index("concurso")["acertos"]
+
+### **4. Ranking dos resultados**
+def ranking_varredura(modelo=None, meta_acertos=11, num_sorteios=None):
+    """
+    Monta o ranking das combinações de parâmetros já calculadas.
+
+    Parâmetros:
+      modelo       : Filtra por um modelo específico (None para todos).
+      meta_acertos : Limiar usado na taxa de sorteios com >= meta_acertos.
+      num_sorteios : Se informado, considera apenas os últimos num_sorteios concursos de cada combinação.
+
+    Retorna:
+      DataFrame com modelo, parametros, sorteios avaliados, média de acertos, taxa >= meta_acertos e
+      os valores-p exatos de cada uma frente a apostas aleatórias, ordenado pela média de acertos.
+    """
+    filtros = ["acertos IS NOT NULL"]
+    argumentos = [meta_acertos]
+    if modelo is not None:
+        filtros.append("r.modelo = ?")
+        argumentos.append(modelo)
+    if num_sorteios is not None:
+        # Concursos dentro da janela final de cada combinação (modelo, parametros), contando apenas os
+        # concursos com resultado (células sem dados suficientes não ocupam a janela)
+        filtros.append("""(
+            SELECT COUNT(*) FROM ResultadosVarredura r2
+            WHERE r2.modelo = r.modelo AND r2.parametros = r.parametros AND r2.concurso > r.concurso
+              AND r2.acertos IS NOT NULL
+        ) < ?""")
+        argumentos.append(num_sorteios)
+
+    conexao = conectar_banco()
+    ranking = pd.read_sql_query(f"""
+        SELECT modelo, parametros,
+               COUNT(acertos) AS sorteios,
+               AVG(acertos) AS media_acertos,
+               AVG(CASE WHEN acertos >= ? THEN 1.0 ELSE 0.0 END) AS taxa_meta
+        FROM ResultadosVarredura r
+        WHERE {" AND ".join(filtros)}
+        GROUP BY modelo, parametros
+        ORDER BY media_acertos DESC, taxa_meta DESC
+    """, conexao, params=argumentos)
+    conexao.close()
+
+    # Significância exata frente ao acaso, calculada de uma vez para todas as combinações
+    somas = (ranking["media_acertos"] * ranking["sorteios"]).round().astype(int)
+    sorteios_meta = (ranking["taxa_meta"] * ranking["sorteios"]).round().astype(int)
+    ranking["p_valor_media"] = valor_p_soma(somas.to_numpy(), ranking["sorteios"].to_numpy())
+    ranking["p_valor_meta"] = valor_p_meta(sorteios_meta.to_numpy(), ranking["sorteios"].to_numpy(), meta_acertos)
+
+    return ranking
+
+if __name__ == "__main__":
+    # Carregar dados do histórico de sorteios
+    df = pd.read_excel("data/Lotofacil.xlsx", engine="openpyxl")
+
+    # Exemplo de varredura: rodar de novo calcula apenas as células que ainda faltam
+    executar_varredura(df, "RandomForest", {"n_estimators": [100, 200], "max_depth": [5, 10]}, num_sorteios=50)
+    executar_varredura(df, "Clustering", {"num_clusters": [5, 10, 15]}, num_sorteios=50)
+    executar_varredura(df, "Clustering", {"num_clusters": [5, 10], "algoritmo": ["kmodes", "kmedoids"]}, num_sorteios=50)
+    executar_varredura(df, "MLP", {"hidden_layer_sizes": [[50, 30], [100, 50]]}, num_sorteios=50)
+
+    print("\n📊 **Ranking da Varredura**")
+    print(ranking_varredura().to_string(index=False))